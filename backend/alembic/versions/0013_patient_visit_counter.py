@@ -0,0 +1,41 @@
+"""Add per-patient visit number counter
+
+Revision ID: 0013_patient_visit_counter
+Revises: 0012_print_settings
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013_patient_visit_counter'
+down_revision: Union[str, None] = '0012_print_settings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'patients',
+        sa.Column('last_visit_number', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill the counter from existing visits
+    op.execute("""
+        UPDATE patients
+        SET last_visit_number = v.max_visit_number
+        FROM (
+            SELECT patient_id, MAX(visit_number) AS max_visit_number
+            FROM visits
+            GROUP BY patient_id
+        ) v
+        WHERE v.patient_id = patients.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('patients', 'last_visit_number')
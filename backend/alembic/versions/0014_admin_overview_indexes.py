@@ -0,0 +1,31 @@
+"""Indexes for per-clinic aggregates (admin overview)
+
+Revision ID: 0014_admin_overview_indexes
+Revises: 0013_patient_visit_counter
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014_admin_overview_indexes'
+down_revision: Union[str, None] = '0013_patient_visit_counter'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_clinic_admins_admin_id', 'clinic_admins', ['admin_id'])
+    op.create_index('ix_doctors_clinic_id', 'doctors', ['clinic_id'])
+    op.create_index('ix_patients_clinic_id', 'patients', ['clinic_id'])
+    op.create_index('ix_visits_clinic_id_visit_date', 'visits', ['clinic_id', 'visit_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visits_clinic_id_visit_date', table_name='visits')
+    op.drop_index('ix_patients_clinic_id', table_name='patients')
+    op.drop_index('ix_doctors_clinic_id', table_name='doctors')
+    op.drop_index('ix_clinic_admins_admin_id', table_name='clinic_admins')
@@ -0,0 +1,52 @@
+"""Add clinic purge jobs and clinic_id indexes for background clinic deletion
+
+Revision ID: 0015_clinic_purge_jobs
+Revises: 0014_admin_overview_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015_clinic_purge_jobs'
+down_revision: Union[str, None] = '0014_admin_overview_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE purgejobstatusenum AS ENUM ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED')")
+    op.create_table(
+        'clinic_purge_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('clinic_id', sa.String(), nullable=False),
+        sa.Column('clinic_name', sa.String(), nullable=True),
+        sa.Column('requested_by', sa.String(), nullable=True),
+        sa.Column('status', postgresql.ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='purgejobstatusenum', create_type=False), nullable=False),
+        sa.Column('total_rows', sa.JSON(), nullable=True),
+        sa.Column('deleted_rows', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_clinic_purge_jobs_clinic_id', 'clinic_purge_jobs', ['clinic_id'])
+
+    # The purge job deletes these in clinic_id-filtered chunks
+    op.create_index('ix_appointments_clinic_id', 'appointments', ['clinic_id'])
+    op.create_index('ix_invoices_clinic_id', 'invoices', ['clinic_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_clinic_id', table_name='invoices')
+    op.drop_index('ix_appointments_clinic_id', table_name='appointments')
+    op.drop_index('ix_clinic_purge_jobs_clinic_id', table_name='clinic_purge_jobs')
+    op.drop_table('clinic_purge_jobs')
+    op.execute("DROP TYPE purgejobstatusenum")
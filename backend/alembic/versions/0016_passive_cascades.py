@@ -0,0 +1,51 @@
+"""Database-side cascades for patient and user deletion
+
+Revision ID: 0016_passive_cascades
+Revises: 0015_clinic_purge_jobs
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0016_passive_cascades'
+down_revision: Union[str, None] = '0015_clinic_purge_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Match the ORM cascades (Appointment.visit, Visit.invoice) in the database
+    op.drop_constraint('visits_appointment_id_fkey', 'visits', type_='foreignkey')
+    op.create_foreign_key(
+        'visits_appointment_id_fkey', 'visits', 'appointments',
+        ['appointment_id'], ['id'], ondelete='CASCADE'
+    )
+    op.drop_constraint('invoices_visit_id_fkey', 'invoices', type_='foreignkey')
+    op.create_foreign_key(
+        'invoices_visit_id_fkey', 'invoices', 'visits',
+        ['visit_id'], ['id'], ondelete='CASCADE'
+    )
+
+    # Cascading deletes look children up by these foreign keys
+    op.create_index('ix_appointments_patient_id', 'appointments', ['patient_id'])
+    op.create_index('ix_visits_patient_id', 'visits', ['patient_id'])
+    op.create_index('ix_invoices_patient_id', 'invoices', ['patient_id'])
+    op.create_index('ix_visit_medicines_visit_id', 'visit_medicines', ['visit_id'])
+    op.create_index('ix_invoice_items_invoice_id', 'invoice_items', ['invoice_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoice_items_invoice_id', table_name='invoice_items')
+    op.drop_index('ix_visit_medicines_visit_id', table_name='visit_medicines')
+    op.drop_index('ix_invoices_patient_id', table_name='invoices')
+    op.drop_index('ix_visits_patient_id', table_name='visits')
+    op.drop_index('ix_appointments_patient_id', table_name='appointments')
+
+    op.drop_constraint('invoices_visit_id_fkey', 'invoices', type_='foreignkey')
+    op.create_foreign_key('invoices_visit_id_fkey', 'invoices', 'visits', ['visit_id'], ['id'])
+    op.drop_constraint('visits_appointment_id_fkey', 'visits', type_='foreignkey')
+    op.create_foreign_key('visits_appointment_id_fkey', 'visits', 'appointments', ['appointment_id'], ['id'])
@@ -0,0 +1,307 @@
+"""Opt-in range partitioning of appointments and visits by date
+
+Revision ID: 0017_date_partitioning
+Revises: 0016_passive_cascades
+Create Date: 2026-10-19
+
+Always installs the partition maintenance functions and the (empty)
+date_partitioning registry; the app calls ensure_date_partitions() on worker
+startup and then periodically (see app/core/startup.py), and it does nothing
+until a table is registered.
+
+The conversion itself only runs when asked for:
+
+    alembic -x partition_by_date=month upgrade head
+    alembic -x partition_by_date=year upgrade head
+
+To convert a database that is already past this revision, downgrade to
+0016_passive_cascades and upgrade again with the flag. The conversion copies
+every row into the new partitioned tables inside the migration transaction, so
+run it in a maintenance window.
+
+Postgres cannot enforce a UNIQUE or FOREIGN KEY constraint on a partitioned
+table unless it contains the partition key, so once converted:
+
+- the primary keys become (id, appointment_date) and (id, visit_date); ids
+  stay unique UUIDs and the ORM keeps addressing rows by id alone
+- visits.appointment_id uniqueness is kept by a trigger that serialises
+  inserts per appointment with an advisory lock
+- the ON DELETE CASCADE from appointments to visits and from visits to
+  visit_medicines and invoices is kept by AFTER DELETE triggers; inserts are no
+  longer checked against the partitioned parent. create_date_partitions()
+  switches them off while it moves rows out of the default partition;
+  python -m scripts.check_partition_split verifies that on a converted database
+
+"month" prunes hardest for the date-bounded OPD queries; "year" keeps lookups
+by id or appointment_id (which probe every partition) cheaper on old data.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0017_date_partitioning'
+down_revision: Union[str, None] = '0016_passive_cascades'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions are created this far ahead during the conversion; the app keeps extending it
+MONTHS_AHEAD = 3
+
+PARTITIONED_TABLES = [('appointments', 'appointment_date'), ('visits', 'visit_date')]
+
+PARTITION_FUNCTIONS = """
+CREATE TABLE date_partitioning (
+    table_name text PRIMARY KEY,
+    column_name text NOT NULL,
+    interval_unit text NOT NULL CHECK (interval_unit IN ('month', 'year'))
+);
+
+-- Create the missing partitions of a registered table covering p_from .. p_to.
+-- Rows that already landed in the default partition are moved into the new one,
+-- with the table's cascade delete trigger switched off for the move (the
+-- transaction holds the partition's exclusive lock, so nobody else sees that).
+CREATE FUNCTION create_date_partitions(p_table text, p_from date, p_to date) RETURNS integer AS $$
+DECLARE
+    cfg date_partitioning%ROWTYPE;
+    is_timestamp boolean;
+    lower_bound date;
+    upper_bound date;
+    partition_name text;
+    lower_value text;
+    upper_value text;
+    default_name text := p_table || '_default';
+    cascade_trigger text := p_table || '_cascade_delete';
+    has_cascade boolean;
+    created integer := 0;
+BEGIN
+    SELECT * INTO cfg FROM date_partitioning WHERE table_name = p_table;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    SELECT atttypid = 'timestamptz'::regtype INTO is_timestamp
+    FROM pg_attribute WHERE attrelid = p_table::regclass AND attname = cfg.column_name;
+
+    lower_bound := date_trunc(cfg.interval_unit, p_from)::date;
+    WHILE lower_bound <= p_to LOOP
+        upper_bound := (lower_bound + ('1 ' || cfg.interval_unit)::interval)::date;
+        partition_name := p_table || '_p' || to_char(lower_bound, CASE cfg.interval_unit WHEN 'month' THEN 'YYYY_MM' ELSE 'YYYY' END);
+        -- timestamptz partitions are cut at UTC midnight
+        lower_value := lower_bound::text || CASE WHEN is_timestamp THEN ' 00:00:00+00' ELSE '' END;
+        upper_value := upper_bound::text || CASE WHEN is_timestamp THEN ' 00:00:00+00' ELSE '' END;
+
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, p_table);
+            IF to_regclass(default_name) IS NOT NULL THEN
+                -- The rows are moved, not deleted: the AFTER DELETE cascade trigger the default
+                -- partition inherits would delete their visits, medicines and invoices
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_trigger
+                    WHERE tgrelid = default_name::regclass AND tgname = cascade_trigger AND tgenabled <> 'D'
+                ) INTO has_cascade;
+                IF has_cascade THEN
+                    EXECUTE format('ALTER TABLE %I DISABLE TRIGGER %I', default_name, cascade_trigger);
+                END IF;
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                    default_name, cfg.column_name, lower_value, cfg.column_name, upper_value, partition_name
+                );
+                IF has_cascade THEN
+                    EXECUTE format('ALTER TABLE %I ENABLE TRIGGER %I', default_name, cascade_trigger);
+                END IF;
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                p_table, partition_name, lower_value, upper_value
+            );
+            created := created + 1;
+        END IF;
+        lower_bound := upper_bound;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Called by every worker on startup and then periodically; one at a time
+CREATE FUNCTION ensure_date_partitions(p_months_ahead integer) RETURNS integer AS $$
+DECLARE
+    registered record;
+    created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_date_partitions'));
+    FOR registered IN SELECT table_name FROM date_partitioning LOOP
+        created := created + create_date_partitions(
+            registered.table_name, current_date, (current_date + make_interval(months => p_months_ahead))::date
+        );
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+INTEGRITY_TRIGGERS = """
+CREATE FUNCTION visits_unique_appointment() RETURNS trigger AS $$
+BEGIN
+    IF NEW.appointment_id IS NOT NULL THEN
+        -- Held until commit, so a concurrent insert for the same appointment sees this one
+        PERFORM pg_advisory_xact_lock(hashtext('visits.appointment_id'), hashtext(NEW.appointment_id));
+        IF EXISTS (SELECT 1 FROM visits WHERE appointment_id = NEW.appointment_id AND id <> NEW.id) THEN
+            RAISE EXCEPTION 'duplicate key value violates unique constraint "visits_appointment_id_key"'
+                USING ERRCODE = 'unique_violation',
+                      DETAIL = format('Key (appointment_id)=(%s) already exists.', NEW.appointment_id);
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER visits_unique_appointment BEFORE INSERT OR UPDATE OF appointment_id ON visits
+    FOR EACH ROW EXECUTE FUNCTION visits_unique_appointment();
+
+CREATE FUNCTION appointments_cascade_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM visits WHERE appointment_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER appointments_cascade_delete AFTER DELETE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION appointments_cascade_delete();
+
+CREATE FUNCTION visits_cascade_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM visit_medicines WHERE visit_id = OLD.id;
+    DELETE FROM invoices WHERE visit_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER visits_cascade_delete AFTER DELETE ON visits
+    FOR EACH ROW EXECUTE FUNCTION visits_cascade_delete();
+"""
+
+
+def _is_partitioned(conn, table: str) -> bool:
+    return conn.execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table},
+    ).scalar()
+
+
+def _index_definitions(conn, table: str) -> list:
+    """CREATE INDEX statements of the indexes that do not back a constraint"""
+    return conn.execute(sa.text("""
+        SELECT pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        WHERE x.indrelid = CAST(:table AS regclass)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    """), {"table": table}).scalars().all()
+
+
+def _foreign_keys(conn, table: str, referenced: bool = False) -> list:
+    """(table, name, definition) of the foreign keys from (or, with referenced, to) a table"""
+    column = "confrelid" if referenced else "conrelid"
+    return conn.execute(sa.text(f"""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE {column} = CAST(:table AS regclass) AND contype = 'f'
+    """), {"table": table}).all()
+
+
+def _rebuild(conn, table: str, partition_clause: str, primary_key: str) -> tuple:
+    """
+    Move ``table`` aside as ``<table>_old`` and create an empty replacement with ``partition_clause``.
+
+    Returns the index definitions and outgoing foreign keys to re-create with _finish_rebuild()
+    once the data is copied. Foreign keys pointing at the table are dropped.
+    """
+    indexes = _index_definitions(conn, table)
+    foreign_keys = _foreign_keys(conn, table)
+    for referencing, name, _ in _foreign_keys(conn, table, referenced=True):
+        op.execute(f'ALTER TABLE {referencing} DROP CONSTRAINT "{name}"')
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(f"ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey")
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) {partition_clause}")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    return indexes, foreign_keys
+
+
+def _finish_rebuild(table: str, indexes: list, foreign_keys: list) -> None:
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.execute(f"DROP TABLE {table}_old")
+    for definition in indexes:
+        op.execute(definition)
+    for _, name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+
+
+def upgrade() -> None:
+    op.execute(PARTITION_FUNCTIONS)
+
+    interval_unit = context.get_x_argument(as_dictionary=True).get('partition_by_date')
+    if not interval_unit:
+        return
+    if interval_unit not in ('month', 'year'):
+        raise ValueError(f"partition_by_date must be 'month' or 'year', got {interval_unit!r}")
+
+    conn = op.get_bind()
+    # Appointments first: dropping its incoming FK frees visits.appointment_id
+    for table, column in PARTITIONED_TABLES:
+        if table == 'visits':
+            op.execute("ALTER TABLE visits DROP CONSTRAINT visits_appointment_id_key")
+        first = conn.execute(sa.text(f"SELECT min({column})::date FROM {table}")).scalar()
+
+        indexes, foreign_keys = _rebuild(conn, table, f"PARTITION BY RANGE ({column})", f"id, {column}")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        op.execute(sa.text(
+            "INSERT INTO date_partitioning (table_name, column_name, interval_unit) VALUES (:table, :column, :unit)"
+        ).bindparams(table=table, column=column, unit=interval_unit))
+        op.execute(sa.text(
+            "SELECT create_date_partitions(:table, COALESCE(CAST(:first AS date), current_date), "
+            "CAST(current_date + make_interval(months => :ahead) AS date))"
+        ).bindparams(table=table, first=first, ahead=MONTHS_AHEAD))
+        _finish_rebuild(table, indexes, foreign_keys)
+
+    op.create_index('ix_visits_appointment_id', 'visits', ['appointment_id'])
+    op.execute(INTEGRITY_TRIGGERS)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if _is_partitioned(conn, 'visits') or _is_partitioned(conn, 'appointments'):
+        op.execute("DROP TRIGGER IF EXISTS visits_unique_appointment ON visits")
+        op.execute("DROP TRIGGER IF EXISTS visits_cascade_delete ON visits")
+        op.execute("DROP TRIGGER IF EXISTS appointments_cascade_delete ON appointments")
+        op.execute("DROP FUNCTION IF EXISTS visits_unique_appointment()")
+        op.execute("DROP FUNCTION IF EXISTS visits_cascade_delete()")
+        op.execute("DROP FUNCTION IF EXISTS appointments_cascade_delete()")
+        op.drop_index('ix_visits_appointment_id', table_name='visits')
+
+        for table, _ in reversed(PARTITIONED_TABLES):
+            if not _is_partitioned(conn, table):
+                continue
+            # The copy target is a plain table; the old partitioned one goes with its partitions
+            indexes, foreign_keys = _rebuild(conn, table, "", "id")
+            _finish_rebuild(table, indexes, foreign_keys)
+
+        op.create_unique_constraint('visits_appointment_id_key', 'visits', ['appointment_id'])
+        op.create_foreign_key(
+            'visits_appointment_id_fkey', 'visits', 'appointments',
+            ['appointment_id'], ['id'], ondelete='CASCADE'
+        )
+        op.create_foreign_key(
+            'visit_medicines_visit_id_fkey', 'visit_medicines', 'visits',
+            ['visit_id'], ['id'], ondelete='CASCADE'
+        )
+        op.create_foreign_key(
+            'invoices_visit_id_fkey', 'invoices', 'visits',
+            ['visit_id'], ['id'], ondelete='CASCADE'
+        )
+
+    op.execute("DROP FUNCTION IF EXISTS ensure_date_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_date_partitions(text, date, date)")
+    op.execute("DROP TABLE IF EXISTS date_partitioning")
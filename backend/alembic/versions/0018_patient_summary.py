@@ -0,0 +1,130 @@
+"""Denormalized patient summary columns kept up to date by triggers
+
+Revision ID: 0018_patient_summary
+Revises: 0017_date_partitioning
+Create Date: 2026-10-19
+
+visit_count, last_visit_at, last_follow_up_date and outstanding_balance are
+recomputed for the affected patients by statement-level triggers on visits and
+invoices, so every write path (ORM, bulk CTE statements, cascades) keeps them
+current in the same transaction. Rebuild them with
+python -m scripts.rebuild_patient_summaries.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0018_patient_summary'
+down_revision: Union[str, None] = '0017_date_partitioning'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_FUNCTIONS = """
+CREATE FUNCTION refresh_patient_summaries(p_patient_ids text[]) RETURNS integer AS $$
+DECLARE
+    refreshed integer;
+BEGIN
+    UPDATE patients p SET
+        visit_count = v.visit_count,
+        last_visit_at = v.last_visit_at,
+        last_follow_up_date = v.last_follow_up_date,
+        outstanding_balance = COALESCE(i.outstanding_balance, 0),
+        summary_updated_at = now()
+    FROM unnest(p_patient_ids) AS ids(id)
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS visit_count, max(visit_date) AS last_visit_at, max(follow_up_date) AS last_follow_up_date
+        FROM visits WHERE patient_id = ids.id
+    ) v
+    CROSS JOIN LATERAL (
+        SELECT sum(greatest(total_amount - COALESCE(paid_amount, 0), 0)) AS outstanding_balance
+        FROM invoices WHERE patient_id = ids.id
+    ) i
+    WHERE p.id = ids.id;
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION refresh_patient_summaries_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT patient_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT patient_id FROM old_rows));
+    ELSE
+        PERFORM refresh_patient_summaries(ARRAY(
+            SELECT patient_id FROM new_rows UNION SELECT patient_id FROM old_rows
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Postgres allows transition tables only on single-event triggers
+TRIGGER_EVENTS = [
+    ('insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('update', 'UPDATE', 'NEW TABLE AS new_rows OLD TABLE AS old_rows'),
+    ('delete', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('patients', sa.Column('visit_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('patients', sa.Column('last_visit_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('patients', sa.Column('last_follow_up_date', sa.Date(), nullable=True))
+    op.add_column('patients', sa.Column('outstanding_balance', sa.Numeric(10, 2), server_default='0', nullable=False))
+    op.add_column('patients', sa.Column('summary_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill with two grouped passes instead of one lookup per patient
+    op.execute("""
+        UPDATE patients p SET
+            visit_count = v.visit_count,
+            last_visit_at = v.last_visit_at,
+            last_follow_up_date = v.last_follow_up_date,
+            summary_updated_at = now()
+        FROM (
+            SELECT patient_id, count(*) AS visit_count, max(visit_date) AS last_visit_at,
+                   max(follow_up_date) AS last_follow_up_date
+            FROM visits GROUP BY patient_id
+        ) v
+        WHERE p.id = v.patient_id
+    """)
+    op.execute("""
+        UPDATE patients p SET
+            outstanding_balance = i.outstanding_balance,
+            summary_updated_at = now()
+        FROM (
+            SELECT patient_id, sum(greatest(total_amount - COALESCE(paid_amount, 0), 0)) AS outstanding_balance
+            FROM invoices GROUP BY patient_id
+        ) i
+        WHERE p.id = i.patient_id
+    """)
+
+    op.execute(SUMMARY_FUNCTIONS)
+    for table in ('visits', 'invoices'):
+        for name, event, transition in TRIGGER_EVENTS:
+            op.execute(
+                f"CREATE TRIGGER {table}_patient_summary_{name} AFTER {event} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION refresh_patient_summaries_trigger()"
+            )
+
+    op.create_index('ix_patients_clinic_id_last_visit_at', 'patients', ['clinic_id', 'last_visit_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_clinic_id_last_visit_at', table_name='patients')
+    for table in ('visits', 'invoices'):
+        for name, _, _ in TRIGGER_EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_patient_summary_{name} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS refresh_patient_summaries_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_patient_summaries(text[])")
+
+    op.drop_column('patients', 'summary_updated_at')
+    op.drop_column('patients', 'outstanding_balance')
+    op.drop_column('patients', 'last_follow_up_date')
+    op.drop_column('patients', 'last_visit_at')
+    op.drop_column('patients', 'visit_count')
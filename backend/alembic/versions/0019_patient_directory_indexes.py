@@ -0,0 +1,35 @@
+"""Indexes for the keyset-paginated patient directory and its filters
+
+Revision ID: 0019_patient_directory_indexes
+Revises: 0018_patient_summary
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0019_patient_directory_indexes'
+down_revision: Union[str, None] = '0018_patient_summary'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_patients_clinic_id_created_at_id', 'patients', ['clinic_id', 'created_at', 'id'])
+    op.create_index('ix_patients_clinic_id_gender_age', 'patients', ['clinic_id', 'gender', 'age'])
+    op.create_index('ix_patients_clinic_id_blood_group', 'patients', ['clinic_id', 'blood_group'])
+    op.create_index(
+        'ix_patients_with_allergies', 'patients', ['clinic_id', 'created_at'],
+        postgresql_where=sa.text('cardinality(allergies) > 0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_with_allergies', table_name='patients')
+    op.drop_index('ix_patients_clinic_id_blood_group', table_name='patients')
+    op.drop_index('ix_patients_clinic_id_gender_age', table_name='patients')
+    op.drop_index('ix_patients_clinic_id_created_at_id', table_name='patients')
@@ -0,0 +1,36 @@
+"""GIN indexes on the ARRAY columns used by clinical analytics
+
+Revision ID: 0020_array_gin_indexes
+Revises: 0019_patient_directory_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0020_array_gin_indexes'
+down_revision: Union[str, None] = '0019_patient_directory_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GIN_INDEXES = [
+    ('ix_visits_diagnosis_gin', 'visits', 'diagnosis'),
+    ('ix_visits_symptoms_gin', 'visits', 'symptoms'),
+    ('ix_visits_observations_gin', 'visits', 'observations'),
+    ('ix_visits_recommended_tests_gin', 'visits', 'recommended_tests'),
+    ('ix_appointments_chief_complaints_gin', 'appointments', 'chief_complaints'),
+    ('ix_patients_allergies_gin', 'patients', 'allergies'),
+]
+
+
+def upgrade() -> None:
+    for name, table, column in GIN_INDEXES:
+        op.create_index(name, table, [column], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(GIN_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,26 @@
+"""Case-insensitive index on visit_medicines.medicine_name for cohort search
+
+Revision ID: 0021_visit_medicine_name_index
+Revises: 0020_array_gin_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0021_visit_medicine_name_index'
+down_revision: Union[str, None] = '0020_array_gin_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_visit_medicines_medicine_name_lower', 'visit_medicines', [sa.text('lower(medicine_name)')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visit_medicines_medicine_name_lower', table_name='visit_medicines')
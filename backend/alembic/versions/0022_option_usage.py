@@ -0,0 +1,77 @@
+"""Per-doctor option usage statistics for usage-ranked suggestions
+
+Revision ID: 0022_option_usage
+Revises: 0021_visit_medicine_name_index
+Create Date: 2026-10-19
+
+Saving a visit adds its diagnoses, medicines, dosages, durations and medicine
+pairs to option_usage (app/services/option_usage.py). The table is backfilled
+from the existing visits with the default 30-day half-life.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0022_option_usage'
+down_revision: Union[str, None] = '0021_visit_medicine_name_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HALF_LIFE_SECONDS = 30 * 86400
+
+# One row per (visit, option picked on it); UNION counts an option once per visit
+USES = """
+SELECT v.id, v.doctor_id, v.clinic_id, 'diagnosis' AS option_type, '' AS context,
+       lower(trim(d.name)) AS name, v.visit_date AS used_at
+FROM visits v CROSS JOIN LATERAL unnest(v.diagnosis) AS d(name)
+WHERE trim(d.name) <> ''
+UNION
+SELECT v.id, v.doctor_id, v.clinic_id, o.option_type, '', lower(trim(o.name)), v.visit_date
+FROM visit_medicines m
+JOIN visits v ON v.id = m.visit_id
+CROSS JOIN LATERAL (VALUES ('medicine', m.medicine_name), ('dosage', m.dosage), ('duration', m.duration)) AS o(option_type, name)
+WHERE trim(o.name) <> ''
+UNION
+SELECT v.id, v.doctor_id, v.clinic_id, 'medicine', lower(trim(a.medicine_name)), lower(trim(b.medicine_name)), v.visit_date
+FROM visit_medicines a
+JOIN visit_medicines b ON b.visit_id = a.visit_id AND lower(trim(b.medicine_name)) <> lower(trim(a.medicine_name))
+JOIN visits v ON v.id = a.visit_id
+WHERE trim(a.medicine_name) <> '' AND trim(b.medicine_name) <> ''
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'option_usage',
+        sa.Column('doctor_id', sa.String(), sa.ForeignKey('doctors.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('option_type', sa.String(), nullable=False),
+        sa.Column('context', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('clinic_id', sa.String(), sa.ForeignKey('clinics.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('doctor_id', 'option_type', 'context', 'name'),
+    )
+    op.create_index('ix_option_usage_clinic_id', 'option_usage', ['clinic_id'])
+
+    # Each use is worth 1 at its visit date and halves every HALF_LIFE_SECONDS;
+    # the score is stored as of the most recent use (updated_at)
+    op.execute(f"""
+        INSERT INTO option_usage (doctor_id, option_type, context, name, clinic_id, score, updated_at)
+        SELECT doctor_id, option_type, context, name, min(clinic_id),
+               sum(power(0.5, extract(epoch FROM updated_at - used_at) / {HALF_LIFE_SECONDS})),
+               max(updated_at)
+        FROM (
+            SELECT uses.*, max(used_at) OVER (PARTITION BY doctor_id, option_type, context, name) AS updated_at
+            FROM ({USES}) AS uses
+        ) u
+        GROUP BY doctor_id, option_type, context, name
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_option_usage_clinic_id', table_name='option_usage')
+    op.drop_table('option_usage')
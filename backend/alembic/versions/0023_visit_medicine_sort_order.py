@@ -0,0 +1,38 @@
+"""Prescription order for visit medicines
+
+Revision ID: 0023_visit_medicine_sort_order
+Revises: 0022_option_usage
+Create Date: 2026-10-19
+
+Medicines are updated in place when a visit is edited, so their order on the
+prescription can no longer be taken from the physical row order. Existing rows
+are numbered in their current physical order, which is the order they were
+entered in.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0023_visit_medicine_sort_order'
+down_revision: Union[str, None] = '0022_option_usage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('visit_medicines', sa.Column('sort_order', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE visit_medicines vm SET sort_order = numbered.sort_order
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY visit_id ORDER BY ctid) - 1 AS sort_order
+            FROM visit_medicines
+        ) numbered
+        WHERE vm.id = numbered.id AND numbered.sort_order > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('visit_medicines', 'sort_order')
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from datetime import date
 from typing import List, Optional
+from app.core.config import settings
 from app.core.deps import get_db, get_current_user
-from app.models.models import User, Clinic, Doctor, Patient, ClinicAdmin, RoleEnum
+from app.core.invalidation import publish
+from app.core.read_routing import use_read_replica
+from app.models.models import User, Clinic, Doctor, Patient, ClinicAdmin, ClinicPurgeJob, PurgeJobStatusEnum, RoleEnum
 from app.schemas.schemas import (
     ClinicCreate, ClinicResponse, ClinicUpdate, ClinicWithDoctors,
-    DoctorAssignment, AdminDashboardStats, UserCreate, UserResponse,
+    DoctorAssignment, AdminDashboardStats, AdminOverviewResponse, ClinicPurgeJobResponse, UserCreate, UserResponse,
     UserResponseWithPassword, UserUpdateByAdmin, SetClinicOwner
 )
 from app.core.security import get_password_hash
+from app.core.serialization import FastJSONResponse
+from app.services.admin_overview import get_admin_overview
 from app.services.clinic_fixtures import seed_dental_fixtures_for_clinic
+from app.services.clinic_purge import count_clinic_rows, is_resumable, run_purge_job, start_purge_job
+from app.services.deletion import delete_user
 from app.utils.code_generators import generate_doctor_code
 
 
@@ -41,7 +50,7 @@ def require_admin(current_user: User = Depends(get_current_user)):
     return current_user
 
 
-@router.get("/stats", response_model=AdminDashboardStats)
+@router.get("/stats", response_model=AdminDashboardStats, dependencies=[Depends(use_read_replica)])
 async def get_admin_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -59,7 +68,34 @@ async def get_admin_stats(
     )
 
 
-@router.get("/clinics", response_model=List[ClinicResponse])
+@router.get("/overview", response_model=AdminOverviewResponse, dependencies=[Depends(use_read_replica)])
+async def get_admin_overview_page(
+    page: int = Query(1, ge=1),
+    limit: int = Query(25, ge=1, le=100),
+    search: Optional[str] = Query(None, description="Filter by clinic name or code"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Managed clinics with doctors, patients, visits this month and collections
+    this month, computed in one grouped query per page.
+    """
+    clinics, total, (period_start, period_end) = get_admin_overview(
+        db, current_user.id, date.today(), page, limit, search
+    )
+    return {
+        "clinics": clinics,
+        "period": {"start": period_start, "end": period_end},
+        "pagination": {
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "totalPages": (total + limit - 1) // limit if limit > 0 else 0
+        }
+    }
+
+
+@router.get("/clinics", response_model=List[ClinicResponse], dependencies=[Depends(use_read_replica)])
 async def get_admin_clinics(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -132,17 +168,43 @@ async def update_clinic(
     for key, value in clinic_data.dict(exclude_unset=True).items():
         setattr(clinic, key, value)
     
+    publish(db, "clinic", clinic.id, clinic_id=clinic.id)
     db.commit()
     db.refresh(clinic)
     return clinic
 
 
+def purge_job_accepted(job: ClinicPurgeJob) -> FastJSONResponse:
+    return FastJSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=ClinicPurgeJobResponse.model_validate(job).model_dump(),
+    )
+
+
 @router.delete("/clinics/{clinic_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_clinic(
     clinic_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
+    """
+    Delete a clinic and everything in it.
+
+    Small clinics are deleted immediately (204). Large ones are handed to a
+    background purge job (202 with the job; poll /admin/clinic-purge-jobs/{id}).
+    Calling this again for a failed or stalled job resumes it.
+    """
+    existing_job = db.query(ClinicPurgeJob).filter(
+        ClinicPurgeJob.clinic_id == clinic_id,
+        ClinicPurgeJob.requested_by == current_user.id,
+        ClinicPurgeJob.status != PurgeJobStatusEnum.COMPLETED
+    ).first()
+    if existing_job:
+        if is_resumable(existing_job):
+            background_tasks.add_task(run_purge_job, existing_job.id, settings.CLINIC_PURGE_CHUNK_SIZE)
+        return purge_job_accepted(existing_job)
+
     admin_clinic_ids = [ca.clinic_id for ca in current_user.managed_clinics]
     if clinic_id not in admin_clinic_ids:
         raise HTTPException(status_code=404, detail="Clinic not found")
@@ -150,9 +212,36 @@ async def delete_clinic(
     clinic = db.query(Clinic).filter(Clinic.id == clinic_id).first()
     if not clinic:
         raise HTTPException(status_code=404, detail="Clinic not found")
-    
-    db.delete(clinic)
+
+    totals = count_clinic_rows(db, clinic_id)
+    if sum(totals.values()) <= settings.CLINIC_PURGE_THRESHOLD_ROWS:
+        # Children go with ON DELETE CASCADE (passive_deletes), nothing is loaded
+        db.delete(clinic)
+        publish(db, "clinic", clinic.id, clinic_id=clinic.id)
+        db.commit()
+        return
+
+    job = start_purge_job(db, clinic, current_user.id, totals)
     db.commit()
+    db.refresh(job)
+    background_tasks.add_task(run_purge_job, job.id, settings.CLINIC_PURGE_CHUNK_SIZE)
+    return purge_job_accepted(job)
+
+
+@router.get("/clinic-purge-jobs/{job_id}", response_model=ClinicPurgeJobResponse)
+async def get_clinic_purge_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Progress of a background clinic deletion"""
+    job = db.query(ClinicPurgeJob).filter(
+        ClinicPurgeJob.id == job_id,
+        ClinicPurgeJob.requested_by == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return job
 
 
 @router.get("/clinics/{clinic_id}/doctors")
@@ -232,6 +321,7 @@ async def add_doctor_to_clinic(
     if clinic.owner_doctor_id is None:
         clinic.owner_doctor_id = doctor.id
         is_owner = True
+        publish(db, "clinic", clinic.id, clinic_id=clinic.id)
 
     db.commit()
     db.refresh(user)
@@ -294,6 +384,7 @@ async def update_doctor(
     if doctor_data.is_active is not None:
         user.is_active = doctor_data.is_active
     
+    publish(db, "user", user.id, clinic_id=clinic_id)
     db.commit()
     db.refresh(user)
     return user
@@ -333,8 +424,19 @@ async def remove_doctor_from_clinic(
             )
         else:
             clinic.owner_doctor_id = None
+            publish(db, "clinic", clinic.id, clinic_id=clinic.id)
     
-    db.delete(user)
+    # The owner reset must reach the database before the doctor row goes
+    db.flush()
+    try:
+        delete_user(db, user.id, clinic_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Doctor has clinical records and cannot be removed. Deactivate the account instead."
+        )
+    publish(db, "user", user.id, clinic_id=clinic_id)
     db.commit()
 
 
@@ -362,13 +464,14 @@ async def set_clinic_owner(
         raise HTTPException(status_code=404, detail="Doctor not found in this clinic")
     
     clinic.owner_doctor_id = doctor.id
+    publish(db, "clinic", clinic.id, clinic_id=clinic.id)
     db.commit()
     db.refresh(clinic)
 
     return clinic
 
 
-@router.get("/doctors")
+@router.get("/doctors", dependencies=[Depends(use_read_replica)])
 async def get_all_doctors(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
@@ -0,0 +1,185 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Literal, Optional
+from app.core.cache import analytics_cache
+from app.core.database import get_db
+from app.core.deps import require_permission
+from app.core.read_routing import use_read_replica
+from app.core.serialization import FastJSONResponse, stream_json_list
+from app.models.models import User
+from app.services import clinical_analytics
+
+router = APIRouter(dependencies=[Depends(use_read_replica)])
+
+TermField = Literal["diagnosis", "symptoms", "observations", "recommended_tests", "chief_complaints", "allergies"]
+VisitTermField = Literal["diagnosis", "symptoms", "observations", "recommended_tests"]
+
+
+def report_range(
+    start_date: Optional[date] = Query(None, description="First day (defaults to the start of this quarter)"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive (defaults to today)"),
+):
+    end = end_date or date.today()
+    start = start_date or clinical_analytics.quarter_start(end)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return start, end
+
+
+def cached_report(key: tuple, build):
+    """Reports are cached per (report, clinic, range, parameters) for a few minutes"""
+    result = analytics_cache.get(key)
+    if result is None:
+        result = build()
+        analytics_cache.set(key, result)
+    return FastJSONResponse(result)
+
+
+@router.get("/terms", response_model=dict)
+async def get_top_terms(
+    field: TermField = Query("diagnosis"),
+    limit: int = Query(20, ge=1, le=100),
+    period: tuple = Depends(report_range),
+    current_user: User = Depends(require_permission("can_view_visits")),
+    db: Session = Depends(get_db)
+):
+    """Most frequent diagnoses, symptoms, observations, tests, complaints or allergies"""
+    start, end = period
+    return cached_report(
+        ("terms", current_user.clinic_id, start, end, field, limit),
+        lambda: {
+            "field": field,
+            "start_date": start,
+            "end_date": end,
+            "terms": clinical_analytics.top_terms(db, current_user.clinic_id, field, start, end, limit),
+        },
+    )
+
+
+@router.get("/co-occurring", response_model=dict)
+async def get_co_occurring_terms(
+    term: str = Query(..., min_length=1),
+    field: VisitTermField = Query("diagnosis"),
+    limit: int = Query(20, ge=1, le=100),
+    period: tuple = Depends(report_range),
+    current_user: User = Depends(require_permission("can_view_visits")),
+    db: Session = Depends(get_db)
+):
+    """Values recorded on the same visits as ``term`` (e.g. diagnoses that come with a root canal)"""
+    start, end = period
+
+    def build():
+        visits, terms = clinical_analytics.co_occurring_terms(
+            db, current_user.clinic_id, field, term, start, end, limit
+        )
+        return {"field": field, "term": term, "start_date": start, "end_date": end, "visits": visits, "terms": terms}
+
+    return cached_report(("co-occurring", current_user.clinic_id, start, end, field, term, limit), build)
+
+
+@router.get("/patients", response_model=dict)
+async def get_patients_with_term(
+    term: str = Query(..., min_length=1),
+    field: VisitTermField = Query("diagnosis"),
+    limit: int = Query(100, ge=1, le=500),
+    period: tuple = Depends(report_range),
+    current_user: User = Depends(require_permission("can_view_patients")),
+    db: Session = Depends(get_db)
+):
+    """Patients whose visits in the period recorded ``term``"""
+    start, end = period
+    return cached_report(
+        ("patients", current_user.clinic_id, start, end, field, term, limit),
+        lambda: {
+            "field": field,
+            "term": term,
+            "start_date": start,
+            "end_date": end,
+            "patients": clinical_analytics.patients_with_term(
+                db, current_user.clinic_id, field, term, start, end, limit
+            ),
+        },
+    )
+
+
+@router.get("/cohort")
+async def get_cohort(
+    diagnosis: Optional[List[str]] = Query(None, description="Diagnoses recorded together on one visit"),
+    allergy: Optional[List[str]] = Query(None, description="Allergies the patient has (all of them)"),
+    medicine: Optional[str] = Query(None, description="Medicine prescribed on the visit (case-insensitive)"),
+    start_date: Optional[date] = Query(None, description="Visits on or after this day"),
+    end_date: Optional[date] = Query(None, description="Visits on or before this day"),
+    current_user: User = Depends(require_permission("can_view_patients")),
+    db: Session = Depends(get_db)
+):
+    """
+    Patients matching clinical criteria (e.g. everyone prescribed a recalled
+    medicine since a date), with their matching visit counts. Streamed.
+    """
+    if not (diagnosis or allergy or medicine):
+        raise HTTPException(status_code=400, detail="Give at least one diagnosis, allergy or medicine")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    statement = clinical_analytics.build_cohort_statement(
+        current_user.clinic_id, diagnosis, allergy, medicine, start_date, end_date
+    )
+    # The request's session is closed before the body is sent, so the stream
+    # opens its own connection on the same (primary or replica) engine
+    bind = db.get_bind()
+
+    def rows():
+        with bind.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=500).execute(statement)
+            for row in result.mappings():
+                yield dict(row)
+
+    criteria = {
+        "diagnosis": diagnosis or [],
+        "allergy": allergy or [],
+        "medicine": medicine,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    return StreamingResponse(stream_json_list("patients", rows(), criteria=criteria), media_type="application/json")
+
+
+@router.get("/medicines/by-doctor", response_model=dict)
+async def get_medicine_frequency_by_doctor(
+    limit: int = Query(10, ge=1, le=50, description="Medicines per doctor"),
+    period: tuple = Depends(report_range),
+    current_user: User = Depends(require_permission("can_view_visits")),
+    db: Session = Depends(get_db)
+):
+    """Most prescribed medicines of each doctor"""
+    start, end = period
+    return cached_report(
+        ("medicines-by-doctor", current_user.clinic_id, start, end, limit),
+        lambda: {
+            "start_date": start,
+            "end_date": end,
+            "doctors": clinical_analytics.medicine_frequency_by_doctor(db, current_user.clinic_id, start, end, limit),
+        },
+    )
+
+
+@router.get("/complaints/weekly", response_model=dict)
+async def get_weekly_complaint_trends(
+    terms: Optional[List[str]] = Query(None, description="Complaints to chart (defaults to the most frequent)"),
+    limit: int = Query(10, ge=1, le=50),
+    period: tuple = Depends(report_range),
+    current_user: User = Depends(require_permission("can_view_opd")),
+    db: Session = Depends(get_db)
+):
+    """Chief complaint counts per week"""
+    start, end = period
+    return cached_report(
+        ("complaints-weekly", current_user.clinic_id, start, end, tuple(terms or ()), limit),
+        lambda: {
+            "start_date": start,
+            "end_date": end,
+            "weeks": clinical_analytics.weekly_complaint_trends(db, current_user.clinic_id, start, end, terms, limit),
+        },
+    )
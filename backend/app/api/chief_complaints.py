@@ -3,8 +3,10 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
+from app.core.invalidation import publish
 from app.models.models import User, ChiefComplaint
 from app.schemas.schemas import ChiefComplaintCreate, ChiefComplaintUpdate, ChiefComplaintResponse
+from app.services.option_lists import load_option_list
 
 router = APIRouter()
 
@@ -16,14 +18,7 @@ async def get_chief_complaints(
     db: Session = Depends(get_db)
 ):
     """Get all chief complaints for the clinic"""
-    query = db.query(ChiefComplaint).filter(
-        ChiefComplaint.clinic_id == current_user.clinic_id
-    )
-    
-    if active_only:
-        query = query.filter(ChiefComplaint.is_active == True)
-    
-    complaints = query.order_by(ChiefComplaint.display_order.asc()).all()
+    complaints = load_option_list(db, ChiefComplaint, ChiefComplaintResponse, "chief_complaint", current_user.clinic_id, active_only)
     return complaints
 
 
@@ -43,6 +38,7 @@ async def create_chief_complaint(
     )
     
     db.add(complaint)
+    publish(db, "chief_complaint", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(complaint)
     return complaint
@@ -73,6 +69,7 @@ async def update_chief_complaint(
     if complaint_data.display_order is not None:
         complaint.display_order = complaint_data.display_order
     
+    publish(db, "chief_complaint", complaint.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(complaint)
     return complaint
@@ -94,5 +91,6 @@ async def delete_chief_complaint(
         raise HTTPException(status_code=404, detail="Chief complaint not found")
     
     db.delete(complaint)
+    publish(db, "chief_complaint", complaint.id, clinic_id=current_user.clinic_id)
     db.commit()
     return None
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.invalidation import publish
+from app.core.conditional import ConditionalGet, latest
 from app.core.deps import get_current_user, get_current_doctor
 from app.models.models import User, Clinic, Doctor
 from app.schemas.schemas import ClinicUpdate, DoctorUpdate
@@ -41,7 +43,8 @@ def doctor_to_dict(doctor):
 @router.get("/", response_model=dict)
 async def get_clinic_info(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(ConditionalGet)
 ):
     """Get clinic information"""
     clinic = db.query(Clinic).filter(Clinic.id == current_user.clinic_id).first()
@@ -49,6 +52,14 @@ async def get_clinic_info(
     if not clinic:
         raise HTTPException(status_code=404, detail="Clinic not found")
 
+    # is_owner depends on the caller, so the user is part of the version
+    not_modified = conditional.evaluate(
+        clinic.id, clinic.created_at, clinic.updated_at, clinic.owner_doctor_id, current_user.id,
+        last_modified=latest(clinic.created_at, clinic.updated_at)
+    )
+    if not_modified:
+        return not_modified
+
     is_owner = False
     if current_user.role.value == "DOCTOR":
         doctor = db.query(Doctor).filter(Doctor.user_id == current_user.id).first()
@@ -78,6 +89,7 @@ async def update_clinic(
     for field, value in update_data.items():
         setattr(clinic, field, value)
 
+    publish(db, "clinic", clinic.id, clinic_id=clinic.id)
     db.commit()
     db.refresh(clinic)
 
@@ -108,7 +120,8 @@ async def get_clinic_doctors(
 @router.get("/doctor-profile", response_model=dict)
 async def get_doctor_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(ConditionalGet)
 ):
     """Get doctor profile"""
     doctor = db.query(Doctor).filter(Doctor.clinic_id == current_user.clinic_id).first()
@@ -116,6 +129,13 @@ async def get_doctor_profile(
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor profile not found")
 
+    not_modified = conditional.evaluate(
+        doctor.id, doctor.created_at, doctor.updated_at,
+        last_modified=latest(doctor.created_at, doctor.updated_at)
+    )
+    if not_modified:
+        return not_modified
+
     return {"doctor": doctor_to_dict(doctor)}
 
 
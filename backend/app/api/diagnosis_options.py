@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import publish
 from app.models.models import User, DiagnosisOption, RoleEnum
 from app.schemas.schemas import (
     DiagnosisOptionCreate,
     DiagnosisOptionUpdate,
     DiagnosisOptionResponse
 )
+from app.services.option_lists import load_option_list
+from app.services.option_usage import rank_options_for_user
 
 router = APIRouter(tags=["Diagnosis Options"])
 
@@ -22,13 +25,15 @@ def require_doctor(current_user: User = Depends(get_current_user)):
 @router.get("/", response_model=List[DiagnosisOptionResponse])
 def get_diagnosis_options(
     active_only: bool = True,
+    rank: Literal["display", "usage"] = Query("display", description="usage: the current doctor's most used first"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Return only the first options"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(DiagnosisOption).filter(DiagnosisOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(DiagnosisOption.is_active == True)
-    return query.order_by(DiagnosisOption.display_order, DiagnosisOption.name).all()
+    options = load_option_list(db, DiagnosisOption, DiagnosisOptionResponse, "diagnosis_option", current_user.clinic_id, active_only)
+    if rank == "usage":
+        return rank_options_for_user(db, current_user, "diagnosis", options, limit)
+    return options[:limit] if limit else options
 
 
 @router.post("/", response_model=DiagnosisOptionResponse)
@@ -45,6 +50,7 @@ def create_diagnosis_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "diagnosis_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +79,7 @@ def update_diagnosis_option(
     if data.display_order is not None:
         option.display_order = data.display_order
     
+    publish(db, "diagnosis_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +99,6 @@ def delete_diagnosis_option(
         raise HTTPException(status_code=404, detail="Diagnosis option not found")
     
     db.delete(option)
+    publish(db, "diagnosis_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Diagnosis option deleted"}
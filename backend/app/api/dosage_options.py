@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import publish
 from app.models.models import User, DosageOption, RoleEnum
 from app.schemas.schemas import (
     DosageOptionCreate,
     DosageOptionUpdate,
     DosageOptionResponse
 )
+from app.services.option_lists import load_option_list
+from app.services.option_usage import rank_options_for_user
 
 router = APIRouter(tags=["Dosage Options"])
 
@@ -22,13 +25,15 @@ def require_doctor(current_user: User = Depends(get_current_user)):
 @router.get("/", response_model=List[DosageOptionResponse])
 def get_dosage_options(
     active_only: bool = True,
+    rank: Literal["display", "usage"] = Query("display", description="usage: the current doctor's most used first"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Return only the first options"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(DosageOption).filter(DosageOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(DosageOption.is_active == True)
-    return query.order_by(DosageOption.display_order, DosageOption.name).all()
+    options = load_option_list(db, DosageOption, DosageOptionResponse, "dosage_option", current_user.clinic_id, active_only)
+    if rank == "usage":
+        return rank_options_for_user(db, current_user, "dosage", options, limit)
+    return options[:limit] if limit else options
 
 
 @router.post("/", response_model=DosageOptionResponse)
@@ -45,6 +50,7 @@ def create_dosage_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "dosage_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +79,7 @@ def update_dosage_option(
     if data.display_order is not None:
         option.display_order = data.display_order
 
+    publish(db, "dosage_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +99,6 @@ def delete_dosage_option(
         raise HTTPException(status_code=404, detail="Dosage option not found")
 
     db.delete(option)
+    publish(db, "dosage_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Dosage option deleted"}
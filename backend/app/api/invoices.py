@@ -1,17 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 from datetime import datetime
 from decimal import Decimal
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
+from app.core.read_routing import use_read_replica
+from app.core.serialization import FastJSONResponse, RowSerializer
 from app.models.models import User, Invoice, InvoiceItem
-from app.schemas.schemas import InvoiceCreate, InvoiceUpdate
+from app.schemas.schemas import InvoiceCreate, InvoiceUpdate, InvoiceDetailResponse
 
 router = APIRouter()
 
+invoice_serializer = RowSerializer(InvoiceDetailResponse)
 
-@router.get("/", response_model=dict)
+
+@router.get("/", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_all_invoices(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
@@ -28,17 +32,19 @@ async def get_all_invoices(
         query = query.filter(Invoice.payment_status == status)
 
     total = query.count()
-    invoices = query.order_by(Invoice.created_at.desc()).offset(skip).limit(limit).all()
+    invoices = query.options(selectinload(Invoice.items)).order_by(
+        Invoice.created_at.desc()
+    ).offset(skip).limit(limit).all()
 
-    return {
-        "invoices": invoices,
+    return FastJSONResponse({
+        "invoices": invoice_serializer.many(invoices),
         "pagination": {
             "total": total,
             "page": page,
             "limit": limit,
             "totalPages": (total + limit - 1) // limit
         }
-    }
+    })
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -95,7 +101,10 @@ async def create_invoice(
     db.commit()
     db.refresh(invoice)
 
-    return {"message": "Invoice created successfully", "invoice": invoice}
+    return FastJSONResponse(
+        {"message": "Invoice created successfully", "invoice": invoice_serializer.one(invoice)},
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/{invoice_id}", response_model=dict)
@@ -113,7 +122,7 @@ async def get_invoice_by_id(
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
 
-    return {"invoice": invoice}
+    return FastJSONResponse({"invoice": invoice_serializer.one(invoice)})
 
 
 @router.put("/{invoice_id}", response_model=dict)
@@ -139,10 +148,10 @@ async def update_invoice(
     db.commit()
     db.refresh(invoice)
 
-    return {"message": "Invoice updated successfully", "invoice": invoice}
+    return FastJSONResponse({"message": "Invoice updated successfully", "invoice": invoice_serializer.one(invoice)})
 
 
-@router.get("/stats/summary", response_model=dict)
+@router.get("/stats/summary", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_billing_stats(
     start_date: str = Query(None),
     end_date: str = Query(None),
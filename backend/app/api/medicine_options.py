@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_doctor_id
+from app.core.invalidation import publish
 from app.models.models import User, MedicineOption, RoleEnum
 from app.schemas.schemas import (
     MedicineOptionCreate,
     MedicineOptionUpdate,
     MedicineOptionResponse
 )
+from app.services.option_lists import load_option_list
+from app.services.option_usage import get_doctor_usage, normalize, rank_options_for_user
 
 router = APIRouter(tags=["Medicine Options"])
 
@@ -22,13 +25,32 @@ def require_doctor(current_user: User = Depends(get_current_user)):
 @router.get("/", response_model=List[MedicineOptionResponse])
 def get_medicine_options(
     active_only: bool = True,
+    rank: Literal["display", "usage"] = Query("display", description="usage: the current doctor's most used first"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Return only the first options"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(MedicineOption).filter(MedicineOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(MedicineOption.is_active == True)
-    return query.order_by(MedicineOption.display_order, MedicineOption.name).all()
+    options = load_option_list(db, MedicineOption, MedicineOptionResponse, "medicine_option", current_user.clinic_id, active_only)
+    if rank == "usage":
+        return rank_options_for_user(db, current_user, "medicine", options, limit)
+    return options[:limit] if limit else options
+
+
+@router.get("/co-prescribed", response_model=List[MedicineOptionResponse])
+def get_co_prescribed_medicines(
+    medicine: str = Query(..., min_length=1, description="The medicine just chosen"),
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Active medicine options the current doctor most often prescribes together with ``medicine``"""
+    doctor_id = get_doctor_id(db, current_user.id)
+    if doctor_id is None:
+        return []
+    # Ask for a few extra names: free-text medicines without an option are skipped
+    ranked = get_doctor_usage(db, doctor_id).co_prescribed(db, medicine, limit * 2)
+    by_name = {normalize(option.name): option for option in load_option_list(db, MedicineOption, MedicineOptionResponse, "medicine_option", current_user.clinic_id)}
+    return [by_name[name] for name, _ in ranked if name in by_name][:limit]
 
 
 @router.post("/", response_model=MedicineOptionResponse)
@@ -45,6 +67,7 @@ def create_medicine_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "medicine_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +96,7 @@ def update_medicine_option(
     if data.display_order is not None:
         option.display_order = data.display_order
 
+    publish(db, "medicine_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +116,6 @@ def delete_medicine_option(
         raise HTTPException(status_code=404, detail="Medicine option not found")
 
     db.delete(option)
+    publish(db, "medicine_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Medicine option deleted"}
@@ -3,12 +3,14 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import publish
 from app.models.models import User, ObservationOption, RoleEnum
 from app.schemas.schemas import (
     ObservationOptionCreate,
     ObservationOptionUpdate,
     ObservationOptionResponse
 )
+from app.services.option_lists import load_option_list
 
 router = APIRouter(tags=["Observation Options"])
 
@@ -25,10 +27,8 @@ def get_observation_options(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(ObservationOption).filter(ObservationOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(ObservationOption.is_active == True)
-    return query.order_by(ObservationOption.display_order, ObservationOption.name).all()
+    options = load_option_list(db, ObservationOption, ObservationOptionResponse, "observation_option", current_user.clinic_id, active_only)
+    return options
 
 
 @router.post("/", response_model=ObservationOptionResponse)
@@ -45,6 +45,7 @@ def create_observation_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "observation_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +74,7 @@ def update_observation_option(
     if data.display_order is not None:
         option.display_order = data.display_order
     
+    publish(db, "observation_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +94,6 @@ def delete_observation_option(
         raise HTTPException(status_code=404, detail="Observation option not found")
     
     db.delete(option)
+    publish(db, "observation_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Observation option deleted"}
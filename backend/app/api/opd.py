@@ -3,28 +3,27 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from datetime import date, datetime
 from typing import Optional
+from app.core.cache import coalesced_response_cache
+from app.core.coalescing import SingleFlight
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
+from app.core.invalidation import publish
 from app.models.models import User, Appointment, Invoice, Patient, AppointmentStatusEnum, Visit, Doctor
 from app.schemas.schemas import AppointmentCreate, AppointmentUpdate, AppointmentPositionUpdate
 
 router = APIRouter()
 
+# Every open OPD screen polls the queue, stats and follow-ups; identical polls share one computation
+opd_reads = SingleFlight(coalesced_response_cache, settings.COALESCE_TTL_SECONDS, settings.COALESCING_ENABLED)
 
-@router.get("/queue", response_model=dict)
-async def get_queue(
-    queue_date: Optional[date] = Query(None, description="Date to filter queue (defaults to today)"),
-    current_user: User = Depends(require_permission("can_view_opd")),
-    db: Session = Depends(get_db)
-):
-    """Get OPD queue for a specific date (defaults to today)"""
-    target_date = queue_date or date.today()
 
+def build_queue(db: Session, clinic_id: str, target_date: date) -> dict:
     appointments = db.query(Appointment).options(
         joinedload(Appointment.patient),
         joinedload(Appointment.visit).joinedload(Visit.doctor).joinedload(Doctor.user)
     ).filter(
-        Appointment.clinic_id == current_user.clinic_id,
+        Appointment.clinic_id == clinic_id,
         Appointment.appointment_date == target_date
     ).order_by(Appointment.queue_number.asc()).all()
 
@@ -49,7 +48,7 @@ async def get_queue(
             visit_info = {
                 "id": apt.visit.id,
                 "amount": float(apt.visit.amount) if apt.visit.amount else None,
-                "follow_up_date": apt.visit.follow_up_date.isoformat() if apt.visit.follow_up_date else None,
+                "follow_up_date": apt.visit.follow_up_date,
             }
 
         queue.append({
@@ -68,42 +67,46 @@ async def get_queue(
             "queue_number": apt.queue_number,
             "chief_complaints": apt.chief_complaints or [],
             "status": apt.status.value,
-            "created_at": apt.created_at.isoformat() if apt.created_at else None,
+            "created_at": apt.created_at,
             "doctor": doctor_info,
             "visit": visit_info,
         })
 
-    return {"queue": queue, "date": target_date.isoformat()}
+    return {"queue": queue, "date": target_date}
 
 
-@router.get("/stats", response_model=dict)
-async def get_daily_stats(
-    stats_date: Optional[date] = Query(None, description="Date to get stats for (defaults to today)"),
+@router.get("/queue", response_model=dict)
+async def get_queue(
+    queue_date: Optional[date] = Query(None, description="Date to filter queue (defaults to today)"),
     current_user: User = Depends(require_permission("can_view_opd")),
     db: Session = Depends(get_db)
 ):
-    """Get daily statistics for a specific date"""
-    target_date = stats_date or date.today()
+    """Get OPD queue for a specific date (defaults to today)"""
+    target_date = queue_date or date.today()
+    clinic_id = current_user.clinic_id
+    return await opd_reads.respond("queue", clinic_id, target_date, lambda: build_queue(db, clinic_id, target_date))
+
 
+def build_daily_stats(db: Session, clinic_id: str, target_date: date) -> dict:
     total = db.query(Appointment).filter(
-        Appointment.clinic_id == current_user.clinic_id,
+        Appointment.clinic_id == clinic_id,
         Appointment.appointment_date == target_date
     ).count()
 
     waiting = db.query(Appointment).filter(
-        Appointment.clinic_id == current_user.clinic_id,
+        Appointment.clinic_id == clinic_id,
         Appointment.appointment_date == target_date,
         Appointment.status == AppointmentStatusEnum.WAITING
     ).count()
 
     in_progress = db.query(Appointment).filter(
-        Appointment.clinic_id == current_user.clinic_id,
+        Appointment.clinic_id == clinic_id,
         Appointment.appointment_date == target_date,
         Appointment.status == AppointmentStatusEnum.IN_PROGRESS
     ).count()
 
     completed = db.query(Appointment).filter(
-        Appointment.clinic_id == current_user.clinic_id,
+        Appointment.clinic_id == clinic_id,
         Appointment.appointment_date == target_date,
         Appointment.status == AppointmentStatusEnum.COMPLETED
     ).count()
@@ -115,10 +118,22 @@ async def get_daily_stats(
             "waiting": waiting,
             "inProgress": in_progress
         },
-        "date": target_date.isoformat()
+        "date": target_date
     }
 
 
+@router.get("/stats", response_model=dict)
+async def get_daily_stats(
+    stats_date: Optional[date] = Query(None, description="Date to get stats for (defaults to today)"),
+    current_user: User = Depends(require_permission("can_view_opd")),
+    db: Session = Depends(get_db)
+):
+    """Get daily statistics for a specific date"""
+    target_date = stats_date or date.today()
+    clinic_id = current_user.clinic_id
+    return await opd_reads.respond("stats", clinic_id, target_date, lambda: build_daily_stats(db, clinic_id, target_date))
+
+
 @router.post("/appointments/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def add_to_queue(
     appointment_data: AppointmentCreate,
@@ -147,6 +162,7 @@ async def add_to_queue(
     )
 
     db.add(appointment)
+    publish(db, "opd_day", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(appointment)
 
@@ -171,7 +187,8 @@ async def update_queue_status(
 
     if status_data.status:
         appointment.status = status_data.status
-    
+
+    publish(db, "opd_day", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(appointment)
 
@@ -221,24 +238,17 @@ async def update_queue_position(
                 apt.queue_number -= 1
 
     appointment.queue_number = new_position
+    publish(db, "opd_day", clinic_id=current_user.clinic_id)
     db.commit()
 
     return {"message": "Position updated", "appointment": {"id": appointment.id, "queue_number": appointment.queue_number}}
 
 
-@router.get("/follow-ups-due", response_model=dict)
-async def get_follow_ups_due(
-    target_date: Optional[date] = Query(None, description="Date to check follow-ups (defaults to today)"),
-    current_user: User = Depends(require_permission("can_view_opd")),
-    db: Session = Depends(get_db)
-):
-    """Get patients with follow-ups due on a specific date (defaults to today)"""
-    check_date = target_date or date.today()
-
+def build_follow_ups_due(db: Session, clinic_id: str, check_date: date) -> dict:
     visits = db.query(Visit).options(
         joinedload(Visit.patient)
     ).filter(
-        Visit.clinic_id == current_user.clinic_id,
+        Visit.clinic_id == clinic_id,
         Visit.follow_up_date == check_date
     ).all()
 
@@ -249,16 +259,30 @@ async def get_follow_ups_due(
                 "patient_id": str(v.patient_id),
                 "patient_name": v.patient.full_name if v.patient else None,
                 "patient_code": v.patient.patient_code if v.patient else None,
-                "last_visit_date": v.visit_date.isoformat() if v.visit_date else None,
+                "last_visit_date": v.visit_date,
                 "diagnosis": v.diagnosis or [],
             }
             for v in visits
         ],
         "count": len(visits),
-        "date": check_date.isoformat()
+        "date": check_date
     }
 
 
+@router.get("/follow-ups-due", response_model=dict)
+async def get_follow_ups_due(
+    target_date: Optional[date] = Query(None, description="Date to check follow-ups (defaults to today)"),
+    current_user: User = Depends(require_permission("can_view_opd")),
+    db: Session = Depends(get_db)
+):
+    """Get patients with follow-ups due on a specific date (defaults to today)"""
+    check_date = target_date or date.today()
+    clinic_id = current_user.clinic_id
+    return await opd_reads.respond(
+        "follow_ups_due", clinic_id, check_date, lambda: build_follow_ups_due(db, clinic_id, check_date)
+    )
+
+
 @router.get("/appointments/{appointment_id}/visit", response_model=dict)
 async def get_visit_by_appointment(
     appointment_id: str,
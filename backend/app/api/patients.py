@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, and_, func, tuple_
+from datetime import date, datetime, timedelta
 from typing import Optional
+from app.core.cache import patient_count_cache
 from app.core.database import get_db
+from app.core.conditional import ConditionalGet, latest
 from app.core.deps import get_current_user, require_permission
-from app.models.models import User, Patient, Visit, VisitMedicine
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.read_routing import use_read_replica
+from app.core.serialization import FastJSONResponse
+from app.models.models import User, Patient, Visit, VisitMedicine, GenderEnum
 from app.schemas.schemas import PatientCreate, PatientUpdate, PatientResponse
+from app.services import deletion
 
 router = APIRouter()
 
@@ -27,28 +34,51 @@ def patient_to_dict(patient):
         "clinic_id": patient.clinic_id,
         "created_by": patient.created_by,
         "created_by_name": patient.creator.full_name if patient.creator else "System",
-        "created_at": patient.created_at.isoformat() if patient.created_at else None,
-        "updated_at": patient.updated_at.isoformat() if patient.updated_at else None,
+        "created_at": patient.created_at,
+        "updated_at": patient.updated_at,
+        "visit_count": patient.visit_count,
+        "last_visit_at": patient.last_visit_at,
+        "last_follow_up_date": patient.last_follow_up_date,
+        "outstanding_balance": float(patient.outstanding_balance or 0),
     }
 
 
-@router.get("/", response_model=dict)
+PATIENT_SORTS = {
+    "created_at": Patient.created_at.desc(),
+    "last_visit": Patient.last_visit_at.desc().nulls_last(),
+    "name": Patient.full_name.asc(),
+}
+
+
+@router.get("/", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_all_patients(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    sort: str = Query("created_at", pattern="^(created_at|last_visit|name)$"),
+    visited_since: Optional[date] = Query(None, description="Only patients with a visit on or after this date"),
+    not_visited_since: Optional[date] = Query(None, description="Only patients with no visit since this date"),
+    has_balance: Optional[bool] = Query(None, description="Only patients with (or without) an outstanding balance"),
     current_user: User = Depends(require_permission("can_view_patients")),
     db: Session = Depends(get_db)
 ):
-    """Get all patients with pagination"""
+    """Get all patients with pagination, sorted and filtered by the summary columns"""
     skip = (page - 1) * limit
 
-    total = db.query(Patient).filter(Patient.clinic_id == current_user.clinic_id).count()
+    query = db.query(Patient).filter(Patient.clinic_id == current_user.clinic_id)
+    if visited_since:
+        query = query.filter(Patient.last_visit_at >= visited_since)
+    if not_visited_since:
+        query = query.filter(or_(Patient.last_visit_at.is_(None), Patient.last_visit_at < not_visited_since))
+    if has_balance is not None:
+        query = query.filter(Patient.outstanding_balance > 0 if has_balance else Patient.outstanding_balance == 0)
 
-    patients = db.query(Patient).filter(
-        Patient.clinic_id == current_user.clinic_id
-    ).order_by(Patient.created_at.desc()).offset(skip).limit(limit).all()
+    total = query.count()
 
-    return {
+    patients = query.options(joinedload(Patient.creator).load_only(User.full_name)).order_by(
+        PATIENT_SORTS[sort], Patient.id
+    ).offset(skip).limit(limit).all()
+
+    return FastJSONResponse({
         "patients": [patient_to_dict(p) for p in patients],
         "pagination": {
             "total": total,
@@ -56,7 +86,75 @@ async def get_all_patients(
             "limit": limit,
             "totalPages": (total + limit - 1) // limit
         }
-    }
+    })
+
+
+@router.get("/directory", response_model=dict, dependencies=[Depends(use_read_replica)])
+async def get_patient_directory(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    gender: Optional[GenderEnum] = None,
+    age_min: Optional[int] = Query(None, ge=0),
+    age_max: Optional[int] = Query(None, ge=0),
+    blood_group: Optional[str] = None,
+    registered_from: Optional[date] = None,
+    registered_to: Optional[date] = Query(None, description="Inclusive"),
+    has_allergies: Optional[bool] = None,
+    include_total: bool = Query(False, description="Also return the number of matching patients (cached briefly)"),
+    current_user: User = Depends(require_permission("can_view_patients")),
+    db: Session = Depends(get_db)
+):
+    """Patient directory, newest first, with keyset pagination on (created_at, id)"""
+    filters = [Patient.clinic_id == current_user.clinic_id]
+    if gender:
+        filters.append(Patient.gender == gender)
+    if age_min is not None:
+        filters.append(Patient.age >= age_min)
+    if age_max is not None:
+        filters.append(Patient.age <= age_max)
+    if blood_group:
+        filters.append(Patient.blood_group == blood_group)
+    if registered_from:
+        filters.append(Patient.created_at >= registered_from)
+    if registered_to:
+        filters.append(Patient.created_at < registered_to + timedelta(days=1))
+    if has_allergies is not None:
+        # Same expression as the partial index ix_patients_with_allergies
+        with_allergies = func.cardinality(Patient.allergies) > 0
+        filters.append(with_allergies if has_allergies else or_(Patient.allergies.is_(None), ~with_allergies))
+
+    page_filters = list(filters)
+    if cursor:
+        created_at, patient_id = decode_cursor(cursor, datetime, str)
+        page_filters.append(tuple_(Patient.created_at, Patient.id) < tuple_(created_at, patient_id))
+
+    # One row more than asked for tells whether there is a next page
+    rows = db.query(Patient).options(
+        joinedload(Patient.creator).load_only(User.full_name)
+    ).filter(*page_filters).order_by(
+        Patient.created_at.desc(), Patient.id.desc()
+    ).limit(limit + 1).all()
+
+    patients = rows[:limit]
+    next_cursor = encode_cursor(patients[-1].created_at, patients[-1].id) if len(rows) > limit else None
+
+    total = None
+    if include_total:
+        key = (
+            current_user.clinic_id, gender, age_min, age_max, blood_group,
+            registered_from, registered_to, has_allergies,
+        )
+        total = patient_count_cache.get(key)
+        if total is None:
+            total = db.query(func.count(Patient.id)).filter(*filters).scalar()
+            patient_count_cache.set(key, total)
+
+    return FastJSONResponse({
+        "patients": [patient_to_dict(p) for p in patients],
+        "next_cursor": next_cursor,
+        "limit": limit,
+        "total": total,
+    })
 
 
 @router.get("/stats", response_model=dict)
@@ -99,21 +197,39 @@ async def search_patients(
         conditions.append(term_condition)
 
     # All term conditions must be satisfied (AND logic)
-    patients = db.query(Patient).filter(
+    patients = db.query(Patient).options(
+        joinedload(Patient.creator).load_only(User.full_name)
+    ).filter(
         Patient.clinic_id == current_user.clinic_id,
         and_(*conditions)
     ).limit(20).all()
 
-    return {"patients": [patient_to_dict(p) for p in patients]}
+    return FastJSONResponse({"patients": [patient_to_dict(p) for p in patients]})
 
 
 @router.get("/{patient_id}", response_model=dict)
 async def get_patient_by_id(
     patient_id: str,
     current_user: User = Depends(require_permission("can_view_patients")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(ConditionalGet)
 ):
     """Get patient by ID"""
+    # Cheap version check first so unchanged patients are answered with 304
+    version = db.query(
+        Patient.id, Patient.created_at, Patient.updated_at, Patient.summary_updated_at, User.full_name
+    ).outerjoin(User, User.id == Patient.created_by).filter(
+        Patient.id == patient_id,
+        Patient.clinic_id == current_user.clinic_id
+    ).first()
+
+    if not version:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    not_modified = conditional.evaluate(*version, last_modified=latest(version.created_at, version.updated_at, version.summary_updated_at))
+    if not_modified:
+        return not_modified
+
     patient = db.query(Patient).filter(
         Patient.id == patient_id,
         Patient.clinic_id == current_user.clinic_id
@@ -122,26 +238,7 @@ async def get_patient_by_id(
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    patient_dict = {
-        "id": patient.id,
-        "patient_code": patient.patient_code,
-        "full_name": patient.full_name,
-        "age": patient.age,
-        "gender": patient.gender,
-        "phone": patient.phone,
-        "emergency_contact": patient.emergency_contact,
-        "address": patient.address,
-        "blood_group": patient.blood_group,
-        "allergies": patient.allergies,
-        "medical_history": patient.medical_history,
-        "clinic_id": patient.clinic_id,
-        "created_by": patient.created_by,
-        "created_at": patient.created_at,
-        "updated_at": patient.updated_at,
-        "created_by_name": patient.creator.full_name if patient.creator else "System"
-    }
-
-    return {"patient": patient_dict}
+    return {"patient": patient_to_dict(patient)}
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -225,22 +322,17 @@ async def delete_patient(
     current_user: User = Depends(require_permission("can_delete_patients")),
     db: Session = Depends(get_db)
 ):
-    """Delete a patient (requires can_delete_patients permission)"""
-    patient = db.query(Patient).filter(
-        Patient.id == patient_id,
-        Patient.clinic_id == current_user.clinic_id
-    ).first()
-
-    if not patient:
+    """Delete a patient and their history (requires can_delete_patients permission)"""
+    deleted = deletion.delete_patient(db, patient_id, current_user.clinic_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    db.delete(patient)
     db.commit()
 
-    return {"message": "Patient deleted successfully"}
+    return {"message": "Patient deleted successfully", "deleted": deleted}
 
 
-@router.get("/{patient_id}/visits", response_model=dict)
+@router.get("/{patient_id}/visits", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_patient_visits(
     patient_id: str,
     current_user: User = Depends(require_permission("can_view_visits")),
@@ -255,7 +347,7 @@ async def get_patient_visits(
     visit_list = []
     for visit in visits:
         # Get medicines for this visit
-        medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit.id).all()
+        medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit.id).order_by(VisitMedicine.sort_order).all()
         medicines_data = [
             {
                 "id": m.id,
@@ -268,7 +360,7 @@ async def get_patient_visits(
 
         visit_list.append({
             "id": visit.id,
-            "visit_date": visit.visit_date.isoformat() if visit.visit_date else None,
+            "visit_date": visit.visit_date,
             "visit_number": visit.visit_number,
             "patient_id": visit.patient_id,
             "doctor_id": visit.doctor_id,
@@ -276,17 +368,17 @@ async def get_patient_visits(
             "diagnosis": visit.diagnosis,
             "observations": visit.observations,
             "recommended_tests": visit.recommended_tests,
-            "follow_up_date": visit.follow_up_date.isoformat() if visit.follow_up_date else None,
+            "follow_up_date": visit.follow_up_date,
             "vitals": visit.vitals,
             "prescription_notes": visit.prescription_notes,
             "medicines": medicines_data,
-            "created_at": visit.created_at.isoformat() if visit.created_at else None,
+            "created_at": visit.created_at,
         })
 
-    return {"visits": visit_list}
+    return FastJSONResponse({"visits": visit_list})
 
 
-@router.get("/{patient_id}/prescriptions", response_model=dict)
+@router.get("/{patient_id}/prescriptions", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_patient_prescriptions(
     patient_id: str,
     current_user: User = Depends(require_permission("can_view_visits")),
@@ -302,7 +394,7 @@ async def get_patient_prescriptions(
     prescription_list = []
     for visit in visits:
         # Get medicines for this visit
-        medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit.id).all()
+        medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit.id).order_by(VisitMedicine.sort_order).all()
 
         # Only include visits that have medicines (prescriptions)
         if not medicines:
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.core.invalidation import publish
 from app.core.deps import require_clinic_owner, DEFAULT_ASSISTANT_PERMISSIONS, DEFAULT_DOCTOR_PERMISSIONS
 from app.models.models import User, UserPermission, Doctor, Clinic, RoleEnum
 from app.schemas.schemas import UserPermissionUpdate, UserPermissionResponse, UserWithPermissions
@@ -144,6 +145,7 @@ async def update_user_permissions(
     for field, value in update_data.items():
         setattr(permission, field, value)
 
+    publish(db, "permission", user_id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(permission)
 
@@ -194,6 +196,7 @@ async def reset_user_permissions(
         for field, value in defaults.items():
             setattr(permission, field, value)
 
+    publish(db, "permission", user_id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(permission)
 
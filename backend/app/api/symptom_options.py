@@ -3,12 +3,14 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import publish
 from app.models.models import User, SymptomOption, RoleEnum
 from app.schemas.schemas import (
     SymptomOptionCreate,
     SymptomOptionUpdate,
     SymptomOptionResponse
 )
+from app.services.option_lists import load_option_list
 
 router = APIRouter(tags=["Symptom Options"])
 
@@ -25,10 +27,8 @@ def get_symptom_options(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(SymptomOption).filter(SymptomOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(SymptomOption.is_active == True)
-    return query.order_by(SymptomOption.display_order, SymptomOption.name).all()
+    options = load_option_list(db, SymptomOption, SymptomOptionResponse, "symptom_option", current_user.clinic_id, active_only)
+    return options
 
 
 @router.post("/", response_model=SymptomOptionResponse)
@@ -45,6 +45,7 @@ def create_symptom_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "symptom_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +74,7 @@ def update_symptom_option(
     if data.display_order is not None:
         option.display_order = data.display_order
 
+    publish(db, "symptom_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +94,6 @@ def delete_symptom_option(
         raise HTTPException(status_code=404, detail="Symptom option not found")
 
     db.delete(option)
+    publish(db, "symptom_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Symptom option deleted"}
@@ -3,12 +3,14 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import publish
 from app.models.models import User, TestOption, RoleEnum
 from app.schemas.schemas import (
     TestOptionCreate,
     TestOptionUpdate,
     TestOptionResponse
 )
+from app.services.option_lists import load_option_list
 
 router = APIRouter(tags=["Test Options"])
 
@@ -25,10 +27,8 @@ def get_test_options(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(TestOption).filter(TestOption.clinic_id == current_user.clinic_id)
-    if active_only:
-        query = query.filter(TestOption.is_active == True)
-    return query.order_by(TestOption.display_order, TestOption.name).all()
+    options = load_option_list(db, TestOption, TestOptionResponse, "test_option", current_user.clinic_id, active_only)
+    return options
 
 
 @router.post("/", response_model=TestOptionResponse)
@@ -45,6 +45,7 @@ def create_test_option(
         clinic_id=current_user.clinic_id
     )
     db.add(option)
+    publish(db, "test_option", clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -73,6 +74,7 @@ def update_test_option(
     if data.display_order is not None:
         option.display_order = data.display_order
 
+    publish(db, "test_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     db.refresh(option)
     return option
@@ -92,5 +94,6 @@ def delete_test_option(
         raise HTTPException(status_code=404, detail="Test option not found")
 
     db.delete(option)
+    publish(db, "test_option", option.id, clinic_id=current_user.clinic_id)
     db.commit()
     return {"message": "Test option deleted"}
@@ -6,10 +6,12 @@ import string
 import logging
 from datetime import datetime, timezone
 from app.core.database import get_db
+from app.core.invalidation import publish
 from app.core.deps import get_current_doctor, require_clinic_owner
 from app.core.security import get_password_hash
 from app.models.models import User, Doctor, Clinic, RoleEnum, UserPermission
 from app.schemas.schemas import UserCreate, UserUpdate, UserResponse, SubUserCreate, SubUserResponse, SubUserStats
+from app.services import deletion
 from app.utils.code_generators import generate_doctor_code
 
 logger = logging.getLogger(__name__)
@@ -223,6 +225,7 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
 
+    publish(db, "user", user.id, clinic_id=user.clinic_id)
     db.commit()
     db.refresh(user)
 
@@ -252,18 +255,22 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
 
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.clinic_id == current_user.clinic_id
-    ).first()
+    try:
+        deleted = deletion.delete_user(db, user_id, current_user.clinic_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User has clinical records and cannot be deleted. Deactivate the account instead."
+        )
 
-    if not user:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
+    publish(db, "user", user_id, clinic_id=current_user.clinic_id)
     db.commit()
 
-    return {"message": "User deleted successfully"}
+    return {"message": "User deleted successfully", "deleted": deleted}
 
 
 @router.get("/stats", response_model=SubUserStats)
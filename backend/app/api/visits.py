@@ -1,18 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, cast, Date
-from datetime import date, datetime
+from sqlalchemy import or_, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from datetime import date, datetime, time, timedelta
 from typing import Optional, Literal
 from collections import defaultdict
 from app.core.database import get_db
-from app.core.deps import get_current_user, require_permission
-from app.models.models import User, Visit, Appointment, AppointmentStatusEnum, Doctor, Patient, VisitMedicine, User as UserModel
+from app.core.conditional import ConditionalGet
+from app.core.deps import get_doctor_id, require_permission
+from app.core.invalidation import publish
+from app.core.read_routing import use_read_replica
+from app.core.serialization import FastJSONResponse, RowSerializer
+from app.models.models import User, Visit, Doctor, Patient, VisitMedicine, User as UserModel
 from app.schemas.schemas import VisitCreate, VisitUpdate, CollectionSummaryResponse
+from app.services.option_usage import record_option_usage, visit_option_uses
+from app.services.visit_medicines import load_visit_medicines, sync_visit_medicines
+from app.services.visit_writer import save_visit
 
 router = APIRouter()
 
+collection_summary_serializer = RowSerializer(CollectionSummaryResponse)
 
-@router.get("/collections/summary", response_model=CollectionSummaryResponse)
+
+@router.get("/collections/summary", response_model=CollectionSummaryResponse, dependencies=[Depends(use_read_replica)])
 async def get_collection_summary(
     start_date: Optional[date] = Query(None, description="Start date for collection period (defaults to today)"),
     end_date: Optional[date] = Query(None, description="End date for collection period (defaults to today)"),
@@ -31,16 +41,28 @@ async def get_collection_summary(
     if not end_date:
         end_date = date.today()
 
-    # Query visits with amounts for the clinic within date range
-    query = db.query(Visit).join(
+    # Query visits with amounts for the clinic within date range. A plain range on visit_date
+    # (not a cast to date) lets ix_visits_clinic_id_visit_date bound the scan and prunes date
+    # partitions; the naive bounds are read in the database session's timezone, the same one
+    # visit dates are written and the old ::date cast was evaluated in
+    query = db.query(
+        Visit.id,
+        Visit.visit_date,
+        Visit.amount,
+        Patient.full_name.label("patient_name"),
+        Patient.patient_code,
+        UserModel.full_name.label("doctor_name"),
+    ).join(
         Patient, Visit.patient_id == Patient.id
     ).join(
         Doctor, Visit.doctor_id == Doctor.id
+    ).outerjoin(
+        UserModel, UserModel.id == Doctor.user_id
     ).filter(
         Visit.clinic_id == current_user.clinic_id,
         Visit.amount.isnot(None),
-        cast(Visit.visit_date, Date) >= start_date,
-        cast(Visit.visit_date, Date) <= end_date
+        Visit.visit_date >= datetime.combine(start_date, time.min),
+        Visit.visit_date < datetime.combine(end_date + timedelta(days=1), time.min)
     )
 
     # Apply doctor filter if provided
@@ -49,9 +71,12 @@ async def get_collection_summary(
 
     query = query.order_by(Visit.visit_date.desc())
 
-    visits = query.all()
+    # Patient and doctor names come with the visits in the same query
+    return FastJSONResponse(build_collection_summary(query.all(), group_by, start_date, end_date))
 
-    # Group visits by date
+
+def build_collection_summary(visits, group_by: str, start_date: date, end_date: date) -> dict:
+    """Group collection rows (newest first) by day or month, validated against CollectionSummaryResponse"""
     grouped_data = defaultdict(lambda: {"total": 0.0, "visits": []})
     total_collection = 0.0
 
@@ -62,19 +87,14 @@ async def get_collection_summary(
         else:
             date_key = visit.visit_date.strftime("%Y-%m-%d")
 
-        # Get patient and doctor info
-        patient = db.query(Patient).filter(Patient.id == visit.patient_id).first()
-        doctor = db.query(Doctor).filter(Doctor.id == visit.doctor_id).first()
-        doctor_user = db.query(UserModel).filter(UserModel.id == doctor.user_id).first() if doctor else None
-
         amount = float(visit.amount) if visit.amount else 0.0
         total_collection += amount
         grouped_data[date_key]["total"] += amount
         grouped_data[date_key]["visits"].append({
             "visit_id": visit.id,
-            "patient_name": patient.full_name if patient else "Unknown",
-            "patient_code": patient.patient_code if patient else "",
-            "doctor_name": doctor_user.full_name if doctor_user else "Unknown",
+            "patient_name": visit.patient_name or "Unknown",
+            "patient_code": visit.patient_code or "",
+            "doctor_name": visit.doctor_name or "Unknown",
             "amount": amount,
             "visit_time": visit.visit_date.strftime("%I:%M %p") if visit.visit_date else ""
         })
@@ -90,7 +110,8 @@ async def get_collection_summary(
             "visits": data["visits"]
         })
 
-    return {
+    # The handler returns a response, which skips FastAPI's response_model check, so validate here
+    return collection_summary_serializer.one({
         "total_collection": total_collection,
         "visit_count": len(visits),
         "period": {
@@ -98,10 +119,10 @@ async def get_collection_summary(
             "end": end_date.isoformat()
         },
         "breakdown": breakdown
-    }
+    })
 
 
-@router.get("/", response_model=dict)
+@router.get("/", response_model=dict, dependencies=[Depends(use_read_replica)])
 async def get_doctor_visits(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
@@ -154,18 +175,18 @@ async def get_doctor_visits(
         patient = db.query(Patient).filter(Patient.id == visit.patient_id).first()
         visit_list.append({
             "id": visit.id,
-            "visit_date": visit.visit_date.isoformat() if visit.visit_date else None,
+            "visit_date": visit.visit_date,
             "visit_number": visit.visit_number,
             "patient_id": visit.patient_id,
             "patient_code": patient.patient_code if patient else None,
             "patient_name": patient.full_name if patient else None,
             "symptoms": visit.symptoms,
             "diagnosis": visit.diagnosis,
-            "follow_up_date": visit.follow_up_date.isoformat() if visit.follow_up_date else None,
-            "created_at": visit.created_at.isoformat() if visit.created_at else None,
+            "follow_up_date": visit.follow_up_date,
+            "created_at": visit.created_at,
         })
 
-    return {
+    return FastJSONResponse({
         "visits": visit_list,
         "pagination": {
             "total": total,
@@ -173,7 +194,7 @@ async def get_doctor_visits(
             "limit": limit,
             "totalPages": (total + limit - 1) // limit if total > 0 else 1
         }
-    }
+    })
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -184,104 +205,58 @@ async def create_visit(
 ):
     """Create a new visit or update existing one if appointment already has a visit"""
     # Get the doctor record for the current user
-    doctor = db.query(Doctor).filter(Doctor.user_id == current_user.id).first()
-    if not doctor:
+    doctor_id = get_doctor_id(db, current_user.id)
+    if not doctor_id:
         raise HTTPException(status_code=400, detail="No doctor profile found for current user")
 
-    # Check if a visit already exists for this appointment (handles OPD reopen case)
-    existing_visit = None
-    if visit_data.appointment_id:
-        existing_visit = db.query(Visit).filter(
-            Visit.appointment_id == visit_data.appointment_id
-        ).first()
-
-    if existing_visit:
-        # Update existing visit instead of creating a new one
-        update_fields = ['symptoms', 'diagnosis', 'observations', 'recommended_tests', 'follow_up_date', 'vitals', 'prescription_notes', 'amount']
-        for field in update_fields:
-            value = getattr(visit_data, field, None)
-            if value is not None:
-                setattr(existing_visit, field, value)
-
-        # Handle medicines update - delete existing and add new
-        if visit_data.medicines is not None:
-            # Delete existing medicines
-            db.query(VisitMedicine).filter(VisitMedicine.visit_id == existing_visit.id).delete()
-            # Add new medicines
-            for med_data in visit_data.medicines:
-                medicine = VisitMedicine(
-                    visit_id=existing_visit.id,
-                    medicine_name=med_data.medicine_name,
-                    dosage=med_data.dosage,
-                    duration=med_data.duration
-                )
-                db.add(medicine)
-
-        # Update appointment status to COMPLETED
-        appointment = db.query(Appointment).filter(
-            Appointment.id == visit_data.appointment_id
-        ).first()
-        if appointment:
-            appointment.status = AppointmentStatusEnum.COMPLETED
-
-        db.commit()
-        db.refresh(existing_visit)
-        return {"message": "Visit updated successfully", "visit_id": existing_visit.id}
-
-    # Create new visit
-    # Get visit number for this patient
-    last_visit = db.query(Visit).filter(
-        Visit.patient_id == visit_data.patient_id
-    ).order_by(Visit.visit_number.desc()).first()
-
-    visit_number = (last_visit.visit_number + 1) if last_visit else 1
-
-    # Exclude medicines from visit_dict as they need separate handling
-    visit_dict = visit_data.model_dump(exclude={'appointment_id', 'doctor_id', 'medicines'})
-    visit = Visit(
-        **visit_dict,
-        doctor_id=visit_data.doctor_id or doctor.id,
-        appointment_id=visit_data.appointment_id,
-        visit_number=visit_number,
-        visit_date=datetime.now(),
-        clinic_id=current_user.clinic_id
-    )
+    try:
+        visit_id, created = save_visit(db, visit_data, doctor_id, current_user.clinic_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-    db.add(visit)
-    db.flush()  # Get the visit ID before adding medicines
-
-    # Add medicines if provided
-    if visit_data.medicines:
-        for med_data in visit_data.medicines:
-            medicine = VisitMedicine(
-                visit_id=visit.id,
-                medicine_name=med_data.medicine_name,
-                dosage=med_data.dosage,
-                duration=med_data.duration
-            )
-            db.add(medicine)
+    if not created:
+        return {"message": "Visit updated successfully", "visit_id": visit_id}
 
-    # Update appointment status if exists
-    if visit_data.appointment_id:
-        appointment = db.query(Appointment).filter(
-            Appointment.id == visit_data.appointment_id
-        ).first()
-        if appointment:
-            appointment.status = AppointmentStatusEnum.COMPLETED
-
-    db.commit()
-    db.refresh(visit)
-
-    return {"message": "Visit created successfully", "visit_id": visit.id}
+    return {"message": "Visit created successfully", "visit_id": visit_id}
 
 
 @router.get("/{visit_id}", response_model=dict)
 async def get_visit_by_id(
     visit_id: str,
     current_user: User = Depends(require_permission("can_view_visits")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(ConditionalGet)
 ):
     """Get visit by ID with patient and medicines details"""
+    # Medicines carry no timestamps, so fingerprint them alongside the updated_at columns
+    medicines_version = db.query(
+        func.md5(func.coalesce(func.string_agg(
+            func.concat_ws(
+                '|', VisitMedicine.id, VisitMedicine.medicine_name, VisitMedicine.dosage, VisitMedicine.duration,
+                VisitMedicine.sort_order,
+            ),
+            aggregate_order_by(literal_column("','"), VisitMedicine.sort_order, VisitMedicine.id)
+        ), ''))
+    ).filter(VisitMedicine.visit_id == Visit.id).correlate(Visit).scalar_subquery()
+
+    version = db.query(
+        Visit.id, Visit.created_at, Visit.updated_at,
+        Patient.updated_at, Doctor.updated_at, User.full_name,
+        medicines_version
+    ).outerjoin(Patient, Patient.id == Visit.patient_id).outerjoin(
+        Doctor, Doctor.id == Visit.doctor_id
+    ).outerjoin(User, User.id == Doctor.user_id).filter(
+        Visit.id == visit_id,
+        Visit.clinic_id == current_user.clinic_id
+    ).first()
+
+    if not version:
+        raise HTTPException(status_code=404, detail="Visit not found")
+
+    not_modified = conditional.evaluate(*version)
+    if not_modified:
+        return not_modified
+
     visit = db.query(Visit).filter(
         Visit.id == visit_id,
         Visit.clinic_id == current_user.clinic_id
@@ -298,7 +273,7 @@ async def get_visit_by_id(
     doctor_user = db.query(User).filter(User.id == doctor.user_id).first() if doctor else None
 
     # Get medicines for this visit
-    medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit_id).all()
+    medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit_id).order_by(VisitMedicine.sort_order).all()
     medicines_data = [
         {
             "id": med.id,
@@ -366,28 +341,39 @@ async def update_visit(
     # Handle medicines separately
     medicines_data = update_data.pop('medicines', None)
 
+    # Usage scores only count what this edit adds or removes
+    existing_medicines = load_visit_medicines(db, visit_id) if medicines_data is not None else []
+    previous_uses = visit_option_uses(visit.diagnosis, existing_medicines)
+
     for field, value in update_data.items():
         setattr(visit, field, value)
 
-    # Handle medicines update if provided
+    # Handle medicines update if provided - resulting rows come back via RETURNING
     if medicines_data is not None:
-        # Delete existing medicines
-        db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit_id).delete()
-        # Add new medicines
-        for med_data in medicines_data:
-            medicine = VisitMedicine(
-                visit_id=visit_id,
-                medicine_name=med_data.get('medicine_name') or med_data.medicine_name,
-                dosage=med_data.get('dosage') if isinstance(med_data, dict) else med_data.dosage,
-                duration=med_data.get('duration') if isinstance(med_data, dict) else med_data.duration
-            )
-            db.add(medicine)
+        medicines = sync_visit_medicines(db, visit_id, medicines_data, existing=existing_medicines)
+
+    record_option_usage(
+        db,
+        visit.doctor_id,
+        visit.clinic_id,
+        visit_option_uses(visit.diagnosis, medicines if medicines_data is not None else []),
+        previous=previous_uses,
+    )
+    publish(db, "opd_day", clinic_id=visit.clinic_id)
 
     db.commit()
     db.refresh(visit)
 
-    # Get updated medicines
-    medicines = db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit_id).all()
+    if medicines_data is None:
+        medicines = [
+            {
+                "id": med.id,
+                "medicine_name": med.medicine_name,
+                "dosage": med.dosage,
+                "duration": med.duration
+            }
+            for med in db.query(VisitMedicine).filter(VisitMedicine.visit_id == visit_id).order_by(VisitMedicine.sort_order).all()
+        ]
 
     return {
         "message": "Visit updated successfully",
@@ -403,14 +389,6 @@ async def update_visit(
             "vitals": visit.vitals,
             "prescription_notes": visit.prescription_notes,
             "amount": float(visit.amount) if visit.amount else None,
-            "medicines": [
-                {
-                    "id": med.id,
-                    "medicine_name": med.medicine_name,
-                    "dosage": med.dosage,
-                    "duration": med.duration
-                }
-                for med in medicines
-            ]
+            "medicines": medicines
         }
     }
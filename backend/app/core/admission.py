@@ -0,0 +1,264 @@
+"""
+Admission control: shed load before requests pile up on the connection pool.
+
+Each worker has only db_pool_size + db_max_overflow connections. Without a
+gate, a burst of report requests checks all of them out and every other
+request waits up to the pool timeout (30 s), so OPD screens look frozen.
+AdmissionControlMiddleware lets at most ``capacity`` API requests run at
+once and queues the rest by traffic class:
+
+- every route belongs to a class (route_classes, longest prefix wins); a
+  class has a priority, a bounded wait queue, a maximum wait and a cap on
+  the slots it may hold, so reports can never take the last slots
+- a free slot goes to the highest-priority class with an eligible waiter;
+  within a class, to the clinic currently holding the fewest slots, so one
+  clinic's export cannot starve the others
+- a full queue or a wait past max_wait_seconds is answered at once with
+  503 and Retry-After instead of a pool timeout; when a class queue is full,
+  the clinic with the most waiters gives up its newest one first
+
+A slot is held until the last chunk of the response body is sent, not until
+the app returns, so background tasks do not count against the capacity.
+
+The clinic of a request comes from the token's user via user_clinic_cache,
+which get_current_user fills; a user's first request is grouped by user id.
+All state lives on the worker's event loop, so no locks are needed.
+snapshot() backs the /metrics/admission endpoint.
+"""
+
+import asyncio
+from collections import Counter, OrderedDict, deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import user_clinic_cache
+from app.core.read_routing import user_id_from_headers
+from app.core.serialization import FastJSONResponse
+
+
+class TrafficClass(NamedTuple):
+    name: str
+    priority: int  # lower is served first
+    queue_limit: int  # waiting requests before new ones are rejected
+    max_wait_seconds: float
+    max_share: float = 1.0  # fraction of the capacity this class may hold
+
+
+DEFAULT_CLASSES = {
+    "critical": TrafficClass("critical", 0, queue_limit=100, max_wait_seconds=10.0),
+    "default": TrafficClass("default", 1, queue_limit=50, max_wait_seconds=5.0),
+    "reports": TrafficClass("reports", 2, queue_limit=10, max_wait_seconds=3.0, max_share=0.5),
+}
+
+
+class AdmissionController:
+    """Slots, per-class wait queues and counters for one worker"""
+
+    def __init__(self, capacity: int, classes: Dict[str, TrafficClass]):
+        self.capacity = max(capacity, 1)
+        self.classes = sorted(classes.values(), key=lambda traffic_class: traffic_class.priority)
+        self.active = 0
+        self.active_by_class: Counter = Counter()
+        self.active_by_clinic: Counter = Counter()
+        # class name -> clinic -> waiting futures, clinics in arrival order
+        self.waiting: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {c.name: OrderedDict() for c in self.classes}
+        self.queued: Counter = Counter()
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.timed_out: Counter = Counter()
+
+    def class_limit(self, traffic_class: TrafficClass) -> int:
+        return max(int(self.capacity * traffic_class.max_share), 1)
+
+    def _has_slot(self, traffic_class: TrafficClass) -> bool:
+        return self.active < self.capacity and self.active_by_class[traffic_class.name] < self.class_limit(traffic_class)
+
+    def _grant(self, traffic_class: TrafficClass, clinic: str) -> None:
+        self.active += 1
+        self.active_by_class[traffic_class.name] += 1
+        self.active_by_clinic[clinic] += 1
+        self.admitted[traffic_class.name] += 1
+
+    def release(self, traffic_class: TrafficClass, clinic: str) -> None:
+        self.active -= 1
+        self.active_by_class[traffic_class.name] -= 1
+        self.active_by_clinic[clinic] -= 1
+        if not self.active_by_clinic[clinic]:
+            del self.active_by_clinic[clinic]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for traffic_class in self.classes:
+            clinics = self.waiting[traffic_class.name]
+            while clinics and self._has_slot(traffic_class):
+                # Fewest slots in use first; ties go to the clinic that has waited longest
+                clinic = min(clinics, key=lambda key: self.active_by_clinic[key])
+                futures = clinics[clinic]
+                future = futures.popleft()
+                self.queued[traffic_class.name] -= 1
+                if futures:
+                    clinics.move_to_end(clinic)
+                else:
+                    del clinics[clinic]
+                if not future.done():
+                    self._grant(traffic_class, clinic)
+                    future.set_result(True)
+            if self.active >= self.capacity:
+                return
+
+    def _must_queue(self, traffic_class: TrafficClass) -> bool:
+        """New requests wait behind anyone already queued in their class or above"""
+        if not self._has_slot(traffic_class):
+            return True
+        return any(self.queued[c.name] for c in self.classes if c.priority <= traffic_class.priority)
+
+    async def acquire(self, traffic_class: TrafficClass, clinic: str) -> bool:
+        """Wait for a slot; False when the request should be shed"""
+        if not self._must_queue(traffic_class):
+            self._grant(traffic_class, clinic)
+            return True
+        if self.queued[traffic_class.name] >= traffic_class.queue_limit and not self._shed_heaviest(traffic_class, clinic):
+            self.rejected[traffic_class.name] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[traffic_class.name].setdefault(clinic, deque()).append(future)
+        self.queued[traffic_class.name] += 1
+        try:
+            return await asyncio.wait_for(future, traffic_class.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return future.result()  # decided as the timer fired
+            self._forget(traffic_class, clinic, future)
+            self.timed_out[traffic_class.name] += 1
+            return False
+        except BaseException:
+            # Client went away: give back a slot granted in the meantime
+            if future.done() and not future.cancelled() and future.result():
+                self.release(traffic_class, clinic)
+            else:
+                self._forget(traffic_class, clinic, future)
+            raise
+
+    def _shed_heaviest(self, traffic_class: TrafficClass, clinic: str) -> bool:
+        """Make room in a full queue by shedding the newest waiter of the clinic queueing the most"""
+        clinics = self.waiting[traffic_class.name]
+        heaviest = max(clinics, key=lambda key: len(clinics[key]))
+        if len(clinics[heaviest]) <= len(clinics.get(clinic, ())) + 1:
+            return False
+        future = clinics[heaviest].pop()
+        self.queued[traffic_class.name] -= 1
+        if not clinics[heaviest]:
+            del clinics[heaviest]
+        if not future.done():
+            self.rejected[traffic_class.name] += 1
+            future.set_result(False)
+        return True
+
+    def _forget(self, traffic_class: TrafficClass, clinic: str, future: asyncio.Future) -> None:
+        futures = self.waiting[traffic_class.name].get(clinic)
+        if futures is not None and future in futures:
+            futures.remove(future)
+            self.queued[traffic_class.name] -= 1
+            if not futures:
+                del self.waiting[traffic_class.name][clinic]
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "classes": {
+                c.name: {
+                    "priority": c.priority,
+                    "active": self.active_by_class[c.name],
+                    "limit": self.class_limit(c),
+                    "waiting": self.queued[c.name],
+                    "waiting_clinics": len(self.waiting[c.name]),
+                    "queue_limit": c.queue_limit,
+                    "admitted": self.admitted[c.name],
+                    "rejected": self.rejected[c.name],
+                    "timed_out": self.timed_out[c.name],
+                }
+                for c in self.classes
+            },
+            "active_clinics": len(self.active_by_clinic),
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Gate requests under ``prefix`` through an AdmissionController.
+
+    ``route_classes`` maps a path prefix, optionally preceded by a method
+    ("POST /api/visits"), to a class name; unmatched paths use "default".
+    Paths in ``exempt`` (health checks, metrics) are never gated.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        route_classes: Optional[Dict[str, str]] = None,
+        prefix: str = "/api/",
+        exempt: List[str] = (),
+        retry_after_seconds: int = 2,
+    ):
+        self.app = app
+        self.controller = controller
+        self.prefix = prefix
+        self.exempt = tuple(exempt)
+        self.retry_after_seconds = retry_after_seconds
+        classes = {c.name: c for c in controller.classes}
+        rules = []
+        for rule, class_name in (route_classes or {}).items():
+            method, _, path = rule.rpartition(" ")
+            rules.append((method or None, path, classes[class_name]))
+        # Longest prefix first so the most specific rule wins; method rules before catch-alls
+        self.rules = sorted(rules, key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+        self.default_class = classes["default"]
+
+    def class_for(self, method: str, path: str) -> TrafficClass:
+        for rule_method, rule_path, traffic_class in self.rules:
+            if path.startswith(rule_path) and rule_method in (None, method):
+                return traffic_class
+        return self.default_class
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.prefix) or path.startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        traffic_class = self.class_for(scope["method"], path)
+        user_id = user_id_from_headers(Headers(scope=scope).get("authorization"))
+        clinic = (user_clinic_cache.get(user_id) or f"user:{user_id}") if user_id else "anonymous"
+
+        if not await self.controller.acquire(traffic_class, clinic):
+            response = FastJSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(traffic_class, clinic)
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            # Background tasks (e.g. the clinic purge job) run after the last body chunk
+            # but inside this call; they must not keep the slot
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
@@ -0,0 +1,82 @@
+"""
+Small in-process caches for values that are read on almost every request.
+
+Each worker process has its own copies. Writes to the underlying rows evict
+them on every worker through app/core/invalidation.py; the TTLs only bound
+staleness if an invalidation is ever missed.
+"""
+
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe dictionary whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # Drop the entry closest to expiry to make room
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# user_id -> doctor_id; a user's doctor profile does not change once created
+doctor_identity_cache = TTLCache(ttl_seconds=600)
+
+# user_id -> clinic_id, for grouping requests by clinic before authentication runs
+user_clinic_cache = TTLCache(ttl_seconds=600)
+
+# clinic_id -> owner_doctor_id
+clinic_owner_cache = TTLCache(ttl_seconds=300)
+
+# user_id -> (clinic_id, {permission: bool}) or (clinic_id, None) when the role defaults apply
+permission_cache = TTLCache(ttl_seconds=300)
+
+# (entity, clinic_id, active_only) -> option list for the visit form dropdowns
+option_list_cache = TTLCache(ttl_seconds=600)
+
+# (clinic_id, directory filters) -> matching patient count; allowed to lag by the TTL
+patient_count_cache = TTLCache(ttl_seconds=60)
+
+# (report, clinic_id, start, end, parameters) -> clinical analytics report
+analytics_cache = TTLCache(ttl_seconds=300, maxsize=2000)
+
+# clinic_id -> {(route, params): (expires_at, body)} for coalesced OPD reads (app/core/coalescing.py)
+coalesced_response_cache = TTLCache(ttl_seconds=60)
+
+# doctor_id -> DoctorUsage (app/services/option_usage.py) for usage-ranked option lists
+option_usage_cache = TTLCache(ttl_seconds=600)
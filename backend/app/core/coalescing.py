@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing for identical concurrent reads.
+
+Every open OPD screen in a clinic polls the queue, day stats and follow-ups
+on the same cadence, so identical requests arrive within milliseconds of each
+other. A route wrapped with SingleFlight.respond() computes its payload once
+per (route, clinic, parameters): callers that arrive while it is being built
+wait for it and all of them get the same encoded bytes. With
+COALESCE_TTL_SECONDS the bytes are also served for that long after they were
+built.
+
+Authentication and permission checks are route dependencies, so they still
+run for every caller before respond() is reached; the key always includes the
+caller's clinic. Writes that change the data publish an invalidation (see
+app/core/invalidation.py) that drops the clinic's entries on every worker.
+The entries of a clinic live in one dict that invalidation replaces, and
+in-flight work is keyed by that dict, so a request that arrives after a write
+never joins a computation that started before it.
+
+The payload is built in the threadpool, which also keeps these routes'
+blocking queries off the event loop.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from app.core.cache import TTLCache
+from app.core.serialization import dumps
+
+
+class SingleFlight:
+    """
+    Share one computation among concurrent identical requests.
+
+    Args:
+        cache: clinic_id -> {(route, params): (expires_at, body)}, registered for invalidation
+        ttl_seconds: How long a finished body keeps being served (0: only while in flight)
+        enabled: When False every caller computes its own payload
+    """
+
+    def __init__(self, cache: TTLCache, ttl_seconds: float = 1.0, enabled: bool = True):
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._inflight: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.computed = 0
+        self.shared = 0
+
+    def _entries(self, clinic_id: str) -> dict:
+        entries = self.cache.get(clinic_id)
+        if entries is None:
+            entries = {}
+            self.cache.set(clinic_id, entries)
+        return entries
+
+    async def respond(self, route: str, clinic_id: str, params: Hashable, build: Callable[[], Any]) -> Response:
+        """
+        JSON response for ``build()``, computed at most once at a time per key.
+
+        Args:
+            route: Name of the route, part of the key
+            clinic_id: Caller's clinic, part of the key
+            params: Hashable request parameters that change the payload
+            build: Blocking function returning the payload; runs in the threadpool
+        """
+        if not self.enabled:
+            return Response(await run_in_threadpool(lambda: dumps(build())), media_type="application/json")
+
+        entries = self._entries(clinic_id)
+        key = (route, params)
+        cached = entries.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.shared += 1
+            return Response(cached[1], media_type="application/json")
+
+        flight_key = (id(entries), key)
+        task = self._inflight.get(flight_key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(self._compute(flight_key, entries, key, build))
+            self._inflight[flight_key] = task
+        else:
+            self.shared += 1
+        try:
+            # A caller that goes away must not cancel the work the others wait for
+            body = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if leader:
+                # build() uses this request's session, which is closed once we return
+                await asyncio.wait({task})
+            raise
+        return Response(body, media_type="application/json")
+
+    async def _compute(self, flight_key, entries: dict, key: Hashable, build: Callable[[], Any]) -> bytes:
+        try:
+            body = await run_in_threadpool(lambda: dumps(build()))
+            self.computed += 1
+            if self.ttl_seconds > 0:
+                entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            return body
+        finally:
+            del self._inflight[flight_key]
@@ -0,0 +1,173 @@
+"""
+Response compression with a size threshold and per-route overrides.
+
+Large list/report payloads are highly repetitive JSON and shrink 5-10x, which
+matters for clinics on mobile broadband. Small hot responses are left alone so
+we don't spend CPU compressing a few hundred bytes. Brotli is used when the
+optional ``brotli`` package is installed and the client accepts it, gzip
+otherwise.
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Content codings of an Accept-Encoding header with their q-values (``*`` included)"""
+    codings = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [piece.strip() for piece in part.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[name] = quality
+    return codings
+
+
+def accepts(codings: Dict[str, float], encoding: str) -> bool:
+    return codings.get(encoding, codings.get("*", 0.0)) > 0
+
+
+class CompressionMiddleware:
+    """
+    Compress responses whose body is at least ``minimum_size`` bytes.
+
+    ``route_overrides`` maps a path prefix to its own minimum size, or to None
+    to never compress that route. The longest matching prefix wins.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        enable_brotli: bool = True,
+        route_overrides: Optional[Dict[str, Optional[int]]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enable_brotli = enable_brotli and brotli is not None
+        # Longest prefix first so the most specific rule wins
+        self.route_overrides = sorted((route_overrides or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def minimum_size_for(self, path: str) -> Optional[int]:
+        for prefix, minimum_size in self.route_overrides:
+            if path.startswith(prefix):
+                return minimum_size
+        return self.minimum_size
+
+    def choose_encoding(self, codings: Dict[str, float]) -> Optional[str]:
+        """The client's preferred acceptable encoding; brotli wins ties"""
+        candidates = [encoding for encoding in ("br", "gzip") if accepts(codings, encoding)]
+        if not self.enable_brotli and "br" in candidates:
+            candidates.remove("br")
+        if not candidates:
+            return None
+        return max(candidates, key=lambda encoding: codings.get(encoding, codings.get("*", 0.0)))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        minimum_size = self.minimum_size_for(scope["path"])
+        codings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = self.choose_encoding(codings) if minimum_size is not None else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        accepts_gzip = accepts(codings, "gzip")
+        responder = _CompressingResponder(self, encoding, minimum_size, accepts_gzip, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, minimum_size: int, accepts_gzip: bool, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.accepts_gzip = accepts_gzip
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.streamer = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                # Hold the start message until we know the body size
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.streamer is None and not more_body:
+            # Whole body in one message - the common case for JSON APIs
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if len(body) >= self.minimum_size:
+                body = compress_body(
+                    body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+                )
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        if self.streamer is None:
+            # Streaming response: size is unknown, always gzip it incrementally
+            if not self.accepts_gzip:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self.streamer = zlib.compressobj(self.middleware.gzip_level, zlib.DEFLATED, 31)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        chunk = self.streamer.compress(body)
+        if not more_body:
+            chunk += self.streamer.flush()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,97 @@
+"""
+Conditional GET support (ETag / Last-Modified) for single-resource routes.
+
+Routes fetch a cheap version row first (ids and updated_at columns), hand it
+to ConditionalGet.evaluate() and return the 304 it produces before running
+the full queries and serialization.
+
+    @router.get("/{patient_id}")
+    async def get_patient(..., conditional: ConditionalGet = Depends(ConditionalGet)):
+        version = db.query(Patient.id, Patient.updated_at, ...).first()
+        not_modified = conditional.evaluate(*version, last_modified=version.updated_at)
+        if not_modified:
+            return not_modified
+        ...
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a resource version"""
+    digest = hashlib.sha1("|".join("" if p is None else str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """The most recent of the given timestamps, ignoring missing ones"""
+    present = [t for t in timestamps if t is not None]
+    return max(present) if present else None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same validator
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ConditionalGet:
+    """Dependency that answers If-None-Match / If-Modified-Since for the current request"""
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def evaluate(self, *version_parts: Any, last_modified: Optional[datetime] = None) -> Optional[Response]:
+        """
+        Set validators for this response and check them against the request.
+
+        Args:
+            version_parts: Values that change whenever the response body would change
+            last_modified: When the resource last changed, if known exactly
+
+        Returns:
+            A 304 response when the client's copy is current, otherwise None
+        """
+        etag = make_etag(*version_parts)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+        for name, value in headers.items():
+            self.response.headers[name] = value
+
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return None
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return None
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates only carry whole seconds
+            if last_modified.replace(microsecond=0) <= since:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return None
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -14,11 +14,74 @@ class Settings(BaseSettings):
     # CORS origins - comma-separated list for production
     CORS_ORIGINS: str = "http://localhost:5000,http://localhost:3000"
 
+    # Schema work at worker startup: create (create_all, dev), check (compare alembic head), skip
+    SCHEMA_STARTUP_MODE: str = "create"
+    # Date-partitioned tables (opt-in, migration 0017) get partitions this many months ahead
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_UPKEEP_INTERVAL_HOURS: float = 6.0  # 0: only at worker startup
+
+    # Clinics with more clinical rows than this are deleted by a chunked background job
+    CLINIC_PURGE_THRESHOLD_ROWS: int = 20000
+    CLINIC_PURGE_CHUNK_SIZE: int = 2000
+
+    # Usage-ranked option suggestions: a pick counts half as much after this many days
+    OPTION_USAGE_HALF_LIFE_DAYS: float = 30.0
+
+    # Production server (gunicorn.conf.py) - the connection budget is shared by all workers
+    WEB_CONCURRENCY: int = 1
+    DB_CONNECTION_BUDGET: int = 5
+    WORKER_TIMEOUT: int = 60
+    WORKER_GRACEFUL_TIMEOUT: int = 30
+    WORKER_KEEPALIVE: int = 5
+    WORKER_MAX_REQUESTS: int = 5000
+    WORKER_MAX_REQUESTS_JITTER: int = 500
+
+    # Cross-worker cache invalidation (LISTEN/NOTIFY) - one extra connection per worker
+    CACHE_INVALIDATION_ENABLED: bool = True
+
+    # Optional read replica for reports/lists; writers read from the primary for a short window
+    REPLICA_DATABASE_URL: Optional[str] = None
+    REPLICA_POOL_SIZE: int = 3
+    REPLICA_MAX_OVERFLOW: int = 2
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    # Response compression - brotli is used only if the brotli package is installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI: bool = True
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Admission control (app/core/admission.py) - queue or shed requests instead of waiting on the pool
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 0  # 0: this worker's pool size plus overflow
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Identical concurrent OPD polls share one computation; finished responses are reused this long
+    COALESCING_ENABLED: bool = True
+    COALESCE_TTL_SECONDS: float = 1.0
+
+    # X-DB-Queries / X-DB-Time-Ms response headers for load tests (app/core/query_stats.py)
+    QUERY_STATS_ENABLED: bool = False
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS_ORIGINS string into a list."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
 
+    @property
+    def db_pool_size(self) -> int:
+        """Persistent connections per worker: ~60% of this worker's share of the budget."""
+        per_worker = max(self.DB_CONNECTION_BUDGET // max(self.WEB_CONCURRENCY, 1), 1)
+        return max(-(-per_worker * 3 // 5), 1)
+
+    @property
+    def db_max_overflow(self) -> int:
+        """Burst connections per worker: the rest of this worker's share of the budget."""
+        per_worker = max(self.DB_CONNECTION_BUDGET // max(self.WEB_CONCURRENCY, 1), 1)
+        return per_worker - self.db_pool_size
+
     class Config:
         env_file = ".env"
 
@@ -1,22 +1,49 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.read_routing import should_read_from_replica
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=3,          # Reduce persistent connections (Supabase pooler has limits)
-    max_overflow=2,       # Limit overflow connections
+    pool_size=settings.db_pool_size,        # Per-worker share of DB_CONNECTION_BUDGET (3 for one worker)
+    max_overflow=settings.db_max_overflow,  # Remaining share for bursts (2 for one worker)
     pool_recycle=300,     # Recycle connections every 5 minutes
     pool_pre_ping=True,   # Validate connections before use
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for reports and list pages (see app/core/read_routing.py)
+replica_engine = create_engine(
+    settings.REPLICA_DATABASE_URL,
+    pool_size=settings.REPLICA_POOL_SIZE,
+    max_overflow=settings.REPLICA_MAX_OVERFLOW,
+    pool_recycle=300,
+    pool_pre_ping=True,
+) if settings.REPLICA_DATABASE_URL else None
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+
 Base = declarative_base()
 
-def get_db():
+def get_db(request: Request):
+    # Routes marked with use_read_replica read from the replica for the whole request,
+    # including the auth lookups, so they never hold a primary connection
+    if getattr(request.state, "use_read_replica", False):
+        yield from get_read_db(request)
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    use_replica = replica_engine is not None and should_read_from_replica(request, replica_engine)
+    session_factory = ReplicaSessionLocal if use_replica else SessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
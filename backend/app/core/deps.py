@@ -1,12 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from app.core.cache import clinic_owner_cache, doctor_identity_cache, permission_cache, user_clinic_cache
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.models import User, RoleEnum, Doctor, Clinic, UserPermission
 
 security = HTTPBearer()
 
+_UNKNOWN = object()
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -33,9 +36,58 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
-    
+
+    if user.clinic_id:
+        user_clinic_cache.set(user.id, user.clinic_id)
     return user
 
+def get_doctor_id(db: Session, user_id: str):
+    """Resolve the doctor profile id for a user, caching the answer per process"""
+    doctor_id = doctor_identity_cache.get(user_id)
+    if doctor_id is None:
+        doctor_id = db.query(Doctor.id).filter(Doctor.user_id == user_id).scalar()
+        if doctor_id is not None:
+            doctor_identity_cache.set(user_id, doctor_id)
+    return doctor_id
+
+
+def get_clinic_owner_id(db: Session, clinic_id: str):
+    """Resolve a clinic's owner doctor id, caching the answer per process"""
+    owner_id = clinic_owner_cache.get(clinic_id, _UNKNOWN)
+    if owner_id is _UNKNOWN:
+        owner_id = db.query(Clinic.owner_doctor_id).filter(Clinic.id == clinic_id).scalar()
+        clinic_owner_cache.set(clinic_id, owner_id)
+    return owner_id
+
+
+def is_clinic_owner(db: Session, user: User) -> bool:
+    if user.role != RoleEnum.DOCTOR or not user.clinic_id:
+        return False
+    doctor_id = get_doctor_id(db, user.id)
+    return doctor_id is not None and get_clinic_owner_id(db, user.clinic_id) == doctor_id
+
+
+def get_explicit_permissions(db: Session, user: User):
+    """A user's explicit permission flags, or None when the role defaults apply"""
+    cached = permission_cache.get(user.id)
+    if cached is not None and cached[0] == user.clinic_id:
+        return cached[1]
+
+    permission = db.query(UserPermission).filter(
+        UserPermission.user_id == user.id,
+        UserPermission.clinic_id == user.clinic_id
+    ).first()
+    flags = None
+    if permission:
+        flags = {
+            column.name: getattr(permission, column.name)
+            for column in UserPermission.__table__.columns
+            if column.name.startswith("can_")
+        }
+    permission_cache.set(user.id, (user.clinic_id, flags))
+    return flags
+
+
 def get_current_doctor(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != RoleEnum.DOCTOR:
         raise HTTPException(
@@ -66,10 +118,7 @@ def require_clinic_owner(
             detail="Only the clinic owner can access this resource"
         )
 
-    doctor = db.query(Doctor).filter(Doctor.user_id == current_user.id).first()
-    clinic = db.query(Clinic).filter(Clinic.id == current_user.clinic_id).first()
-
-    if not doctor or not clinic or clinic.owner_doctor_id != doctor.id:
+    if not is_clinic_owner(db, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the clinic owner can access this resource"
@@ -102,21 +151,15 @@ def require_permission(permission_name: str):
         db: Session = Depends(get_db)
     ) -> User:
         # Clinic owner has all permissions
-        if current_user.role == RoleEnum.DOCTOR:
-            doctor = db.query(Doctor).filter(Doctor.user_id == current_user.id).first()
-            clinic = db.query(Clinic).filter(Clinic.id == current_user.clinic_id).first()
-            if doctor and clinic and clinic.owner_doctor_id == doctor.id:
-                return current_user  # Owner has all permissions
-
-        # Check user permissions from database
-        permission = db.query(UserPermission).filter(
-            UserPermission.user_id == current_user.id,
-            UserPermission.clinic_id == current_user.clinic_id
-        ).first()
-
-        if permission:
+        if is_clinic_owner(db, current_user):
+            return current_user
+
+        # Check user permissions (cached per process, evicted on change)
+        permissions = get_explicit_permissions(db, current_user)
+
+        if permissions is not None:
             # Explicit permissions set - check specific permission
-            if not getattr(permission, permission_name, False):
+            if not permissions.get(permission_name, False):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You don't have permission to perform this action"
@@ -0,0 +1,236 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Each worker keeps its own in-process caches (app/core/cache.py). A write that
+changes cached data calls publish() before committing:
+
+    publish(db, "medicine_option", option.id, clinic_id=current_user.clinic_id)
+    db.commit()
+
+The pg_notify is sent inside the same transaction, so Postgres delivers it only
+if the commit succeeds. The writing worker evicts its own entries right after
+the commit. Every worker runs an InvalidationListener thread with a dedicated
+connection that evicts entries for the notifications it receives. While the
+listener is disconnected it may miss notifications, so it flushes every
+registered cache whenever it reconnects.
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import (
+    TTLCache,
+    clinic_owner_cache,
+    coalesced_response_cache,
+    doctor_identity_cache,
+    option_list_cache,
+    option_usage_cache,
+    permission_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "docease_cache_invalidation"
+
+_PENDING_KEY = "pending_invalidations"
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+class Invalidation(NamedTuple):
+    clinic_id: Optional[str]
+    entity: str
+    id: Optional[str]
+    version: Any = None
+
+
+KeyFunc = Callable[[Invalidation], Iterable[Hashable]]
+
+# entity -> caches (and the keys in them) that a write to that entity makes stale
+_registry: Dict[str, List[Tuple[TTLCache, KeyFunc]]] = {}
+
+
+def register(entity: str, cache: TTLCache, keys: Optional[KeyFunc] = None) -> None:
+    """
+    Evict entries from ``cache`` whenever ``entity`` is written.
+
+    Args:
+        entity: Entity name used by publish()
+        cache: Cache holding data derived from that entity
+        keys: Returns the cache keys to evict for an invalidation (default: its id)
+    """
+    _registry.setdefault(entity, []).append((cache, keys or (lambda inv: [inv.id])))
+
+
+def registered_caches() -> List[TTLCache]:
+    caches = []
+    for entries in _registry.values():
+        for cache, _ in entries:
+            if cache not in caches:
+                caches.append(cache)
+    return caches
+
+
+def evict(invalidation: Invalidation) -> None:
+    for cache, keys in _registry.get(invalidation.entity, []):
+        for key in keys(invalidation):
+            if key is not None:
+                cache.pop(key)
+
+
+def flush_all() -> None:
+    for cache in registered_caches():
+        cache.clear()
+
+
+def publish(db: Session, entity: str, id: Optional[str] = None, clinic_id: Optional[str] = None, version: Any = None) -> None:
+    """
+    Announce a write to cached data. Sent with the session's next commit.
+
+    Args:
+        db: Session that makes the write
+        entity: Entity name registered with register()
+        id: Primary key of the written row, if the caches are keyed by it
+        clinic_id: Clinic the row belongs to
+        version: Optional version marker (e.g. updated_at) passed to key functions
+    """
+    db.info.setdefault(_PENDING_KEY, []).append(Invalidation(clinic_id, entity, id, version))
+
+
+def _encode(invalidation: Invalidation) -> str:
+    return json.dumps({
+        "c": invalidation.clinic_id,
+        "e": invalidation.entity,
+        "i": invalidation.id,
+        "v": None if invalidation.version is None else str(invalidation.version),
+        "p": os.getpid(),
+    })
+
+
+def _decode(payload: str) -> Invalidation:
+    data = json.loads(payload)
+    return Invalidation(data["c"], data["e"], data["i"], data.get("v"))
+
+
+@event.listens_for(Session, "before_commit")
+def _send_notifications(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        payloads = list(dict.fromkeys(_encode(inv) for inv in pending))
+        session.execute(NOTIFY_SQL, {"channel": CHANNEL, "payloads": payloads})
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_local(session: Session) -> None:
+    for invalidation in session.info.pop(_PENDING_KEY, []):
+        evict(invalidation)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+class InvalidationListener:
+    """Background thread that applies invalidations published by any worker"""
+
+    def __init__(self, engine: Engine, poll_seconds: float = 5.0, max_backoff_seconds: float = 30.0):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
+            self._thread = None
+
+    def _connect(self):
+        # A dedicated DBAPI connection outside the pool - it sits in LISTEN for the worker's lifetime
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        conn = self.engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _run(self) -> None:
+        backoff = 1.0
+        connected_before = False
+        while not self._stop.is_set():
+            try:
+                conn = self._connect()
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener cannot connect, retrying in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff_seconds)
+                continue
+
+            # Anything published while we were not listening is lost - start from empty caches
+            if connected_before:
+                flush_all()
+            connected_before = True
+            backoff = 1.0
+            try:
+                self._listen(conn)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener lost its connection: {e}")
+                flush_all()
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _listen(self, conn) -> None:
+        while not self._stop.is_set():
+            readable, _, _ = select.select([conn], [], [], self.poll_seconds)
+            if not readable:
+                # Idle - make sure the connection is still alive
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                continue
+            conn.poll()
+            while conn.notifies:
+                notification = conn.notifies.pop(0)
+                try:
+                    evict(_decode(notification.payload))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Unreadable cache invalidation {notification.payload!r}, flushing caches")
+                    flush_all()
+
+
+def _option_list_keys(invalidation: Invalidation):
+    return [(invalidation.entity, invalidation.clinic_id, active_only) for active_only in (True, False)]
+
+
+# Which cached data each entity's writes make stale
+register("user", doctor_identity_cache)
+register("user", permission_cache)
+register("permission", permission_cache)
+register("clinic", clinic_owner_cache)
+register("option_usage", option_usage_cache)
+register("opd_day", coalesced_response_cache, lambda inv: [inv.clinic_id])
+for _entity in (
+    "chief_complaint", "diagnosis_option", "observation_option", "test_option",
+    "medicine_option", "dosage_option", "duration_option", "symptom_option",
+):
+    register(_entity, option_list_cache, _option_list_keys)
@@ -0,0 +1,39 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor carries the sort key of the last row of a page, so the next page is
+fetched with a row comparison (``(created_at, id) < (:created_at, :id)``) that
+an index on the same columns answers directly, however deep the page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*values: Any) -> str:
+    """Cursor for the row with these sort key values (datetimes are kept as ISO strings)"""
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """
+    Sort key values of a cursor, converted to ``types``.
+
+    Raises:
+        HTTPException: 400 when the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for value, kind in zip(values, types)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
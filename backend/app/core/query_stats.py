@@ -0,0 +1,94 @@
+"""
+Per-request database statement counts, for load tests and profiling.
+
+With QUERY_STATS_ENABLED, QueryStatsMiddleware gives every request a
+QueryStats in a context variable and engine-wide cursor events add each
+statement to it, on the primary, the replica and the connections streaming
+routes open themselves. Responses carry:
+
+- X-DB-Queries: statements executed before the response started
+- X-DB-Time-Ms: time spent waiting for them
+
+Sync routes and dependencies run in a threadpool with a copy of the request
+context, so they see the same QueryStats object. Off by default: the events
+add a little overhead to every statement.
+"""
+
+import contextvars
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+QUERIES_HEADER = b"x-db-queries"
+TIME_HEADER = b"x-db-time-ms"
+
+
+class QueryStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+_installed = False
+
+
+# The start time lives on the statement's execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind on the
+# pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context.query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "query_stats_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def install() -> None:
+    """Listen to every engine's cursor events (idempotent)"""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+class QueryStatsMiddleware:
+    """Count each request's statements and report them in response headers"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        install()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (QUERIES_HEADER, str(stats.queries).encode()),
+                    (TIME_HEADER, f"{stats.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,111 @@
+"""
+Routing policy for the optional read replica.
+
+Report and list routes opt in with ``dependencies=[Depends(use_read_replica)]``;
+get_db then hands them a replica session. A request still goes to the primary when:
+
+- the caller made a successful write within READ_YOUR_WRITES_SECONDS, so a
+  doctor who just saved a visit sees it in their lists immediately, or
+- the replica is lagging more than REPLICA_MAX_LAG_SECONDS (or cannot be reached).
+
+The time of the last write travels with the client: write responses carry it
+in the LAST_WRITE_HEADER response header (exposed through CORS, since the
+frontend is served from another site) and the frontend echoes it on later
+requests, so the next read is routed correctly by whichever worker handles it.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Unix time of the caller's last successful write, set on write responses and echoed by the client
+LAST_WRITE_HEADER = "X-Last-Write"
+
+# Replica lag is sampled at most every few seconds, not per request
+_replica_lag = TTLCache(ttl_seconds=5)
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def use_read_replica(request: Request) -> None:
+    """Route-level dependency marking a read-only report/list route"""
+    request.state.use_read_replica = True
+
+
+def user_id_from_headers(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = decode_access_token(authorization[7:])
+    return payload.get("sub") if payload else None
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the caller's echoed last-write time is still inside the read-your-writes window"""
+    try:
+        written_at = float(request.headers.get(LAST_WRITE_HEADER, ""))
+    except ValueError:
+        return False
+    return 0 <= time.time() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+def replica_lag_seconds(replica_engine: Engine) -> float:
+    lag = _replica_lag.get("lag")
+    if lag is None:
+        try:
+            with replica_engine.connect() as conn:
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            lag = float("inf")
+        _replica_lag.set("lag", lag)
+    return lag
+
+
+def should_read_from_replica(request: Request, replica_engine: Engine) -> bool:
+    if wrote_recently(request):
+        return False
+    return replica_lag_seconds(replica_engine) <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    """Stamp successful authenticated writes with LAST_WRITE_HEADER; the client echoes it to read from the primary"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = dict(scope["headers"])
+                authorization = headers.get(b"authorization")
+                if user_id_from_headers(authorization.decode("latin-1") if authorization else None):
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (LAST_WRITE_HEADER.lower().encode("latin-1"), f"{time.time():.3f}".encode("latin-1")),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,81 @@
+"""
+Fast JSON encoding for API responses.
+
+FastAPI's default path runs every returned dict through response-model
+validation and jsonable_encoder before json.dumps. Handlers on hot or large
+routes instead return FastJSONResponse directly, which encodes with orjson in
+one pass (datetime, date, enums and UUIDs natively; Decimal and Pydantic
+models through the default hook) and skips the re-validation step.
+"""
+
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        # Matches jsonable_encoder, which the frontend already relies on
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode a response payload to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def stream_json_list(key: str, items: Iterable[Any], batch_size: int = 500, **fields: Any) -> Iterator[bytes]:
+    """
+    Encode ``{**fields, key: [items...], "count": n}`` incrementally.
+
+    Items are consumed lazily and emitted in batches, so a StreamingResponse
+    over a server-side cursor never holds the whole result in memory.
+    """
+    opening = dumps(fields)[:-1]
+    yield opening + (b"," if fields else b"") + dumps(key) + b":["
+    count = 0
+    batch: List[bytes] = []
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield (b"," if count else b"") + b",".join(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        yield (b"," if count else b"") + b",".join(batch)
+        count += len(batch)
+    yield b'],"count":' + str(count).encode() + b"}"
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also understands Decimal and Pydantic models"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowSerializer:
+    """
+    Precompiled ORM row -> dict converter for a from_attributes Pydantic model.
+
+    The TypeAdapter is built once at import time, so per-request work is a
+    single pydantic-core validation pass over the rows.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._adapter = TypeAdapter(List[model])
+
+    def one(self, row: Any) -> dict:
+        return self.model.model_validate(row, from_attributes=True).model_dump()
+
+    def many(self, rows: Iterable[Any]) -> List[dict]:
+        return self._adapter.dump_python(self._adapter.validate_python(list(rows), from_attributes=True))
@@ -0,0 +1,196 @@
+"""
+Worker startup: schema check and warm-up.
+
+SCHEMA_STARTUP_MODE decides what a booting worker does about the schema:
+
+- ``create``: Base.metadata.create_all, the old behaviour. It makes one
+  reflection round-trip per table, which is fine for local development only.
+- ``check``: compares the database's alembic_version with the migration head
+  in one query and logs an error when they differ. Migrations are applied
+  separately with ``alembic upgrade head`` (the railway.json pre-deploy
+  command), and /ready answers 503 until the database is at the head, so a
+  deploy whose migrations did not run never receives traffic.
+- ``skip``: no schema work at all.
+
+After that, the connection pool and the hot in-process caches are filled in
+parallel, so the first requests after a deploy or autoscale event do not pay
+for connection setup. Databases with date-partitioned tables (migration
+0017_date_partitioning) also get their upcoming partitions created here, and
+partition_upkeep() repeats that every PARTITION_UPKEEP_INTERVAL_HOURS for as
+long as the worker runs, so a long-lived deployment never starts writing into
+the default partitions. Deployments that run no API worker for long stretches
+can schedule the same call from cron instead:
+
+    psql "$DATABASE_URL" -c "SELECT ensure_date_partitions(3)"
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.cache import clinic_owner_cache, doctor_identity_cache
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+SCHEMA_MODES = ("create", "check", "skip")
+
+# Caches are only warmed up to this many rows; larger fleets fill them lazily
+WARM_CACHE_LIMIT = 5000
+
+
+@lru_cache(maxsize=1)
+def migration_head() -> Optional[str]:
+    """The head revision of alembic/versions, read from disk without touching the database"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    heads = ScriptDirectory.from_config(config).get_heads()
+    return heads[0] if len(heads) == 1 else None
+
+
+def database_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except SQLAlchemyError:
+            return None
+
+
+def check_schema_revision(engine: Engine) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Compare the database schema revision with the migration head.
+
+    Returns:
+        (database revision, head revision); either is None when unknown
+    """
+    head = migration_head()
+    current = database_revision(engine)
+    if current is None:
+        logger.error("Database has no alembic_version - run 'alembic upgrade head' before starting the API")
+    elif head is None:
+        logger.warning(f"Migration history has several heads; database is at {current}")
+    elif current != head:
+        logger.error(f"Database schema is at {current} but the code expects {head} - run 'alembic upgrade head'")
+    else:
+        logger.info(f"Database schema is at head ({head})")
+    return current, head
+
+
+_schema_at_head = False
+
+
+def schema_at_head(engine: Engine) -> bool:
+    """Whether the database is at the migration head; once it is, it is not queried again"""
+    global _schema_at_head
+    if not _schema_at_head:
+        head = migration_head()
+        _schema_at_head = head is not None and database_revision(engine) == head
+    return _schema_at_head
+
+
+def prepare_schema(engine: Engine, mode: str) -> None:
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"SCHEMA_STARTUP_MODE must be one of {', '.join(SCHEMA_MODES)}, got {mode!r}")
+    if mode == "create":
+        from app.core.database import Base
+        import app.models.models  # noqa: F401 - register every table on Base.metadata
+
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created")
+    elif mode == "check":
+        check_schema_revision(engine)
+
+
+def warm_pool(engine: Engine, size: int) -> int:
+    """Open ``size`` pooled connections at once and return them to the pool"""
+    opened = 0
+    error = None
+    with ExitStack() as stack:
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(engine.connect) for _ in range(size)]
+            for future in futures:
+                try:
+                    conn = stack.enter_context(future.result())
+                    conn.execute(text("SELECT 1"))
+                    opened += 1
+                except SQLAlchemyError as e:
+                    error = e
+    if error is not None:
+        logger.warning(f"Connection pool warm-up opened {opened}/{size} connections: {error}")
+    return opened
+
+
+def warm_caches(engine: Engine) -> int:
+    """Preload the per-request identity caches used by the auth dependencies"""
+    with engine.connect() as conn:
+        owners = conn.execute(
+            text("SELECT id, owner_doctor_id FROM clinics LIMIT :limit"), {"limit": WARM_CACHE_LIMIT}
+        ).all()
+        doctors = conn.execute(
+            text("SELECT user_id, id FROM doctors LIMIT :limit"), {"limit": WARM_CACHE_LIMIT}
+        ).all()
+    for clinic_id, owner_doctor_id in owners:
+        clinic_owner_cache.set(clinic_id, owner_doctor_id)
+    for user_id, doctor_id in doctors:
+        doctor_identity_cache.set(user_id, doctor_id)
+    return len(owners) + len(doctors)
+
+
+def ensure_partitions(engine: Engine, months_ahead: int) -> int:
+    """Create the date partitions of the next ``months_ahead`` months; returns how many were added"""
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regproc('ensure_date_partitions')")).scalar() is None:
+            return 0
+        created = conn.execute(
+            text("SELECT ensure_date_partitions(:months_ahead)"), {"months_ahead": months_ahead}
+        ).scalar()
+    if created:
+        logger.info(f"Created {created} date partition(s)")
+    return created
+
+
+async def partition_upkeep(engine: Engine, months_ahead: int, interval_seconds: float) -> None:
+    """Run ensure_partitions every ``interval_seconds`` until cancelled; workers take turns on an advisory lock"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(ensure_partitions, engine, months_ahead)
+        except Exception as e:
+            logger.warning(f"Partition upkeep failed: {e}")
+
+
+async def prepare_worker(engine: Engine, schema_mode: str, pool_size: int, partition_months_ahead: int = 3) -> None:
+    """Run the schema step, pool warm-up, cache warm-up and partition upkeep concurrently"""
+    started = time.perf_counter()
+
+    async def guarded(label, func, *args):
+        try:
+            return await asyncio.to_thread(func, *args)
+        except Exception as e:
+            logger.warning(f"Startup step '{label}' failed: {e}")
+            return None
+
+    schema_step = asyncio.to_thread(prepare_schema, engine, schema_mode)
+    _, connections, cached, _ = await asyncio.gather(
+        schema_step,
+        guarded("pool warm-up", warm_pool, engine, pool_size),
+        guarded("cache warm-up", warm_caches, engine),
+        guarded("partition upkeep", ensure_partitions, engine, partition_months_ahead),
+    )
+    logger.info(
+        f"Worker ready in {(time.perf_counter() - started) * 1000:.0f} ms "
+        f"(schema: {schema_mode}, pooled connections: {connections or 0}, cached rows: {cached or 0})"
+    )
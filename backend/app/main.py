@@ -1,12 +1,21 @@
+import asyncio
 import logging
 import re
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.admission import DEFAULT_CLASSES, AdmissionControlMiddleware, AdmissionController
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import auth, patients, opd, visits, invoices, clinic, users, admin, chief_complaints, diagnosis_options, observation_options, test_options, medicine_options, dosage_options, duration_options, symptom_options, permissions
+from app.core.compression import CompressionMiddleware
+from app.core.invalidation import InvalidationListener
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.read_routing import LAST_WRITE_HEADER, ReadYourWritesMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.startup import partition_upkeep, prepare_worker, schema_at_head
+from app.core.database import engine, replica_engine
+from app.api import auth, patients, opd, visits, invoices, clinic, users, admin, chief_complaints, diagnosis_options, observation_options, test_options, medicine_options, dosage_options, duration_options, symptom_options, permissions, analytics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,14 +26,30 @@ def mask_database_url(url: str) -> str:
 
 logger.info(f"Starting DocEase API with DATABASE_URL: {mask_database_url(settings.DATABASE_URL)}")
 
+invalidation_listener = InvalidationListener(engine)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created, connection pool initialized")
+    # Each worker evicts its in-process caches when any worker writes;
+    # listen before warming them so no invalidation is missed
+    if settings.CACHE_INVALIDATION_ENABLED:
+        invalidation_listener.start()
+    # Startup: schema check (see SCHEMA_STARTUP_MODE), pool and cache warm-up in parallel
+    await prepare_worker(engine, settings.SCHEMA_STARTUP_MODE, settings.db_pool_size, settings.PARTITION_MONTHS_AHEAD)
+    # Keep creating upcoming date partitions while the worker runs, not only at boot
+    upkeep = None
+    if settings.PARTITION_UPKEEP_INTERVAL_HOURS > 0:
+        upkeep = asyncio.create_task(partition_upkeep(
+            engine, settings.PARTITION_MONTHS_AHEAD, settings.PARTITION_UPKEEP_INTERVAL_HOURS * 3600
+        ))
     yield
-    # Shutdown: dispose all connections
+    # Shutdown: stop partition upkeep and dispose all connections
+    if upkeep is not None:
+        upkeep.cancel()
+    invalidation_listener.stop()
     engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
     logger.info("Database connections disposed")
 
 app = FastAPI(
@@ -32,7 +57,58 @@ app = FastAPI(
     description="Clinic Management System API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+# Read replica - callers who just wrote keep reading from the primary for a short window
+if settings.REPLICA_DATABASE_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Response compression - small hot polling responses skip it, big reports always compress
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        enable_brotli=settings.COMPRESSION_BROTLI,
+        route_overrides={
+            "/health": None,
+            "/ready": None,
+            "/api/opd/stats": None,
+            "/api/patients/stats": None,
+            "/api/auth": None,
+            "/api/visits/collections/summary": 512,
+            "/api/admin/doctors": 512,
+        },
+    )
+
+# Per-request statement counts in response headers (load tests) - wraps compression and the routes
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Admission control - OPD and visit writes before reports, fair across clinics, 503 instead of pool timeouts.
+# Inside CORS so browsers can read the 503 and its Retry-After
+admission_controller = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY or settings.db_pool_size + settings.db_max_overflow,
+    DEFAULT_CLASSES,
 )
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        route_classes={
+            "/api/opd": "critical",
+            "POST /api/visits": "critical",
+            "PUT /api/visits": "critical",
+            "/api/visits/collections": "reports",
+            "/api/invoices/stats": "reports",
+            "/api/analytics": "reports",
+            "/api/admin/stats": "reports",
+            "/api/admin/overview": "reports",
+        },
+    )
 
 # CORS middleware - use environment-based origins for production
 app.add_middleware(
@@ -41,6 +117,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", LAST_WRITE_HEADER],
 )
 
 # Include routers
@@ -61,11 +138,34 @@ app.include_router(dosage_options.router, prefix="/api/dosage-options", tags=["D
 app.include_router(duration_options.router, prefix="/api/duration-options", tags=["Duration Options"])
 app.include_router(symptom_options.router, prefix="/api/symptom-options", tags=["Symptom Options"])
 app.include_router(permissions.router, prefix="/api/permissions", tags=["Permissions"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "message": "DocEase API is running"}
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: unlike /health, fails while this worker cannot reach the database
+    or (in check mode) while the schema is behind the code's migrations"""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return FastJSONResponse(status_code=503, content={"status": "unavailable", "message": "Database unreachable"})
+    if settings.SCHEMA_STARTUP_MODE == "check" and not schema_at_head(engine):
+        return FastJSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "message": "Database schema is not at the migration head - run 'alembic upgrade head'"},
+        )
+    return {"status": "ready"}
+
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """This worker's admission slots, queue depths and shed counts"""
+    return {"enabled": settings.ADMISSION_CONTROL_ENABLED, **admission_controller.snapshot()}
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to DocEase API", "docs": "/docs"}
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey, Enum, Numeric, ARRAY, JSON, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey, Enum, Numeric, ARRAY, JSON, Text, Index, Float
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 import enum
 import uuid
@@ -43,6 +43,13 @@ class PaymentModeEnum(str, enum.Enum):
     OTHER = "OTHER"
 
 
+class PurgeJobStatusEnum(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
 class Clinic(Base):
     __tablename__ = "clinics"
 
@@ -59,23 +66,24 @@ class Clinic(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    users = relationship("User", back_populates="clinic", cascade="all, delete-orphan")
-    doctors = relationship("Doctor", back_populates="clinic", cascade="all, delete-orphan", foreign_keys="Doctor.clinic_id")
+    # Children are removed by the database's ON DELETE CASCADE, never loaded into memory
+    users = relationship("User", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    doctors = relationship("Doctor", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True, foreign_keys="Doctor.clinic_id")
     owner_doctor = relationship("Doctor", foreign_keys=[owner_doctor_id], post_update=True)
-    patients = relationship("Patient", back_populates="clinic", cascade="all, delete-orphan")
-    appointments = relationship("Appointment", back_populates="clinic", cascade="all, delete-orphan")
-    visits = relationship("Visit", back_populates="clinic", cascade="all, delete-orphan")
-    invoices = relationship("Invoice", back_populates="clinic", cascade="all, delete-orphan")
-    admins = relationship("ClinicAdmin", back_populates="clinic", cascade="all, delete-orphan")
-    chief_complaints = relationship("ChiefComplaint", back_populates="clinic", cascade="all, delete-orphan")
-    diagnosis_options = relationship("DiagnosisOption", back_populates="clinic", cascade="all, delete-orphan")
-    observation_options = relationship("ObservationOption", back_populates="clinic", cascade="all, delete-orphan")
-    test_options = relationship("TestOption", back_populates="clinic", cascade="all, delete-orphan")
-    medicine_options = relationship("MedicineOption", back_populates="clinic", cascade="all, delete-orphan")
-    dosage_options = relationship("DosageOption", back_populates="clinic", cascade="all, delete-orphan")
-    duration_options = relationship("DurationOption", back_populates="clinic", cascade="all, delete-orphan")
-    symptom_options = relationship("SymptomOption", back_populates="clinic", cascade="all, delete-orphan")
-    user_permissions = relationship("UserPermission", back_populates="clinic", cascade="all, delete-orphan")
+    patients = relationship("Patient", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    appointments = relationship("Appointment", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    visits = relationship("Visit", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    invoices = relationship("Invoice", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    admins = relationship("ClinicAdmin", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    chief_complaints = relationship("ChiefComplaint", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    diagnosis_options = relationship("DiagnosisOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    observation_options = relationship("ObservationOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    test_options = relationship("TestOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    medicine_options = relationship("MedicineOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    dosage_options = relationship("DosageOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    duration_options = relationship("DurationOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    symptom_options = relationship("SymptomOption", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
+    user_permissions = relationship("UserPermission", back_populates="clinic", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class User(Base):
@@ -95,12 +103,12 @@ class User(Base):
     last_login = Column(DateTime(timezone=True))
 
     clinic = relationship("Clinic", back_populates="users")
-    managed_clinics = relationship("ClinicAdmin", back_populates="admin", cascade="all, delete-orphan")
-    doctor = relationship("Doctor", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    managed_clinics = relationship("ClinicAdmin", back_populates="admin", cascade="all, delete-orphan", passive_deletes=True)
+    doctor = relationship("Doctor", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     created_patients = relationship("Patient", back_populates="creator")
     created_appointments = relationship("Appointment", back_populates="creator")
     created_invoices = relationship("Invoice", back_populates="creator")
-    permissions = relationship("UserPermission", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    permissions = relationship("UserPermission", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Doctor(Base):
@@ -113,7 +121,7 @@ class Doctor(Base):
     qualification = Column(String)
     registration_number = Column(String)
     signature_url = Column(String)
-    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False)
+    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -124,6 +132,18 @@ class Doctor(Base):
 
 class Patient(Base):
     __tablename__ = "patients"
+    __table_args__ = (
+        Index("ix_patients_clinic_id_last_visit_at", "clinic_id", "last_visit_at"),
+        # Patient directory: keyset order and its filters
+        Index("ix_patients_clinic_id_created_at_id", "clinic_id", "created_at", "id"),
+        Index("ix_patients_clinic_id_gender_age", "clinic_id", "gender", "age"),
+        Index("ix_patients_clinic_id_blood_group", "clinic_id", "blood_group"),
+        Index(
+            "ix_patients_with_allergies", "clinic_id", "created_at",
+            postgresql_where=text("cardinality(allergies) > 0"),
+        ),
+        Index("ix_patients_allergies_gin", "allergies", postgresql_using="gin"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     patient_code = Column(String, unique=True, nullable=False, index=True)
@@ -136,28 +156,42 @@ class Patient(Base):
     blood_group = Column(String)
     allergies = Column(ARRAY(String), default=[])
     medical_history = Column(JSON)
-    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False)
+    last_visit_number = Column(Integer, nullable=False, default=0, server_default="0")  # visit_number counter
+    # Summary of visits and invoices, maintained by database triggers (migration 0018)
+    visit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_visit_at = Column(DateTime(timezone=True), nullable=True)
+    last_follow_up_date = Column(Date, nullable=True)  # latest follow-up date on any visit
+    outstanding_balance = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
+    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False, index=True)
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     clinic = relationship("Clinic", back_populates="patients")
     creator = relationship("User", back_populates="created_patients")
-    appointments = relationship("Appointment", back_populates="patient", cascade="all, delete-orphan")
-    visits = relationship("Visit", back_populates="patient", cascade="all, delete-orphan")
-    invoices = relationship("Invoice", back_populates="patient", cascade="all, delete-orphan")
+    appointments = relationship("Appointment", back_populates="patient", cascade="all, delete-orphan", passive_deletes=True)
+    visits = relationship("Visit", back_populates="patient", cascade="all, delete-orphan", passive_deletes=True)
+    invoices = relationship("Invoice", back_populates="patient", cascade="all, delete-orphan", passive_deletes=True)
 
 
+# appointments and visits may be range-partitioned by date (migration 0017). The
+# database primary keys then include the date, and the unique visits.appointment_id
+# and the appointment -> visit -> medicines/invoice cascades are enforced by
+# triggers. Rows are still addressed by id alone.
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_chief_complaints_gin", "chief_complaints", postgresql_using="gin"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     appointment_date = Column(Date, nullable=False, index=True)
     queue_number = Column(Integer)
     chief_complaints = Column(ARRAY(String), default=[])
     status = Column(Enum(AppointmentStatusEnum), default=AppointmentStatusEnum.WAITING)
-    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False)
+    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False, index=True)
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -165,15 +199,23 @@ class Appointment(Base):
     patient = relationship("Patient", back_populates="appointments")
     clinic = relationship("Clinic", back_populates="appointments")
     creator = relationship("User", back_populates="created_appointments")
-    visit = relationship("Visit", back_populates="appointment", uselist=False, cascade="all, delete-orphan")
+    visit = relationship("Visit", back_populates="appointment", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Visit(Base):
     __tablename__ = "visits"
+    __table_args__ = (
+        Index("ix_visits_clinic_id_visit_date", "clinic_id", "visit_date"),
+        # Array containment (@>) lookups for clinical analytics
+        Index("ix_visits_diagnosis_gin", "diagnosis", postgresql_using="gin"),
+        Index("ix_visits_symptoms_gin", "symptoms", postgresql_using="gin"),
+        Index("ix_visits_observations_gin", "observations", postgresql_using="gin"),
+        Index("ix_visits_recommended_tests_gin", "recommended_tests", postgresql_using="gin"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
-    appointment_id = Column(String, ForeignKey("appointments.id"), unique=True)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
+    appointment_id = Column(String, ForeignKey("appointments.id", ondelete="CASCADE"), unique=True)
     visit_date = Column(DateTime(timezone=True), nullable=False, index=True)
     visit_number = Column(Integer, nullable=False)
     doctor_id = Column(String, ForeignKey("doctors.id"), nullable=False)
@@ -193,18 +235,24 @@ class Visit(Base):
     appointment = relationship("Appointment", back_populates="visit")
     doctor = relationship("Doctor", back_populates="visits")
     clinic = relationship("Clinic", back_populates="visits")
-    medicines = relationship("VisitMedicine", back_populates="visit", cascade="all, delete-orphan")
-    invoice = relationship("Invoice", back_populates="visit", uselist=False, cascade="all, delete-orphan")
+    medicines = relationship("VisitMedicine", back_populates="visit", cascade="all, delete-orphan", passive_deletes=True, order_by="VisitMedicine.sort_order")
+    invoice = relationship("Invoice", back_populates="visit", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
 
 class VisitMedicine(Base):
     __tablename__ = "visit_medicines"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    visit_id = Column(String, ForeignKey("visits.id", ondelete="CASCADE"), nullable=False)
+    visit_id = Column(String, ForeignKey("visits.id", ondelete="CASCADE"), nullable=False, index=True)
     medicine_name = Column(String, nullable=False)
     dosage = Column(String)
     duration = Column(String)
+    sort_order = Column(Integer, nullable=False, default=0, server_default="0")  # position on the prescription
+
+    # Case-insensitive medicine lookups (cohort search, drug recalls)
+    __table_args__ = (
+        Index("ix_visit_medicines_medicine_name_lower", func.lower(medicine_name)),
+    )
 
     visit = relationship("Visit", back_populates="medicines")
 
@@ -214,15 +262,15 @@ class Invoice(Base):
 
     id = Column(String, primary_key=True, default=generate_uuid)
     invoice_number = Column(String, unique=True, nullable=False, index=True)
-    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
-    visit_id = Column(String, ForeignKey("visits.id"), unique=True)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
+    visit_id = Column(String, ForeignKey("visits.id", ondelete="CASCADE"), unique=True)
     total_amount = Column(Numeric(10, 2), nullable=False)
     paid_amount = Column(Numeric(10, 2), default=0)
     payment_status = Column(Enum(PaymentStatusEnum), default=PaymentStatusEnum.UNPAID)
     payment_mode = Column(Enum(PaymentModeEnum))
     payment_date = Column(Date)
     notes = Column(Text)
-    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False)
+    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False, index=True)
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -231,14 +279,14 @@ class Invoice(Base):
     visit = relationship("Visit", back_populates="invoice")
     clinic = relationship("Clinic", back_populates="invoices")
     creator = relationship("User", back_populates="created_invoices")
-    items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan")
+    items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class InvoiceItem(Base):
     __tablename__ = "invoice_items"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    invoice_id = Column(String, ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False)
+    invoice_id = Column(String, ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False, index=True)
     description = Column(String, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     quantity = Column(Integer, default=1)
@@ -250,7 +298,7 @@ class ClinicAdmin(Base):
     __tablename__ = "clinic_admins"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    admin_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    admin_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -415,3 +463,33 @@ class UserPermission(Base):
 
     user = relationship("User", back_populates="permissions")
     clinic = relationship("Clinic", back_populates="user_permissions")
+
+
+class ClinicPurgeJob(Base):
+    """Background deletion of a large clinic; outlives the clinic row itself"""
+    __tablename__ = "clinic_purge_jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    clinic_id = Column(String, nullable=False, index=True)  # no FK - the clinic is deleted by the job
+    clinic_name = Column(String)
+    requested_by = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    status = Column(Enum(PurgeJobStatusEnum), nullable=False, default=PurgeJobStatusEnum.PENDING)
+    total_rows = Column(JSON, default={})    # {"visits": 120000, ...} when the job started
+    deleted_rows = Column(JSON, default={})  # progress so far, same keys
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+
+class OptionUsage(Base):
+    """How often a doctor picks a master option, decayed over time (app/services/option_usage.py)"""
+    __tablename__ = "option_usage"
+
+    doctor_id = Column(String, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    option_type = Column(String, primary_key=True)  # diagnosis, medicine, dosage, duration
+    context = Column(String, primary_key=True, default="")  # "" or, for co-prescriptions, the other medicine
+    name = Column(String, primary_key=True)  # lower-cased option name
+    clinic_id = Column(String, ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False, default=0)  # decayed use count as of updated_at
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
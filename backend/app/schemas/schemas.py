@@ -295,6 +295,15 @@ class InvoiceResponse(InvoiceBase):
         from_attributes = True
 
 
+class InvoiceDetailResponse(InvoiceResponse):
+    clinic_id: str
+    created_by: str
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Admin Schemas
 class ClinicCreate(BaseModel):
     name: str
@@ -334,6 +343,40 @@ class AdminDashboardStats(BaseModel):
     total_patients: int
 
 
+class AdminClinicOverview(BaseModel):
+    id: str
+    clinic_code: Optional[str] = None
+    name: str
+    owner_doctor_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    doctor_count: int
+    patient_count: int
+    visits_this_month: int
+    collections_this_month: float
+
+
+class AdminOverviewResponse(BaseModel):
+    clinics: List[AdminClinicOverview]
+    period: dict
+    pagination: dict
+
+
+class ClinicPurgeJobResponse(BaseModel):
+    id: str
+    clinic_id: str
+    clinic_name: Optional[str] = None
+    status: str
+    total_rows: Optional[dict] = None
+    deleted_rows: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Chief Complaint Schemas
 class ChiefComplaintBase(BaseModel):
     name: str
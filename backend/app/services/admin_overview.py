@@ -0,0 +1,148 @@
+"""
+Per-clinic aggregates for the admin overview page.
+
+One statement pages the admin's clinics and joins grouped counts for doctors,
+patients and this month's visits and collections onto that page only, so the
+cost does not grow with the number of clinics the admin manages.
+"""
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from app.models.models import Clinic, ClinicAdmin, Doctor, Patient, Visit
+
+
+def month_bounds(today: date) -> Tuple[date, date]:
+    """First day of this month and first day of the next month"""
+    start = today.replace(day=1)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def build_overview_statement(
+    admin_id: str,
+    period_start: date,
+    period_end: date,
+    offset: int,
+    limit: int,
+    search: Optional[str] = None,
+):
+    managed = (
+        select(
+            Clinic.id,
+            Clinic.clinic_code,
+            Clinic.name,
+            Clinic.owner_doctor_id,
+            Clinic.created_at,
+            func.count().over().label("total"),
+        )
+        .join(ClinicAdmin, ClinicAdmin.clinic_id == Clinic.id)
+        .where(ClinicAdmin.admin_id == admin_id)
+    )
+    if search:
+        term = f"%{search}%"
+        managed = managed.where(or_(Clinic.name.ilike(term), Clinic.clinic_code.ilike(term)))
+    page = managed.order_by(Clinic.name, Clinic.id).offset(offset).limit(limit).cte("page")
+    page_ids = select(page.c.id)
+
+    # Each child table is grouped on its own before joining, so rows never fan out
+    doctors = (
+        select(Doctor.clinic_id, func.count().label("doctor_count"))
+        .where(Doctor.clinic_id.in_(page_ids))
+        .group_by(Doctor.clinic_id)
+        .subquery()
+    )
+    patients = (
+        select(Patient.clinic_id, func.count().label("patient_count"))
+        .where(Patient.clinic_id.in_(page_ids))
+        .group_by(Patient.clinic_id)
+        .subquery()
+    )
+    visits = (
+        select(
+            Visit.clinic_id,
+            func.count().label("visit_count"),
+            func.coalesce(func.sum(Visit.amount), 0).label("collections"),
+        )
+        .where(
+            Visit.clinic_id.in_(page_ids),
+            Visit.visit_date >= period_start,
+            Visit.visit_date < period_end,
+        )
+        .group_by(Visit.clinic_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            page,
+            func.coalesce(doctors.c.doctor_count, 0).label("doctor_count"),
+            func.coalesce(patients.c.patient_count, 0).label("patient_count"),
+            func.coalesce(visits.c.visit_count, 0).label("visits_this_month"),
+            func.coalesce(visits.c.collections, 0).label("collections_this_month"),
+        )
+        .outerjoin(doctors, doctors.c.clinic_id == page.c.id)
+        .outerjoin(patients, patients.c.clinic_id == page.c.id)
+        .outerjoin(visits, visits.c.clinic_id == page.c.id)
+        .order_by(page.c.name, page.c.id)
+    )
+
+
+def get_admin_overview(
+    db: Session,
+    admin_id: str,
+    today: date,
+    page: int,
+    limit: int,
+    search: Optional[str] = None,
+) -> Tuple[List[dict], int, Tuple[date, date]]:
+    """
+    Fetch one page of the admin's clinics with their aggregates.
+
+    Args:
+        db: Database session
+        admin_id: The admin user's id
+        today: Reference date for "this month"
+        page: 1-based page number
+        limit: Clinics per page
+        search: Optional filter on clinic name or code
+
+    Returns:
+        (clinic rows, total managed clinics matching the filter, (period start, period end))
+    """
+    period = month_bounds(today)
+    rows = db.execute(
+        build_overview_statement(admin_id, period[0], period[1], (page - 1) * limit, limit, search)
+    ).mappings().all()
+
+    if rows:
+        total = rows[0]["total"]
+    elif page > 1:
+        # Past the last page: the window count is not available, count separately
+        query = db.query(func.count(ClinicAdmin.id)).join(Clinic, ClinicAdmin.clinic_id == Clinic.id).filter(
+            ClinicAdmin.admin_id == admin_id
+        )
+        if search:
+            term = f"%{search}%"
+            query = query.filter(or_(Clinic.name.ilike(term), Clinic.clinic_code.ilike(term)))
+        total = query.scalar()
+    else:
+        total = 0
+
+    clinics = [
+        {
+            "id": row["id"],
+            "clinic_code": row["clinic_code"],
+            "name": row["name"],
+            "owner_doctor_id": row["owner_doctor_id"],
+            "created_at": row["created_at"],
+            "doctor_count": row["doctor_count"],
+            "patient_count": row["patient_count"],
+            "visits_this_month": row["visits_this_month"],
+            "collections_this_month": float(row["collections_this_month"]),
+        }
+        for row in rows
+    ]
+    return clinics, total, period
@@ -1,9 +1,22 @@
 """
 Service for seeding clinic fixtures on creation.
+
+Each fixture category is written with one multi-row INSERT ... SELECT that
+crosses the in-code fixture list (sent as a VALUES list) with the target
+clinics, so seeding costs one statement per category no matter how many
+clinics or rows are involved. Ids come from gen_random_uuid() in the database.
+A clinic that already has rows in a category is skipped by the statement
+itself, so concurrent or repeated runs never duplicate fixtures.
 """
 
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import Integer, String, cast, column, exists, func, insert, literal, select, true, union_all, values
 from sqlalchemy.orm import Session
-from app.models.models import ChiefComplaint, DiagnosisOption, ObservationOption, TestOption, MedicineOption, DosageOption, DurationOption
+from app.core.invalidation import publish
+from app.models.models import (
+    ChiefComplaint, Clinic, DiagnosisOption, ObservationOption, TestOption, MedicineOption, DosageOption, DurationOption
+)
 from app.fixtures.dental_fixtures import (
     DENTAL_CHIEF_COMPLAINTS,
     DENTAL_DIAGNOSES,
@@ -15,6 +28,83 @@ from app.fixtures.dental_fixtures import (
 )
 
 
+class FixtureCategory(NamedTuple):
+    key: str
+    model: type
+    items: List[dict]
+    entity: str
+
+
+FIXTURE_CATEGORIES = [
+    FixtureCategory("chief_complaints", ChiefComplaint, DENTAL_CHIEF_COMPLAINTS, "chief_complaint"),
+    FixtureCategory("diagnoses", DiagnosisOption, DENTAL_DIAGNOSES, "diagnosis_option"),
+    FixtureCategory("observations", ObservationOption, DENTAL_OBSERVATIONS, "observation_option"),
+    FixtureCategory("tests", TestOption, DENTAL_TEST_OPTIONS, "test_option"),
+    FixtureCategory("medicines", MedicineOption, DENTAL_MEDICINES, "medicine_option"),
+    FixtureCategory("dosages", DosageOption, DENTAL_DOSAGES, "dosage_option"),
+    FixtureCategory("durations", DurationOption, DENTAL_DURATIONS, "duration_option"),
+]
+
+CATEGORIES_BY_KEY = {category.key: category for category in FIXTURE_CATEGORIES}
+
+
+def build_fixture_insert(category: FixtureCategory, clinic_ids: List[str]):
+    """INSERT ... SELECT of every fixture row in ``category`` for each of ``clinic_ids`` that has none yet"""
+    table = category.model.__table__
+    existing = table.alias("existing")
+    clinics = Clinic.__table__
+    fixtures = values(
+        column("name", String),
+        column("description", String),
+        column("display_order", Integer),
+        name="fixtures",
+    ).data([(item["name"], item["description"], item["display_order"]) for item in category.items])
+
+    rows = select(
+        cast(func.gen_random_uuid(), String),
+        clinics.c.id,
+        fixtures.c.name,
+        fixtures.c.description,
+        fixtures.c.display_order,
+        literal(True),
+    ).select_from(clinics.join(fixtures, true())).where(
+        clinics.c.id.in_(clinic_ids),
+        ~exists().where(existing.c.clinic_id == clinics.c.id),
+    )
+
+    return insert(table).from_select(
+        [table.c.id, table.c.clinic_id, table.c.name, table.c.description, table.c.display_order, table.c.is_active],
+        rows,
+    )
+
+
+def seed_fixtures(db: Session, clinic_ids: List[str], categories: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Insert fixture categories for a batch of clinics, one statement per category.
+
+    Queues an option list invalidation per seeded category and clinic, so the
+    caller's commit evicts the (empty) lists other workers have cached.
+
+    Args:
+        db: Database session (the caller commits)
+        clinic_ids: Clinics to seed
+        categories: Category keys to seed (default: all of them)
+
+    Returns:
+        Rows inserted per category
+    """
+    if not clinic_ids:
+        return {}
+    keys = list(categories) if categories is not None else list(CATEGORIES_BY_KEY)
+    seeded = {}
+    for key in keys:
+        category = CATEGORIES_BY_KEY[key]
+        seeded[key] = db.execute(build_fixture_insert(category, clinic_ids)).rowcount
+        for clinic_id in clinic_ids:
+            publish(db, category.entity, clinic_id=clinic_id)
+    return seeded
+
+
 def seed_dental_fixtures_for_clinic(db: Session, clinic_id: str) -> None:
     """
     Seed all dental fixtures for a newly created clinic.
@@ -23,72 +113,38 @@ def seed_dental_fixtures_for_clinic(db: Session, clinic_id: str) -> None:
         db: Database session
         clinic_id: The ID of the clinic to seed fixtures for
     """
-    # Seed Chief Complaints
-    for item in DENTAL_CHIEF_COMPLAINTS:
-        db.add(ChiefComplaint(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Diagnosis Options
-    for item in DENTAL_DIAGNOSES:
-        db.add(DiagnosisOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Observation Options
-    for item in DENTAL_OBSERVATIONS:
-        db.add(ObservationOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Test Options
-    for item in DENTAL_TEST_OPTIONS:
-        db.add(TestOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Medicine Options
-    for item in DENTAL_MEDICINES:
-        db.add(MedicineOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Dosage Options
-    for item in DENTAL_DOSAGES:
-        db.add(DosageOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
-
-    # Seed Duration Options
-    for item in DENTAL_DURATIONS:
-        db.add(DurationOption(
-            clinic_id=clinic_id,
-            name=item["name"],
-            description=item["description"],
-            display_order=item["display_order"],
-            is_active=True
-        ))
+    seed_fixtures(db, [clinic_id])
+
+
+def build_missing_categories_statement():
+    """One row per clinic with the fixture categories it already has"""
+    clinics = Clinic.__table__
+    present = union_all(*(
+        select(
+            category.model.__table__.c.clinic_id,
+            literal(category.key).label("category"),
+        ).group_by(category.model.__table__.c.clinic_id)
+        for category in FIXTURE_CATEGORIES
+    )).subquery("present")
+
+    return select(
+        clinics.c.id,
+        func.array_remove(func.array_agg(present.c.category), None).label("categories"),
+    ).select_from(
+        clinics.outerjoin(present, present.c.clinic_id == clinics.c.id)
+    ).group_by(clinics.c.id)
+
+
+def find_missing_categories(db: Session) -> Dict[str, List[str]]:
+    """
+    Fixture categories that are completely empty, per clinic, in one query.
+
+    Returns:
+        clinic_id -> missing category keys, for clinics missing at least one
+    """
+    missing = {}
+    for clinic_id, categories in db.execute(build_missing_categories_statement()):
+        absent = [key for key in CATEGORIES_BY_KEY if key not in set(categories or [])]
+        if absent:
+            missing[clinic_id] = absent
+    return missing
@@ -0,0 +1,128 @@
+"""
+Service for deleting clinics.
+
+Everything a clinic owns is removed by ON DELETE CASCADE in the database, so a
+small clinic goes in a single DELETE. For a large tenant that one statement
+would hold locks on hundreds of thousands of rows in one long transaction, so
+a purge job deletes the clinical history in chunks instead - one short
+transaction per chunk - and records its progress on a ClinicPurgeJob row that
+any worker can report on.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.invalidation import publish
+from app.models.models import (
+    Appointment, Clinic, ClinicAdmin, ClinicPurgeJob, Invoice, Patient, PurgeJobStatusEnum, User, Visit
+)
+
+logger = logging.getLogger(__name__)
+
+# Deleted in this order: invoices reference visits, visits reference appointments,
+# and all of them reference patients. Items and medicines go with their parents.
+PURGE_TABLES = [Invoice.__table__, Visit.__table__, Appointment.__table__, Patient.__table__]
+
+# A RUNNING job that has not reported progress for this long lost its worker
+STALE_AFTER = timedelta(minutes=5)
+
+
+def count_clinic_rows(db: Session, clinic_id: str) -> Dict[str, int]:
+    """Row counts of the bulky per-clinic tables, in one round-trip"""
+    counts = [
+        select(func.count()).select_from(table).where(table.c.clinic_id == clinic_id).scalar_subquery().label(table.name)
+        for table in PURGE_TABLES
+    ]
+    return dict(db.execute(select(*counts)).mappings().one())
+
+
+def start_purge_job(db: Session, clinic: Clinic, requested_by: str, totals: Dict[str, int]) -> ClinicPurgeJob:
+    """
+    Take a clinic out of service and record a purge job for it.
+
+    Admins are detached and the clinic's users deactivated straight away, so the
+    clinic disappears from the admin UI and nobody can log in while its rows are
+    being deleted. The caller commits.
+
+    Args:
+        db: Database session
+        clinic: Clinic to delete
+        requested_by: Admin user id
+        totals: Row counts from count_clinic_rows()
+
+    Returns:
+        The new job
+    """
+    db.execute(delete(ClinicAdmin.__table__).where(ClinicAdmin.__table__.c.clinic_id == clinic.id))
+    db.execute(update(User.__table__).where(User.__table__.c.clinic_id == clinic.id).values(is_active=False))
+    publish(db, "clinic", clinic.id, clinic_id=clinic.id)
+
+    job = ClinicPurgeJob(
+        clinic_id=clinic.id,
+        clinic_name=clinic.name,
+        requested_by=requested_by,
+        status=PurgeJobStatusEnum.PENDING,
+        total_rows=totals,
+        deleted_rows={name: 0 for name in totals},
+    )
+    db.add(job)
+    return job
+
+
+def is_resumable(job: ClinicPurgeJob) -> bool:
+    if job.status == PurgeJobStatusEnum.FAILED:
+        return True
+    if job.status in (PurgeJobStatusEnum.PENDING, PurgeJobStatusEnum.RUNNING) and job.updated_at:
+        return job.updated_at < datetime.now(timezone.utc) - STALE_AFTER
+    return False
+
+
+def run_purge_job(job_id: str, chunk_size: int) -> None:
+    """
+    Delete a clinic chunk by chunk. Runs after the response, in its own session.
+
+    Safe to run again after a crash or failure: every step deletes whatever is
+    left for the clinic.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(ClinicPurgeJob, job_id)
+        if job is None:
+            return
+        job.status = PurgeJobStatusEnum.RUNNING
+        job.error = None
+        db.commit()
+
+        deleted = dict(job.deleted_rows or {})
+        for table in PURGE_TABLES:
+            while True:
+                chunk = select(table.c.id).where(table.c.clinic_id == job.clinic_id).limit(chunk_size).scalar_subquery()
+                count = db.execute(delete(table).where(table.c.id.in_(chunk))).rowcount
+                if not count:
+                    break
+                deleted[table.name] = deleted.get(table.name, 0) + count
+                # Progress is committed with the chunk it describes
+                job.deleted_rows = dict(deleted)
+                db.commit()
+            logger.info(f"Purge {job.id}: {table.name} done ({deleted.get(table.name, 0)} rows)")
+
+        # Only small tables are left; the database cascades them with the clinic row
+        db.execute(delete(Clinic.__table__).where(Clinic.__table__.c.id == job.clinic_id))
+        job.status = PurgeJobStatusEnum.COMPLETED
+        job.finished_at = func.now()
+        db.commit()
+        logger.info(f"Purge {job.id}: clinic {job.clinic_id} deleted")
+    except Exception as e:
+        logger.exception(f"Purge {job_id} failed")
+        db.rollback()
+        job = db.get(ClinicPurgeJob, job_id)
+        if job is not None:
+            job.status = PurgeJobStatusEnum.FAILED
+            job.error = str(e)
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,265 @@
+"""
+Clinical analytics over the ARRAY(String) columns of visits, appointments and patients.
+
+Every report is a single grouped statement: array columns are expanded with
+unnest() and counted in the database, and term lookups use the array
+containment operator (@>) so the GIN indexes from migration 0020 apply.
+Nothing is loaded row by row into Python.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.orm import Session
+from app.models.models import Appointment, Doctor, Patient, User, Visit, VisitMedicine
+
+# field -> (array column, date column bounding the range, or None for a current snapshot)
+TERM_FIELDS = {
+    "diagnosis": (Visit.diagnosis, Visit.visit_date),
+    "symptoms": (Visit.symptoms, Visit.visit_date),
+    "observations": (Visit.observations, Visit.visit_date),
+    "recommended_tests": (Visit.recommended_tests, Visit.visit_date),
+    "chief_complaints": (Appointment.chief_complaints, Appointment.appointment_date),
+    "allergies": (Patient.allergies, None),
+}
+
+
+def quarter_start(today: date) -> date:
+    return today.replace(month=(today.month - 1) // 3 * 3 + 1, day=1)
+
+
+def _in_range(column, start: date, end: date) -> list:
+    # Half-open bounds on the raw column keep the date/visit_date indexes usable
+    return [column >= start, column < end + timedelta(days=1)]
+
+
+def _contains(column, *terms: str):
+    """``column @> ARRAY[terms]`` typed like the column, so its GIN index matches"""
+    return column.op("@>")(cast(array(list(terms)), column.type))
+
+
+def top_terms(db: Session, clinic_id: str, field: str, start: date, end: date, limit: int) -> List[Dict]:
+    """
+    Most frequent values of an array field in the period.
+
+    Args:
+        db: Database session
+        clinic_id: Clinic to report on
+        field: Key of TERM_FIELDS
+        start: First day of the period
+        end: Last day of the period (inclusive)
+        limit: Number of terms to return
+
+    Returns:
+        [{"term", "count"}] by count, highest first
+    """
+    column, date_column = TERM_FIELDS[field]
+    table = column.class_
+    expanded = select(func.unnest(column).label("term")).where(table.clinic_id == clinic_id)
+    if date_column is not None:
+        expanded = expanded.where(*_in_range(date_column, start, end))
+    expanded = expanded.subquery()
+
+    count = func.count().label("count")
+    rows = db.execute(
+        select(expanded.c.term, count).group_by(expanded.c.term).order_by(count.desc(), expanded.c.term).limit(limit)
+    ).all()
+    return [{"term": row.term, "count": row.count} for row in rows]
+
+
+def co_occurring_terms(
+    db: Session, clinic_id: str, field: str, term: str, start: date, end: date, limit: int
+) -> Tuple[int, List[Dict]]:
+    """
+    Values recorded together with ``term`` on the same visit.
+
+    Returns:
+        (number of visits with the term, [{"term", "count"}] of the other values)
+    """
+    column = TERM_FIELDS[field][0]
+    matching = select(Visit.id, column.label("terms")).where(
+        Visit.clinic_id == clinic_id, _contains(column, term), *_in_range(Visit.visit_date, start, end)
+    ).cte("matching")
+    expanded = select(func.unnest(matching.c.terms).label("term")).subquery()
+
+    count = func.count().label("count")
+    statement = select(
+        expanded.c.term,
+        count,
+        select(func.count()).select_from(matching).scalar_subquery().label("visits"),
+    ).where(expanded.c.term != term).group_by(expanded.c.term).order_by(count.desc(), expanded.c.term).limit(limit)
+    rows = db.execute(statement).all()
+    visits = rows[0].visits if rows else db.execute(select(func.count()).select_from(matching)).scalar()
+    return visits, [{"term": row.term, "count": row.count} for row in rows]
+
+
+def patients_with_term(
+    db: Session, clinic_id: str, field: str, term: str, start: date, end: date, limit: int
+) -> List[Dict]:
+    """Patients with a visit in the period recording ``term``, most recent first"""
+    column = TERM_FIELDS[field][0]
+    matches = (
+        select(
+            Visit.patient_id,
+            func.count().label("visits"),
+            func.max(Visit.visit_date).label("last_recorded_at"),
+        )
+        .where(Visit.clinic_id == clinic_id, _contains(column, term), *_in_range(Visit.visit_date, start, end))
+        .group_by(Visit.patient_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Patient.id, Patient.patient_code, Patient.full_name, matches.c.visits, matches.c.last_recorded_at)
+        .join(matches, matches.c.patient_id == Patient.id)
+        .order_by(matches.c.last_recorded_at.desc())
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "patient_id": row.id,
+            "patient_code": row.patient_code,
+            "full_name": row.full_name,
+            "visits": row.visits,
+            "last_recorded_at": row.last_recorded_at,
+        }
+        for row in rows
+    ]
+
+
+def build_cohort_statement(
+    clinic_id: str,
+    diagnoses: Optional[List[str]] = None,
+    allergies: Optional[List[str]] = None,
+    medicine: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """
+    Patients matching every given criterion, with their matching visit counts.
+
+    Visit criteria (all diagnoses on one visit, a prescribed medicine, visit
+    date bounds) select visits that are grouped per patient; a patient needs at
+    least one. Allergies are matched on the patient. With allergies alone,
+    every allergic patient is returned with the number of their visits.
+    """
+    visit_filters = [Visit.clinic_id == clinic_id]
+    if diagnoses:
+        visit_filters.append(_contains(Visit.diagnosis, *diagnoses))
+    if medicine:
+        prescribed = select(VisitMedicine.visit_id).where(func.lower(VisitMedicine.medicine_name) == medicine.lower())
+        visit_filters.append(Visit.id.in_(prescribed))
+    if start:
+        visit_filters.append(Visit.visit_date >= start)
+    if end:
+        visit_filters.append(Visit.visit_date < end + timedelta(days=1))
+    has_visit_criteria = len(visit_filters) > 1
+    if allergies:
+        allergic = select(Patient.id).where(Patient.clinic_id == clinic_id, _contains(Patient.allergies, *allergies))
+        visit_filters.append(Visit.patient_id.in_(allergic))
+
+    matching = (
+        select(
+            Visit.patient_id,
+            func.count().label("matching_visits"),
+            func.min(Visit.visit_date).label("first_match_at"),
+            func.max(Visit.visit_date).label("last_match_at"),
+        )
+        .where(*visit_filters)
+        .group_by(Visit.patient_id)
+        .subquery()
+    )
+
+    statement = select(
+        Patient.id.label("patient_id"),
+        Patient.patient_code,
+        Patient.full_name,
+        Patient.phone,
+        func.coalesce(matching.c.matching_visits, 0).label("matching_visits"),
+        matching.c.first_match_at,
+        matching.c.last_match_at,
+    ).where(Patient.clinic_id == clinic_id)
+    if has_visit_criteria:
+        statement = statement.join(matching, matching.c.patient_id == Patient.id)
+    else:
+        statement = statement.outerjoin(matching, matching.c.patient_id == Patient.id)
+    if allergies:
+        statement = statement.where(_contains(Patient.allergies, *allergies))
+
+    return statement.order_by(matching.c.last_match_at.desc().nulls_last(), Patient.id)
+
+
+def medicine_frequency_by_doctor(db: Session, clinic_id: str, start: date, end: date, limit: int) -> List[Dict]:
+    """The ``limit`` most prescribed medicines of each doctor in the period"""
+    count = func.count().label("count")
+    per_doctor = (
+        select(
+            Visit.doctor_id,
+            VisitMedicine.medicine_name,
+            count,
+            func.row_number().over(
+                partition_by=Visit.doctor_id, order_by=(func.count().desc(), VisitMedicine.medicine_name)
+            ).label("rank"),
+        )
+        .join(Visit, Visit.id == VisitMedicine.visit_id)
+        .where(Visit.clinic_id == clinic_id, *_in_range(Visit.visit_date, start, end))
+        .group_by(Visit.doctor_id, VisitMedicine.medicine_name)
+        .subquery()
+    )
+    rows = db.execute(
+        select(per_doctor, Doctor.doctor_code, User.full_name.label("doctor_name"))
+        .join(Doctor, Doctor.id == per_doctor.c.doctor_id)
+        .join(User, User.id == Doctor.user_id)
+        .where(per_doctor.c.rank <= limit)
+        .order_by(User.full_name, per_doctor.c.rank)
+    ).all()
+
+    doctors: Dict[str, Dict] = {}
+    for row in rows:
+        doctor = doctors.setdefault(row.doctor_id, {
+            "doctor_id": row.doctor_id,
+            "doctor_code": row.doctor_code,
+            "doctor_name": row.doctor_name,
+            "medicines": [],
+        })
+        doctor["medicines"].append({"medicine_name": row.medicine_name, "count": row.count})
+    return list(doctors.values())
+
+
+def weekly_complaint_trends(
+    db: Session, clinic_id: str, start: date, end: date, terms: Optional[List[str]] = None, limit: int = 10
+) -> List[Dict]:
+    """
+    Chief complaint counts per week (weeks start on Monday).
+
+    Args:
+        terms: Complaints to report; by default the ``limit`` most frequent ones in the period
+
+    Returns:
+        [{"week", "counts": {complaint: count}}] in week order
+    """
+    if not terms:
+        terms = [row["term"] for row in top_terms(db, clinic_id, "chief_complaints", start, end, limit)]
+    if not terms:
+        return []
+
+    expanded = (
+        select(
+            cast(func.date_trunc("week", Appointment.appointment_date), Date).label("week"),
+            func.unnest(Appointment.chief_complaints).label("term"),
+        )
+        .where(Appointment.clinic_id == clinic_id, *_in_range(Appointment.appointment_date, start, end))
+        .subquery()
+    )
+    rows = db.execute(
+        select(expanded.c.week, expanded.c.term, func.count().label("count"))
+        .where(expanded.c.term.in_(terms))
+        .group_by(expanded.c.week, expanded.c.term)
+        .order_by(expanded.c.week)
+    ).all()
+
+    weeks: Dict[date, Dict[str, int]] = {}
+    for row in rows:
+        weeks.setdefault(row.week, {term: 0 for term in terms})[row.term] = row.count
+    return [{"week": week, "counts": counts} for week, counts in weeks.items()]
@@ -0,0 +1,123 @@
+"""
+Service for deleting patients and users with their dependent rows.
+
+Each deletion is a single statement: every dependent table is cleared in its
+own data-modifying CTE whose RETURNING rows are counted, so the caller learns
+what was removed without loading any of it. The ON DELETE CASCADE constraints
+behind the passive_deletes relationships stay as the safety net - by the time
+they fire at the end of the statement there is nothing left for them to do.
+"""
+
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.models.models import (
+    Appointment, ClinicAdmin, Doctor, Invoice, InvoiceItem, Patient, User, UserPermission, Visit, VisitMedicine
+)
+
+patients = Patient.__table__
+appointments = Appointment.__table__
+visits = Visit.__table__
+visit_medicines = VisitMedicine.__table__
+invoices = Invoice.__table__
+invoice_items = InvoiceItem.__table__
+users = User.__table__
+doctors = Doctor.__table__
+user_permissions = UserPermission.__table__
+clinic_admins = ClinicAdmin.__table__
+
+
+def _counts(**ctes) -> list:
+    return [select(func.count()).select_from(cte).scalar_subquery().label(name) for name, cte in ctes.items()]
+
+
+def build_delete_patient_statement(patient_id: str, clinic_id: str):
+    patient_invoices = select(invoices.c.id).where(invoices.c.patient_id == patient_id, invoices.c.clinic_id == clinic_id)
+    patient_visits = select(visits.c.id).where(visits.c.patient_id == patient_id, visits.c.clinic_id == clinic_id)
+
+    deleted_invoice_items = delete(invoice_items).where(
+        invoice_items.c.invoice_id.in_(patient_invoices)
+    ).returning(invoice_items.c.id).cte("deleted_invoice_items")
+    deleted_invoices = delete(invoices).where(
+        invoices.c.patient_id == patient_id, invoices.c.clinic_id == clinic_id
+    ).returning(invoices.c.id).cte("deleted_invoices")
+    deleted_medicines = delete(visit_medicines).where(
+        visit_medicines.c.visit_id.in_(patient_visits)
+    ).returning(visit_medicines.c.id).cte("deleted_visit_medicines")
+    deleted_visits = delete(visits).where(
+        visits.c.patient_id == patient_id, visits.c.clinic_id == clinic_id
+    ).returning(visits.c.id).cte("deleted_visits")
+    deleted_appointments = delete(appointments).where(
+        appointments.c.patient_id == patient_id, appointments.c.clinic_id == clinic_id
+    ).returning(appointments.c.id).cte("deleted_appointments")
+    deleted_patient = delete(patients).where(
+        patients.c.id == patient_id, patients.c.clinic_id == clinic_id
+    ).returning(patients.c.id).cte("deleted_patient")
+
+    return select(*_counts(
+        patients=deleted_patient,
+        appointments=deleted_appointments,
+        visits=deleted_visits,
+        visit_medicines=deleted_medicines,
+        invoices=deleted_invoices,
+        invoice_items=deleted_invoice_items,
+    ))
+
+
+def delete_patient(db: Session, patient_id: str, clinic_id: str) -> Optional[Dict[str, int]]:
+    """
+    Delete a patient and their whole history in one statement.
+
+    Args:
+        db: Database session (the caller commits)
+        patient_id: Patient to delete
+        clinic_id: Clinic the patient must belong to
+
+    Returns:
+        Rows deleted per table, or None when the patient is not in this clinic
+    """
+    counts = dict(db.execute(build_delete_patient_statement(patient_id, clinic_id)).mappings().one())
+    return counts if counts["patients"] else None
+
+
+def build_delete_user_statement(user_id: str, clinic_id: str):
+    # Only touch the dependents when the user really is in this clinic
+    clinic_user = select(users.c.id).where(users.c.id == user_id, users.c.clinic_id == clinic_id)
+
+    deleted_doctor = delete(doctors).where(doctors.c.user_id.in_(clinic_user)).returning(doctors.c.id).cte("deleted_doctor")
+    deleted_permissions = delete(user_permissions).where(
+        user_permissions.c.user_id.in_(clinic_user)
+    ).returning(user_permissions.c.id).cte("deleted_permissions")
+    deleted_admin_links = delete(clinic_admins).where(
+        clinic_admins.c.admin_id.in_(clinic_user)
+    ).returning(clinic_admins.c.id).cte("deleted_admin_links")
+    deleted_user = delete(users).where(
+        users.c.id == user_id, users.c.clinic_id == clinic_id
+    ).returning(users.c.id).cte("deleted_user")
+
+    return select(*_counts(
+        users=deleted_user,
+        doctors=deleted_doctor,
+        user_permissions=deleted_permissions,
+        clinic_admins=deleted_admin_links,
+    ))
+
+
+def delete_user(db: Session, user_id: str, clinic_id: str) -> Optional[Dict[str, int]]:
+    """
+    Delete a clinic user with their doctor profile and permissions in one statement.
+
+    Raises IntegrityError when clinical records (patients, appointments,
+    invoices, visits) still point at the user; those must be kept.
+
+    Args:
+        db: Database session (the caller commits)
+        user_id: User to delete
+        clinic_id: Clinic the user must belong to
+
+    Returns:
+        Rows deleted per table, or None when the user is not in this clinic
+    """
+    counts = dict(db.execute(build_delete_user_statement(user_id, clinic_id)).mappings().one())
+    return counts if counts["users"] else None
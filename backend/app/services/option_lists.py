@@ -0,0 +1,46 @@
+"""
+Cached option lists for the visit form dropdowns.
+
+Every option router (chief complaints, diagnoses, observations, tests,
+medicines, dosages, durations, symptoms) serves its list through
+load_option_list(). Lists are cached per (entity, clinic, active_only) in
+option_list_cache; writes publish the entity (app/core/invalidation.py), which
+evicts both variants of the clinic's list on every worker.
+"""
+
+from typing import List, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.cache import option_list_cache
+
+
+def load_option_list(
+    db: Session,
+    model,
+    schema: Type[BaseModel],
+    entity: str,
+    clinic_id: str,
+    active_only: bool = True,
+) -> List[BaseModel]:
+    """
+    A clinic's options in display order, from the cache when possible.
+
+    Args:
+        db: Database session
+        model: Option model (DiagnosisOption, ChiefComplaint, ...)
+        schema: Response schema the options are validated into
+        entity: Invalidation entity of the model ("diagnosis_option", ...)
+        clinic_id: Clinic whose options are listed
+        active_only: Leave out deactivated options
+    """
+    cache_key = (entity, clinic_id, active_only)
+    options = option_list_cache.get(cache_key)
+    if options is None:
+        query = db.query(model).filter(model.clinic_id == clinic_id)
+        if active_only:
+            query = query.filter(model.is_active == True)
+        options = [schema.model_validate(o) for o in query.order_by(model.display_order, model.name).all()]
+        option_list_cache.set(cache_key, options)
+    return options
@@ -0,0 +1,178 @@
+"""
+Service for usage-ranked master option suggestions.
+
+Saving a visit adds the diagnoses, medicines, dosages and durations picked on
+it to the doctor's option_usage rows, plus one row per ordered pair of
+medicines prescribed together (option_type "medicine", context = the medicine
+it was prescribed with). A use is worth 1 and halves every OPTION_USAGE_HALF_LIFE_DAYS, so
+recent habits outrank old ones. Each row keeps its score as of updated_at; a
+save decays the stored score to now and adds (or, for picks removed by an
+edit, subtracts) 1 in the same transaction as the visit.
+
+Rankings are read through a per-doctor DoctorUsage kept in option_usage_cache
+and evicted on every worker when that doctor saves a visit. Scores loaded at
+the same moment all decay by the same factor, so a cached ranking stays in
+order however long it is kept.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import extract, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.cache import option_usage_cache
+from app.core.config import settings
+from app.core.deps import get_doctor_id
+from app.core.invalidation import publish
+from app.models.models import OptionUsage, User
+
+option_usage = OptionUsage.__table__
+
+OPTION_TYPES = ("diagnosis", "medicine", "dosage", "duration")
+
+# visit_medicines column recorded for each option type
+MEDICINE_OPTION_FIELDS = (("medicine", "medicine_name"), ("dosage", "dosage"), ("duration", "duration"))
+
+# (option_type, context, name)
+Use = Tuple[str, str, str]
+
+
+def normalize(name: Optional[str]) -> str:
+    return (name or "").strip().lower()
+
+
+def visit_option_uses(diagnosis: Optional[Iterable[str]], medicines: Iterable[Mapping]) -> Set[Use]:
+    """
+    Options picked on a visit.
+
+    Args:
+        diagnosis: The visit's diagnosis list
+        medicines: Items with medicine_name, dosage and duration keys
+
+    Returns:
+        (option_type, context, name) with lower-cased names; context is "" except
+        for co-prescription pairs
+    """
+    uses = {("diagnosis", "", normalize(name)) for name in diagnosis or []}
+    prescribed = set()
+    for medicine in medicines:
+        for option_type, field in MEDICINE_OPTION_FIELDS:
+            uses.add((option_type, "", normalize(medicine.get(field))))
+        prescribed.add(normalize(medicine.get("medicine_name")))
+    prescribed.discard("")
+    uses |= {("medicine", chosen, other) for chosen in prescribed for other in prescribed if other != chosen}
+    return {use for use in uses if use[2]}
+
+
+def _decayed_score():
+    """option_usage.score decayed from updated_at to now"""
+    age = extract("epoch", func.now() - option_usage.c.updated_at)
+    return option_usage.c.score * func.power(0.5, age / (settings.OPTION_USAGE_HALF_LIFE_DAYS * 86400))
+
+
+def record_option_usage(
+    db: Session, doctor_id: str, clinic_id: str, uses: Set[Use], previous: Iterable[Use] = ()
+) -> None:
+    """
+    Add a visit save to the doctor's usage scores. The caller commits.
+
+    Args:
+        db: Database session
+        doctor_id: Doctor the visit belongs to
+        clinic_id: Clinic of the visit
+        uses: visit_option_uses() of the saved visit
+        previous: visit_option_uses() of the visit before an edit; only the
+            difference is recorded, so re-saving a visit does not count it again
+    """
+    previous = set(previous)
+    added = sorted(uses - previous)
+    removed = sorted(previous - uses)
+
+    # Rows in key order, so concurrent saves by the same doctor lock them in the same order
+    if added:
+        statement = insert(option_usage).values([
+            {"doctor_id": doctor_id, "option_type": option_type, "context": context, "name": name,
+             "clinic_id": clinic_id, "score": 1.0}
+            for option_type, context, name in added
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[option_usage.c.doctor_id, option_usage.c.option_type, option_usage.c.context, option_usage.c.name],
+            set_={"score": _decayed_score() + 1, "updated_at": func.now()},
+        ))
+    for option_type, context, name in removed:
+        db.execute(
+            update(option_usage)
+            .where(
+                option_usage.c.doctor_id == doctor_id,
+                option_usage.c.option_type == option_type,
+                option_usage.c.context == context,
+                option_usage.c.name == name,
+            )
+            .values(score=func.greatest(_decayed_score() - 1, 0), updated_at=func.now())
+        )
+    if added or removed:
+        publish(db, "option_usage", doctor_id, clinic_id=clinic_id)
+
+
+class DoctorUsage:
+    """One doctor's usage scores, all decayed to the moment they were loaded"""
+
+    def __init__(self, doctor_id: str, scores: Dict[str, Dict[str, float]]):
+        self.doctor_id = doctor_id
+        self.scores = scores  # option_type -> {name: score}
+        self._co_prescribed: Dict[str, Tuple[int, List[Tuple[str, float]]]] = {}  # medicine -> (limit, ranked)
+
+    def co_prescribed(self, db: Session, medicine: str, limit: int) -> List[Tuple[str, float]]:
+        """Medicines most often prescribed together with ``medicine``, highest score first"""
+        medicine = normalize(medicine)
+        loaded, ranked = self._co_prescribed.get(medicine, (0, []))
+        if loaded < limit:
+            score = _decayed_score().label("score")
+            rows = db.execute(
+                select(option_usage.c.name, score)
+                .where(
+                    option_usage.c.doctor_id == self.doctor_id,
+                    option_usage.c.option_type == "medicine",
+                    option_usage.c.context == medicine,
+                )
+                .order_by(score.desc(), option_usage.c.name)
+                .limit(limit)
+            ).all()
+            ranked = [(row.name, row.score) for row in rows]
+            self._co_prescribed[medicine] = (limit, ranked)
+        return ranked[:limit]
+
+
+def get_doctor_usage(db: Session, doctor_id: str) -> DoctorUsage:
+    """The doctor's usage scores, loaded with one query and cached per process"""
+    usage = option_usage_cache.get(doctor_id)
+    if usage is None:
+        rows = db.execute(
+            select(option_usage.c.option_type, option_usage.c.name, _decayed_score().label("score"))
+            .where(option_usage.c.doctor_id == doctor_id, option_usage.c.context == "")
+        ).all()
+        scores: Dict[str, Dict[str, float]] = {option_type: {} for option_type in OPTION_TYPES}
+        for row in rows:
+            scores.setdefault(row.option_type, {})[row.name] = row.score
+        usage = DoctorUsage(doctor_id, scores)
+        option_usage_cache.set(doctor_id, usage)
+    return usage
+
+
+def rank_by_usage(options: list, scores: Mapping[str, float], limit: Optional[int] = None) -> list:
+    """
+    Order options by the doctor's usage score, highest first.
+
+    Options the doctor never picked keep their display order after the used
+    ones. ``limit`` keeps only the top suggestions.
+    """
+    ranked = sorted(options, key=lambda option: -scores.get(normalize(option.name), 0.0))
+    return ranked[:limit] if limit else ranked
+
+
+def rank_options_for_user(db: Session, user: User, option_type: str, options: list, limit: Optional[int] = None) -> list:
+    """rank_by_usage() with the user's own scores; users without a doctor profile get ``options`` as they are"""
+    doctor_id = get_doctor_id(db, user.id)
+    if doctor_id is None:
+        return options[:limit] if limit else options
+    return rank_by_usage(options, get_doctor_usage(db, doctor_id).scores.get(option_type, {}), limit)
@@ -0,0 +1,65 @@
+"""
+Service for the denormalized patient summary columns.
+
+Patient.visit_count, last_visit_at, last_follow_up_date and outstanding_balance
+are kept current by statement-level triggers on visits and invoices (migration
+0018_patient_summary), so list pages can sort and filter patients without
+reading their visits. This module recomputes them from scratch, for schemas
+created without the migration or after bulk fixes done with triggers disabled.
+"""
+
+from typing import Iterator, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models.models import Invoice, Patient, Visit
+
+patients = Patient.__table__
+visits = Visit.__table__
+invoices = Invoice.__table__
+
+
+def build_refresh_statement(patient_ids: list):
+    """UPDATE recomputing the summary columns of ``patient_ids`` from their visits and invoices"""
+    def from_visits(aggregate):
+        return select(aggregate).where(visits.c.patient_id == patients.c.id).scalar_subquery()
+
+    outstanding = select(
+        func.coalesce(func.sum(func.greatest(invoices.c.total_amount - func.coalesce(invoices.c.paid_amount, 0), 0)), 0)
+    ).where(invoices.c.patient_id == patients.c.id).scalar_subquery()
+
+    return update(patients).where(patients.c.id.in_(patient_ids)).values(
+        visit_count=from_visits(func.count()),
+        last_visit_at=from_visits(func.max(visits.c.visit_date)),
+        last_follow_up_date=from_visits(func.max(visits.c.follow_up_date)),
+        outstanding_balance=outstanding,
+        summary_updated_at=func.now(),
+        # Keep updated_at untouched: a recomputed summary is not a patient edit
+        updated_at=patients.c.updated_at,
+    )
+
+
+def rebuild_patient_summaries(db: Session, clinic_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[int]:
+    """
+    Recompute the summary columns batch by batch, committing each batch.
+
+    Args:
+        db: Database session
+        clinic_id: Only rebuild this clinic's patients
+        batch_size: Patients per transaction
+
+    Yields:
+        Number of patients refreshed by each batch
+    """
+    after = ""
+    while True:
+        query = select(patients.c.id).where(patients.c.id > after)
+        if clinic_id:
+            query = query.where(patients.c.clinic_id == clinic_id)
+        ids = db.execute(query.order_by(patients.c.id).limit(batch_size)).scalars().all()
+        if not ids:
+            return
+        db.execute(build_refresh_statement(ids))
+        db.commit()
+        after = ids[-1]
+        yield len(ids)
@@ -0,0 +1,189 @@
+"""
+Service for keeping a visit's prescribed medicines in sync with the editor.
+"""
+
+from typing import Iterable, List, Mapping, Optional
+
+from sqlalchemy import Integer, String, column, delete, insert, select, update, values
+from sqlalchemy.orm import Session
+from app.models.models import VisitMedicine, generate_uuid
+
+visit_medicines = VisitMedicine.__table__
+
+MEDICINE_FIELDS = ("medicine_name", "dosage", "duration")
+
+
+def _row_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "medicine_name": row.medicine_name,
+        "dosage": row.dosage,
+        "duration": row.duration,
+    }
+
+
+def _key(item: Mapping) -> tuple:
+    return tuple(item.get(field) for field in MEDICINE_FIELDS)
+
+
+def load_visit_medicines(db: Session, visit_id: str) -> List[dict]:
+    """A visit's current medicine rows as dictionaries (with their sort_order), in prescription order"""
+    return [
+        dict(_row_to_dict(row), sort_order=row.sort_order)
+        for row in db.execute(
+            select(
+                visit_medicines.c.id,
+                visit_medicines.c.medicine_name,
+                visit_medicines.c.dosage,
+                visit_medicines.c.duration,
+                visit_medicines.c.sort_order,
+            ).where(visit_medicines.c.visit_id == visit_id).order_by(visit_medicines.c.sort_order)
+        )
+    ]
+
+
+def insert_visit_medicines(
+    db: Session,
+    visit_id: str,
+    medicines: Iterable[Mapping],
+    sort_orders: Optional[List[int]] = None,
+) -> List[dict]:
+    """
+    Insert medicines for a visit with a single multi-row INSERT ... RETURNING.
+
+    Args:
+        db: Database session
+        visit_id: The visit the medicines belong to
+        medicines: Items with medicine_name, dosage and duration keys
+        sort_orders: Prescription position of each item (default: input order)
+
+    Returns:
+        The inserted rows as dictionaries, in input order
+    """
+    medicines = list(medicines)
+    if sort_orders is None:
+        sort_orders = list(range(len(medicines)))
+    rows = [
+        {
+            "id": generate_uuid(),
+            "visit_id": visit_id,
+            "sort_order": sort_order,
+            **{field: item.get(field) for field in MEDICINE_FIELDS},
+        }
+        for item, sort_order in zip(medicines, sort_orders)
+    ]
+    if not rows:
+        return []
+
+    result = db.execute(
+        insert(visit_medicines).values(rows).returning(
+            visit_medicines.c.id,
+            visit_medicines.c.medicine_name,
+            visit_medicines.c.dosage,
+            visit_medicines.c.duration,
+        )
+    )
+    returned = {row.id: _row_to_dict(row) for row in result}
+    return [returned[row["id"]] for row in rows]
+
+
+def sync_visit_medicines(
+    db: Session,
+    visit_id: str,
+    medicines: Iterable[Mapping],
+    existing: Optional[List[dict]] = None,
+) -> List[dict]:
+    """
+    Bring a visit's medicines in line with the incoming list, touching only changed rows.
+
+    Incoming items that exactly match an existing row at the same position are
+    left alone. Remaining items reuse remaining rows (same medicine name first)
+    through one UPDATE that also sets their sort_order, anything left over is
+    inserted with one INSERT and stale rows are removed with one DELETE.
+
+    Args:
+        db: Database session
+        visit_id: The visit whose medicines are being saved
+        medicines: Items with medicine_name, dosage and duration keys
+        existing: Current rows for the visit from load_visit_medicines(), if already loaded
+
+    Returns:
+        The resulting rows as dictionaries, in incoming order
+    """
+    incoming = [{field: item.get(field) for field in MEDICINE_FIELDS} for item in medicines]
+
+    if existing is None:
+        existing = load_visit_medicines(db, visit_id)
+
+    result: List[Optional[dict]] = [None] * len(incoming)
+    unmatched_rows = list(existing)
+
+    # Pass 1: identical rows need no write at all unless they moved on the prescription
+    to_update = {}
+    pending = []
+    for index, item in enumerate(incoming):
+        match = next((row for row in unmatched_rows if _key(row) == _key(item)), None)
+        if match:
+            unmatched_rows.remove(match)
+            result[index] = {field: match[field] for field in ("id", *MEDICINE_FIELDS)}
+            if match.get("sort_order") != index:
+                to_update[match["id"]] = (index, item)
+        else:
+            pending.append(index)
+
+    # Pass 2: reuse leftover rows for changed items, preferring the same medicine
+    to_insert = []
+    for index in pending:
+        item = incoming[index]
+        match = next(
+            (row for row in unmatched_rows if row["medicine_name"] == item["medicine_name"]),
+            unmatched_rows[0] if unmatched_rows else None,
+        )
+        if match:
+            unmatched_rows.remove(match)
+            to_update[match["id"]] = (index, item)
+        else:
+            to_insert.append(index)
+
+    if unmatched_rows:
+        db.execute(
+            delete(visit_medicines).where(
+                visit_medicines.c.id.in_([row["id"] for row in unmatched_rows])
+            )
+        )
+
+    if to_update:
+        incoming_values = values(
+            column("id", String),
+            column("medicine_name", String),
+            column("dosage", String),
+            column("duration", String),
+            column("sort_order", Integer),
+            name="incoming",
+        ).data([(row_id, *_key(item), index) for row_id, (index, item) in to_update.items()])
+
+        updated = db.execute(
+            update(visit_medicines)
+            .where(visit_medicines.c.id == incoming_values.c.id)
+            .values(
+                medicine_name=incoming_values.c.medicine_name,
+                dosage=incoming_values.c.dosage,
+                duration=incoming_values.c.duration,
+                sort_order=incoming_values.c.sort_order,
+            )
+            .returning(
+                visit_medicines.c.id,
+                visit_medicines.c.medicine_name,
+                visit_medicines.c.dosage,
+                visit_medicines.c.duration,
+            )
+        )
+        for row in updated:
+            result[to_update[row.id][0]] = _row_to_dict(row)
+
+    if to_insert:
+        inserted = insert_visit_medicines(db, visit_id, [incoming[index] for index in to_insert], sort_orders=to_insert)
+        for index, row in zip(to_insert, inserted):
+            result[index] = row
+
+    return result
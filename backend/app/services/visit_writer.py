@@ -0,0 +1,199 @@
+"""
+Service for saving visits from the doctor's visit form.
+
+A new visit is written with one statement: the patient's visit counter is
+bumped, the visit and its medicines are inserted and the appointment is
+marked COMPLETED inside a chain of data-modifying CTEs. Only when the
+appointment already has a visit (OPD reopen) does it fall back to the
+update path. Either way the doctor's option usage scores are updated in the
+same transaction.
+"""
+
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import Integer, String, column, exists, insert, literal, select, true, update, values
+from sqlalchemy.orm import Session
+from app.core.invalidation import publish
+from app.models.models import Appointment, AppointmentStatusEnum, Patient, Visit, VisitMedicine, generate_uuid
+from app.schemas.schemas import VisitCreate
+from app.services.option_usage import record_option_usage, visit_option_uses
+from app.services.visit_medicines import load_visit_medicines, sync_visit_medicines
+
+visits = Visit.__table__
+patients = Patient.__table__
+appointments = Appointment.__table__
+visit_medicines = VisitMedicine.__table__
+
+VISIT_UPDATE_FIELDS = [
+    'symptoms', 'diagnosis', 'observations', 'recommended_tests',
+    'follow_up_date', 'vitals', 'prescription_notes', 'amount'
+]
+
+
+def build_create_visit_statement(visit_data: VisitCreate, visit_id: str, doctor_id: str, clinic_id: str):
+    """
+    Build the single INSERT-with-CTEs statement for a new visit.
+
+    Returns one row (id, visit_number) when the visit was created, or no rows
+    when the patient is unknown in this clinic or the appointment already has a visit.
+    """
+    appointment_id = visit_data.appointment_id
+
+    counter_filter = [patients.c.id == visit_data.patient_id, patients.c.clinic_id == clinic_id]
+    if appointment_id:
+        counter_filter.append(~exists().where(visits.c.appointment_id == appointment_id))
+
+    counter = (
+        update(patients)
+        .where(*counter_filter)
+        # Keep updated_at untouched: allocating a number is not a patient edit
+        .values(last_visit_number=patients.c.last_visit_number + 1, updated_at=patients.c.updated_at)
+        .returning(patients.c.last_visit_number)
+        .cte("counter")
+    )
+
+    visit_columns = {
+        "id": visit_id,
+        "patient_id": visit_data.patient_id,
+        "appointment_id": appointment_id,
+        "visit_date": datetime.now(),
+        "doctor_id": visit_data.doctor_id or doctor_id,
+        "symptoms": visit_data.symptoms,
+        "diagnosis": visit_data.diagnosis,
+        "observations": visit_data.observations,
+        "recommended_tests": visit_data.recommended_tests,
+        "follow_up_date": visit_data.follow_up_date,
+        "vitals": visit_data.vitals,
+        "prescription_notes": visit_data.prescription_notes,
+        "amount": visit_data.amount,
+        "clinic_id": clinic_id,
+    }
+    new_visit = (
+        insert(visits)
+        .from_select(
+            [*visit_columns, "visit_number"],
+            select(
+                *[literal(value, visits.c[name].type) for name, value in visit_columns.items()],
+                counter.c.last_visit_number,
+            ),
+        )
+        .returning(visits.c.id, visits.c.visit_number)
+        .cte("new_visit")
+    )
+
+    statement = select(new_visit.c.id, new_visit.c.visit_number)
+
+    if visit_data.medicines:
+        incoming = values(
+            column("id", String),
+            column("medicine_name", String),
+            column("dosage", String),
+            column("duration", String),
+            column("sort_order", Integer),
+            name="incoming",
+        ).data([
+            (generate_uuid(), med.medicine_name, med.dosage, med.duration, sort_order)
+            for sort_order, med in enumerate(visit_data.medicines)
+        ])
+        medicines = insert(visit_medicines).from_select(
+            ["id", "visit_id", "medicine_name", "dosage", "duration", "sort_order"],
+            select(
+                incoming.c.id, new_visit.c.id, incoming.c.medicine_name, incoming.c.dosage, incoming.c.duration,
+                incoming.c.sort_order,
+            )
+            .select_from(new_visit)
+            .join(incoming, true()),
+        ).cte("medicines")
+        statement = statement.add_cte(medicines)
+
+    if appointment_id:
+        completed = (
+            update(appointments)
+            .where(
+                appointments.c.id == appointment_id,
+                appointments.c.clinic_id == clinic_id,
+                exists(select(new_visit.c.id)),
+            )
+            .values(status=AppointmentStatusEnum.COMPLETED)
+            .cte("completed_appointment")
+        )
+        statement = statement.add_cte(completed)
+
+    return statement
+
+
+def update_visit_for_appointment(db: Session, visit_data: VisitCreate, clinic_id: str):
+    """Apply a visit form save to the visit already linked to the appointment (OPD reopen case)"""
+    visit = db.query(Visit).filter(
+        Visit.appointment_id == visit_data.appointment_id,
+        Visit.clinic_id == clinic_id
+    ).first()
+    if not visit:
+        return None
+
+    medicines = load_visit_medicines(db, visit.id)
+    previous_uses = visit_option_uses(visit.diagnosis, medicines)
+
+    for field in VISIT_UPDATE_FIELDS:
+        value = getattr(visit_data, field, None)
+        if value is not None:
+            setattr(visit, field, value)
+
+    if visit_data.medicines is not None:
+        medicines = sync_visit_medicines(db, visit.id, [m.model_dump() for m in visit_data.medicines], existing=medicines)
+
+    record_option_usage(
+        db, visit.doctor_id, clinic_id, visit_option_uses(visit.diagnosis, medicines), previous=previous_uses
+    )
+
+    db.query(Appointment).filter(
+        Appointment.id == visit_data.appointment_id,
+        Appointment.clinic_id == clinic_id
+    ).update({Appointment.status: AppointmentStatusEnum.COMPLETED}, synchronize_session=False)
+
+    return visit
+
+
+def save_visit(db: Session, visit_data: VisitCreate, doctor_id: str, clinic_id: str) -> Tuple[str, bool]:
+    """
+    Create a visit, or update the one already linked to the appointment, in one transaction.
+
+    Args:
+        db: Database session
+        visit_data: The submitted visit form
+        doctor_id: Doctor profile of the current user (used when the form has no doctor_id)
+        clinic_id: Clinic of the current user
+
+    Returns:
+        (visit_id, created) - created is False when an existing visit was updated
+
+    Raises:
+        LookupError: The patient does not exist in this clinic
+    """
+    try:
+        # The appointment is completed and follow-ups may change: drop the clinic's coalesced OPD reads
+        publish(db, "opd_day", clinic_id=clinic_id)
+        row = db.execute(
+            build_create_visit_statement(visit_data, generate_uuid(), doctor_id, clinic_id)
+        ).first()
+
+        if row:
+            record_option_usage(
+                db,
+                visit_data.doctor_id or doctor_id,
+                clinic_id,
+                visit_option_uses(visit_data.diagnosis, [m.model_dump() for m in visit_data.medicines or []]),
+            )
+            db.commit()
+            return row.id, True
+
+        visit = update_visit_for_appointment(db, visit_data, clinic_id) if visit_data.appointment_id else None
+        if visit is None:
+            raise LookupError("Patient not found")
+
+        db.commit()
+        return visit.id, False
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,53 @@
+"""
+Gunicorn settings for production: gunicorn -c gunicorn.conf.py app.main:app
+
+Every worker is a separate process with its own connection pool and its own
+in-process caches (shared nothing). Pool sizes come from DB_CONNECTION_BUDGET
+split across WEB_CONCURRENCY workers, see app/core/config.py.
+"""
+
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger("gunicorn.error")
+
+bind = f"{settings.HOST}:{settings.PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.WEB_CONCURRENCY
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+timeout = settings.WORKER_TIMEOUT
+graceful_timeout = settings.WORKER_GRACEFUL_TIMEOUT
+keepalive = settings.WORKER_KEEPALIVE
+
+# Recycle workers gradually so slow leaks never take down every worker at once
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS_JITTER
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    if settings.WEB_CONCURRENCY > settings.DB_CONNECTION_BUDGET:
+        logger.warning(
+            f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} exceeds DB_CONNECTION_BUDGET="
+            f"{settings.DB_CONNECTION_BUDGET}; each worker still gets one connection"
+        )
+    logger.info(
+        f"Starting {settings.WEB_CONCURRENCY} worker(s), DB pool per worker: "
+        f"{settings.db_pool_size} + {settings.db_max_overflow} overflow"
+    )
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes: drop anything the
+    # master may have opened while preloading, without closing it for the parent
+    from app.core.database import engine, replica_engine
+
+    engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
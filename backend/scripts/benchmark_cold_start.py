@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure time-to-first-healthy-response for each SCHEMA_STARTUP_MODE.
+
+Starts a single uvicorn process per run, polls /ready until it answers 200
+and reports the time from process spawn. "create" is the old behaviour
+(create_all on every boot); "check" and "skip" are the production modes.
+Uses DATABASE_URL from the environment - point it at the remote database to
+see the real round-trip cost.
+
+Run from the backend directory: python -m scripts.benchmark_cold_start
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_ready(mode: str, port: int, timeout: float) -> float:
+    env = dict(os.environ, SCHEMA_STARTUP_MODE=mode)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/ready").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+        raise RuntimeError(f"Server did not become ready within {timeout}s (mode={mode})")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["create", "check", "skip"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for mode in args.modes:
+        samples = [time_to_ready(mode, args.port, args.timeout) * 1000 for _ in range(args.runs)]
+        print(f"{mode:<8}{statistics.median(samples):>12.0f}{min(samples):>10.0f}{max(samples):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression: CPU cost versus bytes saved.
+
+Encodes representative payloads (daily stats, 100-entry OPD queue,
+1,000-visit collections report) with the API's JSON encoder and compresses
+them at several gzip levels, plus brotli if the package is installed.
+Needs no database.
+
+Run from the backend directory: python -m scripts.benchmark_compression
+"""
+
+import argparse
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import brotli, compress_body
+from app.core.serialization import dumps
+from scripts.benchmark_serialization import build_collections, build_queue
+
+
+def payloads():
+    yield "OPD stats", dumps({
+        "stats": {"total": 42, "completed": 30, "waiting": 10, "inProgress": 2},
+        "date": "2026-10-19",
+    })
+    yield "OPD queue (100)", dumps(build_queue(100, iso=False))
+    yield "Collections (1,000)", dumps(build_collections(1000, iso=False))
+    yield "Collections (10,000)", dumps(build_collections(10000, iso=False))
+
+
+def settings():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", "gzip", {"gzip_level": level}
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            yield f"br-{quality}", "br", {"brotli_quality": quality}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20, help="Compressions per timing run")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli not installed - showing gzip only\n")
+
+    print(f"{'payload':<22}{'setting':<10}{'raw':>10}{'compressed':>12}{'ratio':>8}{'cpu ms':>9}")
+    for name, body in payloads():
+        for label, encoding, options in settings():
+            compressed = compress_body(body, encoding, **options)
+            seconds = min(timeit.repeat(
+                lambda: compress_body(body, encoding, **options), number=args.number, repeat=3
+            )) / args.number
+            print(
+                f"{name:<22}{label:<10}{len(body):>10}{len(compressed):>12}"
+                f"{len(body) / len(compressed):>7.1f}x{seconds * 1000:>9.3f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pure-Python hot paths, checked against a baseline.
+
+Times patient_to_dict, the OPD queue payload, the collections grouping loop,
+require_permission resolution, generate_doctor_code, JWT encode/decode and
+VisitCreate validation. Handlers run against an in-memory session that serves
+transient ORM objects and answers simple equality filters, so no database or
+network is needed and the numbers reflect Python time only.
+
+Each benchmark reports the best of --repeat runs in microseconds per call.
+A benchmark over the threshold is timed again up to --retries times and only
+counts as a regression if it stays over, so a burst of load on the machine
+does not fail the run.
+Unless --no-check is given, the run exits non-zero when any benchmark is more
+than --threshold slower than scripts/benchmark_hot_paths_baseline.json. Baselines are only comparable on
+the same machine and Python version; refresh them with --save after an
+intended change or on new hardware.
+
+Run from the backend directory: python -m scripts.benchmark_hot_paths
+    python -m scripts.benchmark_hot_paths --save
+    python -m scripts.benchmark_hot_paths --only queue collections --threshold 0.15
+"""
+
+import argparse
+import json
+import operator
+import platform
+import sys
+import os
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from app.api.opd import build_queue
+from app.api.patients import patient_to_dict
+from app.api.visits import build_collection_summary
+from app.core.deps import require_permission
+from app.core.security import create_access_token, decode_access_token
+from app.core.serialization import dumps
+from app.models.models import (
+    Appointment, AppointmentStatusEnum, Clinic, Doctor, GenderEnum, Patient, RoleEnum, User, UserPermission, Visit
+)
+from app.schemas.schemas import VisitCreate
+from app.utils.code_generators import generate_doctor_code
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_hot_paths_baseline.json")
+CLINIC_ID = "clinic-1"
+
+
+class CollectionRow(NamedTuple):
+    id: str
+    visit_date: datetime
+    amount: Decimal
+    patient_name: str
+    patient_code: str
+    doctor_name: str
+
+
+class MemoryQuery:
+    """Enough of Query for the handlers: equality filters are applied, everything else is ignored"""
+
+    def __init__(self, rows, column=None, by_id=None):
+        self.rows = rows
+        self.column = column
+        self.by_id = by_id  # primary key lookups stand in for the index
+
+    def filter(self, *criteria):
+        rows = self.rows
+        for criterion in criteria:
+            if (
+                isinstance(criterion, BinaryExpression)
+                and criterion.operator is operator.eq
+                and isinstance(criterion.right, BindParameter)
+            ):
+                key, value = criterion.left.key, criterion.right.value
+                if key == "id" and rows is self.rows and self.by_id is not None:
+                    rows = [self.by_id[value]] if value in self.by_id else []
+                else:
+                    rows = [row for row in rows if getattr(row, key) == value]
+        return MemoryQuery(rows, self.column)
+
+    def options(self, *args):
+        return self
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        row = self.first()
+        if row is None or self.column is None:
+            return row
+        return getattr(row, self.column)
+
+
+class MemorySession:
+    def __init__(self, *collections):
+        self.tables = {}
+        self.by_id = {}
+        for rows in collections:
+            for row in rows:
+                self.tables.setdefault(type(row), []).append(row)
+                self.by_id.setdefault(type(row), {})[getattr(row, "id", None)] = row
+
+    def query(self, entity):
+        model = getattr(entity, "class_", entity)
+        column = entity.key if model is not entity else None
+        return MemoryQuery(self.tables.get(model, []), column, self.by_id.get(model))
+
+
+def run_handler(coroutine):
+    """Run a handler that never awaits without the cost of an event loop"""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("handler awaited")
+
+
+def build_clinic(patients: int, visits_per_patient: int, doctors: int = 3):
+    now = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+    users = [
+        User(id=f"user-{i}", email=f"dr{i}@example.com", role=RoleEnum.DOCTOR, full_name=f"Dr. {i}", clinic_id=CLINIC_ID, is_active=True)
+        for i in range(doctors)
+    ]
+    reception = User(id="user-reception", email="reception@example.com", role=RoleEnum.ASSISTANT, full_name="Reception", clinic_id=CLINIC_ID, is_active=True)
+    doctor_rows = [
+        Doctor(id=f"doctor-{i}", doctor_code=f"DR-{i + 1:04d}", user_id=user.id, user=user, clinic_id=CLINIC_ID)
+        for i, user in enumerate(users)
+    ]
+    clinic = Clinic(id=CLINIC_ID, name="Benchmark Clinic", owner_doctor_id=doctor_rows[0].id)
+
+    patient_rows, appointment_rows, visit_rows = [], [], []
+    for i in range(patients):
+        patient = Patient(
+            id=f"patient-{i}", patient_code=f"PT-{i + 1:04d}", full_name=f"Patient {i}", age=20 + i % 60,
+            gender=GenderEnum.FEMALE, phone="9800000000", address="12 MG Road, Bengaluru", blood_group="O+",
+            allergies=["Penicillin"], medical_history={"diabetes": False}, clinic_id=CLINIC_ID,
+            created_by=reception.id, creator=reception, created_at=now, updated_at=now, visit_count=visits_per_patient,
+            last_visit_at=now, last_follow_up_date=date(2026, 10, 26), outstanding_balance=Decimal("250.00"),
+        )
+        patient_rows.append(patient)
+        for number in range(visits_per_patient):
+            completed = number % 3 != 2
+            appointment = Appointment(
+                id=f"appointment-{i}-{number}", patient_id=patient.id, patient=patient, appointment_date=date(2026, 10, 19),
+                queue_number=len(appointment_rows) + 1, chief_complaints=["Toothache"], clinic_id=CLINIC_ID,
+                status=AppointmentStatusEnum.COMPLETED if completed else AppointmentStatusEnum.WAITING,
+                created_by=reception.id, created_at=now + timedelta(minutes=len(appointment_rows)),
+            )
+            appointment_rows.append(appointment)
+            if completed:
+                doctor = doctor_rows[number % doctors]
+                visit = Visit(
+                    id=f"visit-{i}-{number}", patient_id=patient.id, appointment_id=appointment.id, doctor_id=doctor.id,
+                    doctor=doctor, visit_date=now - timedelta(days=number, minutes=i), visit_number=number + 1,
+                    amount=Decimal("500.00"), follow_up_date=date(2026, 10, 26), clinic_id=CLINIC_ID,
+                )
+                appointment.visit = visit
+                visit_rows.append(visit)
+
+    db = MemorySession([clinic], users, [reception], doctor_rows, patient_rows, appointment_rows, visit_rows)
+    return db, users[0], reception, patient_rows
+
+
+def benchmarks():
+    """name -> zero-argument callable"""
+    queue_db, owner, _, _ = build_clinic(patients=100, visits_per_patient=1)
+    report_db, _, _, _ = build_clinic(patients=200, visits_per_patient=5)
+    # The rows the collections query returns: visits joined with patient and doctor names
+    patient_by_id = report_db.by_id[Patient]
+    collection_rows = [
+        CollectionRow(
+            visit.id, visit.visit_date, visit.amount, patient_by_id[visit.patient_id].full_name,
+            patient_by_id[visit.patient_id].patient_code, "Dr. Owner",
+        )
+        for visit in sorted(report_db.tables[Visit], key=lambda visit: visit.visit_date, reverse=True)
+        if date(2026, 10, 1) <= visit.visit_date.date() <= date(2026, 10, 19)
+    ]
+    _, _, _, patients = build_clinic(patients=100, visits_per_patient=0)
+
+    assistant = User(id="user-assistant", role=RoleEnum.ASSISTANT, full_name="Assistant", clinic_id=CLINIC_ID, is_active=True)
+    restricted = User(id="user-restricted", role=RoleEnum.ASSISTANT, full_name="Restricted", clinic_id=CLINIC_ID, is_active=True)
+    grant = UserPermission(
+        user_id=restricted.id, clinic_id=CLINIC_ID,
+        **{column.name: True for column in UserPermission.__table__.columns if column.name.startswith("can_")},
+    )
+    permission_db = MemorySession(*queue_db.tables.values(), [assistant, restricted], [grant])
+    check = require_permission("can_view_opd")
+
+    doctors_db = MemorySession([Doctor(id=f"doctor-{i}", doctor_code=f"DR-{i + 1:04d}", clinic_id=CLINIC_ID) for i in range(500)])
+
+    claims = {"sub": owner.id, "role": owner.role.value}
+    token = create_access_token(claims)
+    visit_payload = {
+        "patient_id": "patient-1",
+        "appointment_id": "appointment-1",
+        "symptoms": ["Toothache", "Swelling"],
+        "diagnosis": ["Irreversible Pulpitis"],
+        "observations": ["Deep caries"],
+        "recommended_tests": ["IOPA X-ray"],
+        "follow_up_date": "2026-10-26",
+        "vitals": {"bp": "120/80", "pulse": 72},
+        "prescription_notes": "Review in a week",
+        "amount": "500.00",
+        "medicines": [
+            {"medicine_name": "Cap Amoxicillin 500mg", "dosage": "1-0-1", "duration": "5 days"},
+            {"medicine_name": "Tab Ibuprofen 400mg", "dosage": "SOS", "duration": "3 days"},
+        ],
+    }
+
+    return {
+        "patient_to_dict[100]": lambda: [patient_to_dict(patient) for patient in patients],
+        "queue[100]": lambda: dumps(build_queue(queue_db, CLINIC_ID, date(2026, 10, 19))),
+        "collections[800]": lambda: build_collection_summary(
+            collection_rows, "day", date(2026, 10, 1), date(2026, 10, 19),
+        ),
+        "require_permission[owner]": lambda: check(current_user=owner, db=permission_db),
+        "require_permission[role_default]": lambda: check(current_user=assistant, db=permission_db),
+        "require_permission[explicit]": lambda: check(current_user=restricted, db=permission_db),
+        "generate_doctor_code[500]": lambda: generate_doctor_code(doctors_db),
+        "jwt_encode": lambda: create_access_token(claims),
+        "jwt_decode": lambda: decode_access_token(token),
+        "visit_create_validate": lambda: VisitCreate.model_validate(visit_payload),
+    }
+
+
+def measure(func, repeat: int, min_seconds: float) -> float:
+    """Best time per call in microseconds, with enough calls per run to last min_seconds"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_seconds / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "processor": platform.processor() or None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", help="Benchmarks whose name contains any of these")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum length of each timing run")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--retries", type=int, default=2, help="Re-timings before a slowdown counts")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--no-check", action="store_true", help="Do not compare with the baseline")
+    args = parser.parse_args()
+
+    saved = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+    baseline = {} if args.save or args.no_check else saved.get("results", {})
+    if baseline and saved.get("environment") != environment():
+        print(f"Warning: baseline was recorded on {saved.get('environment')}, this is {environment()}")
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<34} {'us/call':>10} {'baseline':>10} {'change':>8}")
+    for name, func in benchmarks().items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        func()  # warm caches and lazy imports
+        results[name] = round(measure(func, args.repeat, args.min_seconds), 3)
+        for _ in range(args.retries if name in baseline else 0):
+            if results[name] <= baseline[name] * (1 + args.threshold):
+                break
+            results[name] = min(results[name], round(measure(func, args.repeat, args.min_seconds), 3))
+        line = f"{name:<34} {results[name]:>10.2f}"
+        if name in baseline:
+            change = results[name] / baseline[name] - 1
+            line += f" {baseline[name]:>10.2f} {change:>+7.0%}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        # --only refreshes just the selected entries
+        results = {**saved.get("results", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
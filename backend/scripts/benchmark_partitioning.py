@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark partition pruning on the OPD queue query.
+
+Builds two copies of an appointments-shaped table in a scratch schema
+(partition_bench) - one plain, one range-partitioned by appointment_date like
+migration 0017_date_partitioning - fills them with the same synthetic rows and
+compares EXPLAIN ANALYZE of:
+
+- queue: one clinic's appointments for today, ordered by queue number (get_queue)
+- month: one clinic's appointment count for the current month (daily stats, collections)
+
+For each query it reports median planning and execution time, shared buffers
+touched and how many tables/partitions the plan actually scanned. The app
+tables are not touched. Uses DATABASE_URL; the scratch schema is dropped at the
+end unless --keep is given.
+
+Run from the backend directory: python -m scripts.benchmark_partitioning
+    python -m scripts.benchmark_partitioning --rows 1000000 --interval year
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import os
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+SCHEMA = "partition_bench"
+
+QUERIES = {
+    "queue": (
+        "SELECT id, patient_id, queue_number, status FROM {table} "
+        "WHERE clinic_id = :clinic_id AND appointment_date = :today ORDER BY queue_number"
+    ),
+    "month": (
+        "SELECT count(*) FROM {table} "
+        "WHERE clinic_id = :clinic_id AND appointment_date >= :month_start AND appointment_date < :month_end"
+    ),
+}
+
+
+def add_interval(day: date, interval: str) -> date:
+    if interval == "year":
+        return day.replace(year=day.year + 1)
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def setup(conn, rows: int, clinics: int, first_day: date, last_day: date, interval: str) -> int:
+    """Create and fill both tables; returns the number of partitions"""
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    columns = (
+        "id text NOT NULL, clinic_id text NOT NULL, patient_id text NOT NULL, "
+        "appointment_date date NOT NULL, queue_number integer, status text"
+    )
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({columns}, PRIMARY KEY (id))"))
+    conn.execute(text(
+        f"CREATE TABLE {SCHEMA}.partitioned ({columns}, PRIMARY KEY (id, appointment_date)) "
+        f"PARTITION BY RANGE (appointment_date)"
+    ))
+
+    partitions = 0
+    lower = first_day.replace(month=1, day=1) if interval == "year" else first_day.replace(day=1)
+    while lower <= last_day:
+        upper = add_interval(lower, interval)
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.partitioned_p{lower:%Y_%m} PARTITION OF {SCHEMA}.partitioned "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        partitions += 1
+        lower = upper
+
+    started = time.perf_counter()
+    conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.plain
+        SELECT md5(g::text), 'clinic-' || (g % :clinics), 'patient-' || (g % :patients),
+               CAST(:first_day AS date) + (random() * :days)::int, g % 60, 'WAITING'
+        FROM generate_series(1, :rows) AS g
+    """), {
+        "clinics": clinics,
+        "patients": max(rows // 20, 1),
+        "first_day": first_day,
+        "days": (last_day - first_day).days,
+        "rows": rows,
+    })
+    conn.execute(text(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.plain"))
+    for table in ("plain", "partitioned"):
+        # The same single-column indexes the app tables have
+        for column in ("clinic_id", "appointment_date", "patient_id"):
+            conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} ({column})"))
+        conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+    print(f"Loaded {rows:,} rows into each table in {time.perf_counter() - started:.0f}s")
+    return partitions
+
+
+def scanned_relations(plan: dict) -> set:
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= scanned_relations(child)
+    return found
+
+
+def explain(conn, query: str, params: dict) -> dict:
+    result = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params).scalar()
+    report = (json.loads(result) if isinstance(result, str) else result)[0]
+    plan = report["Plan"]
+    return {
+        "planning": report["Planning Time"],
+        "execution": report["Execution Time"],
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "relations": len(scanned_relations(plan)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--clinics", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10, help="Years of history to spread the rows over")
+    parser.add_argument("--interval", choices=["month", "year"], default="month")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query, with a random clinic each")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema for manual EXPLAINs")
+    args = parser.parse_args()
+
+    today = date.today()
+    first_day = today.replace(year=today.year - args.years)
+    last_day = today + timedelta(days=90)
+    month_start = today.replace(day=1)
+    params = {"today": today, "month_start": month_start, "month_end": add_interval(month_start, "month")}
+
+    try:
+        with engine.begin() as conn:
+            partitions = setup(conn, args.rows, args.clinics, first_day, last_day, args.interval)
+        print(f"{partitions} {args.interval}ly partitions, {args.clinics} clinics, {args.repeat} runs per query\n")
+
+        print(f"{'query':<8}{'table':<13}{'plan ms':>9}{'exec ms':>9}{'buffers':>9}{'scanned':>9}")
+        with engine.connect() as conn:
+            for name, query in QUERIES.items():
+                for table in ("plain", "partitioned"):
+                    runs = [
+                        explain(conn, query.format(table=f"{SCHEMA}.{table}"),
+                                dict(params, clinic_id=f"clinic-{random.randrange(args.clinics)}"))
+                        for _ in range(args.repeat)
+                    ]
+                    print(
+                        f"{name:<8}{table:<13}"
+                        f"{statistics.median(r['planning'] for r in runs):>9.2f}"
+                        f"{statistics.median(r['execution'] for r in runs):>9.2f}"
+                        f"{statistics.median(r['buffers'] for r in runs):>9.0f}"
+                        f"{max(r['relations'] for r in runs):>9}"
+                    )
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for response serialization.
+
+Compares FastAPI's default path (per-field isoformat in the handler,
+response-model validation, jsonable_encoder, json.dumps) with
+app.core.serialization (raw values, orjson) for a 100-entry OPD queue and a
+1,000-visit collections report. Needs no database.
+
+Run from the backend directory: python -m scripts.benchmark_serialization
+"""
+
+import argparse
+import json
+import sys
+import os
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.core.serialization import dumps
+from app.schemas.schemas import CollectionSummaryResponse
+
+dict_adapter = TypeAdapter(dict)
+
+
+def starlette_render(content) -> bytes:
+    """What JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def build_queue(n: int, iso: bool) -> dict:
+    fmt = (lambda v: v.isoformat() if v else None) if iso else (lambda v: v)
+    now = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+    queue = []
+    for i in range(n):
+        completed = i % 3 == 0
+        queue.append({
+            "id": f"apt-{i:06d}",
+            "patient_id": f"pat-{i:06d}",
+            "patient_name": f"Patient {i}",
+            "patient_code": f"PT-{i:04d}",
+            "patient": {
+                "id": f"pat-{i:06d}",
+                "full_name": f"Patient {i}",
+                "patient_code": f"PT-{i:04d}",
+                "age": 20 + i % 50,
+                "phone": "+919800000000",
+                "address": "12 MG Road, Bengaluru",
+            },
+            "queue_number": i + 1,
+            "chief_complaints": ["Toothache", "Tooth Sensitivity"],
+            "status": "COMPLETED" if completed else "WAITING",
+            "created_at": fmt(now + timedelta(minutes=i)),
+            "doctor": {"id": "doc-1", "name": "Dr. Rao", "doctor_code": "DR-0001"} if completed else None,
+            "visit": {
+                "id": f"vis-{i:06d}",
+                "amount": 500.0,
+                "follow_up_date": fmt(date(2026, 10, 26)),
+            } if completed else None,
+        })
+    return {"queue": queue, "date": fmt(date(2026, 10, 19))}
+
+
+def build_collections(n: int, iso: bool) -> dict:
+    start, end = date(2026, 10, 1), date(2026, 10, 31)
+    breakdown = []
+    per_day = max(n // 31, 1)
+    for day in range(31):
+        visits = [
+            {
+                "visit_id": f"vis-{day:02d}-{j:04d}",
+                "patient_name": f"Patient {j}",
+                "patient_code": f"PT-{j:04d}",
+                "doctor_name": "Dr. Rao",
+                "amount": float(Decimal("750.00")),
+                "visit_time": "10:30 AM",
+            }
+            for j in range(per_day)
+        ]
+        breakdown.append({
+            "date": (start + timedelta(days=day)).strftime("%Y-%m-%d"),
+            "total": 750.0 * len(visits),
+            "visit_count": len(visits),
+            "visits": visits,
+        })
+    return {
+        "total_collection": 750.0 * per_day * 31,
+        "visit_count": per_day * 31,
+        "period": {
+            "start": start.isoformat() if iso else start,
+            "end": end.isoformat() if iso else end,
+        },
+        "breakdown": breakdown,
+    }
+
+
+def default_queue(n):
+    payload = build_queue(n, iso=True)
+    return starlette_render(jsonable_encoder(dict_adapter.validate_python(payload)))
+
+
+def fast_queue(n):
+    return dumps(build_queue(n, iso=False))
+
+
+def default_collections(n):
+    payload = build_collections(n, iso=True)
+    return starlette_render(jsonable_encoder(CollectionSummaryResponse.model_validate(payload)))
+
+
+def fast_collections(n):
+    return dumps(build_collections(n, iso=False))
+
+
+def measure(label, func, size, number):
+    seconds = min(timeit.repeat(lambda: func(size), number=number, repeat=5)) / number
+    print(f"  {label:<8} {seconds * 1000:8.3f} ms/response   {len(func(size)):>8} bytes")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=50, help="Responses per timing run")
+    args = parser.parse_args()
+
+    for title, size, default, fast in [
+        ("OPD queue, 100 entries", 100, default_queue, fast_queue),
+        ("Collections report, 1,000 visits", 1000, default_collections, fast_collections),
+    ]:
+        print(title)
+        before = measure("default", default, size, args.number)
+        after = measure("fast", fast, size, args.number)
+        print(f"  speed-up {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
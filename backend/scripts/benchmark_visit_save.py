@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark database round-trips and latency per visit save.
+
+Compares the previous sequential ORM save path with the single-statement
+path in app/services/visit_writer.py. Creates a throwaway clinic, runs the
+saves against DATABASE_URL and removes the clinic afterwards.
+
+Run from the backend directory: python -m scripts.benchmark_visit_save --iterations 50
+"""
+
+import argparse
+import statistics
+import sys
+import os
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app.core.database import SessionLocal, engine
+from app.core.deps import get_doctor_id
+from app.core.security import get_password_hash
+from app.models.models import (
+    Clinic, User, Doctor, Patient, Appointment, Visit, VisitMedicine,
+    RoleEnum, AppointmentStatusEnum
+)
+from app.schemas.schemas import VisitCreate
+from app.services.visit_writer import save_visit
+
+
+class RoundTripCounter:
+    """Counts statements and commits sent to the database"""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    @property
+    def round_trips(self):
+        return self.statements + self.commits
+
+
+def legacy_save(db, visit_data: VisitCreate, user: User):
+    """The visit save sequence as it ran before the visit write service"""
+    doctor = db.query(Doctor).filter(Doctor.user_id == user.id).first()
+    existing_visit = db.query(Visit).filter(Visit.appointment_id == visit_data.appointment_id).first()
+    assert existing_visit is None
+
+    last_visit = db.query(Visit).filter(
+        Visit.patient_id == visit_data.patient_id
+    ).order_by(Visit.visit_number.desc()).first()
+    visit_number = (last_visit.visit_number + 1) if last_visit else 1
+
+    visit = Visit(
+        **visit_data.model_dump(exclude={'appointment_id', 'doctor_id', 'medicines'}),
+        doctor_id=doctor.id,
+        appointment_id=visit_data.appointment_id,
+        visit_number=visit_number,
+        visit_date=datetime.now(),
+        clinic_id=user.clinic_id
+    )
+    db.add(visit)
+    db.flush()
+    for med in visit_data.medicines:
+        db.add(VisitMedicine(visit_id=visit.id, **med.model_dump()))
+
+    appointment = db.query(Appointment).filter(Appointment.id == visit_data.appointment_id).first()
+    appointment.status = AppointmentStatusEnum.COMPLETED
+    db.commit()
+    db.refresh(visit)
+    return visit.id
+
+
+def service_save(db, visit_data: VisitCreate, user: User):
+    doctor_id = get_doctor_id(db, user.id)
+    visit_id, _ = save_visit(db, visit_data, doctor_id, user.clinic_id)
+    return visit_id
+
+
+def create_fixture(db):
+    clinic = Clinic(name="Visit save benchmark")
+    db.add(clinic)
+    db.flush()
+    user = User(
+        email=f"bench-{clinic.id}@docease.local",
+        password_hash=get_password_hash("benchmark"),
+        role=RoleEnum.DOCTOR,
+        full_name="Benchmark Doctor",
+        clinic_id=clinic.id,
+    )
+    db.add(user)
+    db.flush()
+    db.add(Doctor(user_id=user.id, clinic_id=clinic.id))
+    patient = Patient(
+        patient_code=f"BENCH-{clinic.id[:8]}",
+        full_name="Benchmark Patient",
+        phone="0000000000",
+        clinic_id=clinic.id,
+        created_by=user.id,
+    )
+    db.add(patient)
+    db.commit()
+    return clinic.id, user.id, patient.id
+
+
+def run(label, save, iterations, counter, clinic_id, user_id, patient_id):
+    trips, timings = [], []
+    for i in range(iterations):
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            appointment = Appointment(
+                patient_id=patient_id,
+                appointment_date=date.today(),
+                queue_number=i + 1,
+                clinic_id=clinic_id,
+                created_by=user_id,
+            )
+            db.add(appointment)
+            db.commit()
+
+            visit_data = VisitCreate(
+                patient_id=patient_id,
+                appointment_id=appointment.id,
+                symptoms=["Toothache"],
+                diagnosis=["Dental Caries"],
+                amount=500,
+                medicines=[
+                    {"medicine_name": "Amoxicillin 500mg", "dosage": "1-0-1", "duration": "5 days"},
+                    {"medicine_name": "Ibuprofen 400mg", "dosage": "SOS", "duration": "3 days"},
+                    {"medicine_name": "Chlorhexidine Mouthwash", "dosage": "Twice daily", "duration": "7 days"},
+                ],
+            )
+
+            counter.reset()
+            started = time.perf_counter()
+            save(db, visit_data, user)
+            timings.append((time.perf_counter() - started) * 1000)
+            trips.append(counter.round_trips)
+        finally:
+            db.close()
+
+    print(
+        f"{label:<10} round-trips/save: {statistics.mean(trips):5.1f}   "
+        f"p50: {statistics.median(timings):7.2f} ms   "
+        f"max: {max(timings):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    counter = RoundTripCounter()
+    event.listen(engine, "before_cursor_execute", counter.on_execute)
+    event.listen(engine, "commit", counter.on_commit)
+
+    db = SessionLocal()
+    clinic_id, user_id, patient_id = create_fixture(db)
+    db.close()
+
+    try:
+        run("before", legacy_save, args.iterations, counter, clinic_id, user_id, patient_id)
+        run("after", service_save, args.iterations, counter, clinic_id, user_id, patient_id)
+    finally:
+        db = SessionLocal()
+        db.delete(db.query(Clinic).filter(Clinic.id == clinic_id).first())
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests/s of the production server at 1, 2, 4 and 8 workers.
+
+For each worker count, starts gunicorn with gunicorn.conf.py on a local port,
+waits for /ready, drives it with concurrent keep-alive clients for a fixed
+duration and stops it again. Uses DATABASE_URL from the environment.
+
+Run from the backend directory:
+    python -m scripts.benchmark_workers
+    python -m scripts.benchmark_workers --path /api/opd/queue --token <JWT> --workers 1 4
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), HOST="127.0.0.1")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+async def drive(base_url: str, path: str, headers: dict, concurrency: int, duration: float) -> tuple:
+    completed = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal completed, errors
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(path, headers=headers)
+                if response.status_code < 400:
+                    completed += 1
+                else:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return completed / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--token", help="Bearer token for authenticated paths")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per worker count")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"GET {args.path}  concurrency={args.concurrency}  duration={args.duration}s  cpus={os.cpu_count()}")
+    print(f"{'workers':>8}{'req/s':>12}{'errors':>10}")
+    for workers in args.workers:
+        server = start_server(workers, args.port)
+        try:
+            wait_until_ready(base_url)
+            rps, errors = asyncio.run(drive(base_url, args.path, headers, args.concurrency, args.duration))
+            print(f"{workers:>8}{rps:>12.1f}{errors:>10}")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
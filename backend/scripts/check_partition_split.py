@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Check that splitting a date partition off the default partition keeps child rows.
+
+On a database converted by migration 0017_date_partitioning, rows dated past
+the last partition land in appointments_default / visits_default, and
+create_date_partitions() moves them into the new partition once it is created.
+The move deletes the rows from the default partition, so the cascade delete
+triggers must not fire for it. This script, in one transaction that is always
+rolled back:
+
+- inserts an appointment, its visit, a visit medicine and an invoice dated in
+  a month that has no partition yet, using an existing clinic's patient,
+  doctor and user
+- creates that month's partitions with create_date_partitions()
+- checks that the appointment and visit moved into the new partitions, that
+  the medicine and invoice still exist and that the cascade triggers are
+  enabled again
+
+It exits with status 1 when any check fails. Nothing is left behind.
+
+Run from the backend directory: python -m scripts.check_partition_split
+"""
+
+import argparse
+import sys
+import os
+import uuid
+from datetime import date, datetime, time, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.models.models import Appointment, Doctor, Invoice, Patient, Visit, VisitMedicine
+
+
+def partition_name(table: str, day: date, interval_unit: str) -> str:
+    return f"{table}_p{day:%Y_%m}" if interval_unit == "month" else f"{table}_p{day:%Y}"
+
+
+def unpartitioned_month(db, units: dict) -> date:
+    """First month, ten years out or later, that neither table has a partition for yet"""
+    day = date(date.today().year + 10, 1, 1)
+    while any(
+        db.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(table, day, unit)}).scalar()
+        for table, unit in units.items()
+    ):
+        day = date(day.year + 1, 1, 1)
+    return day
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    db = SessionLocal()
+    failures = []
+    try:
+        units = dict(db.execute(text(
+            "SELECT table_name, interval_unit FROM date_partitioning WHERE table_name IN ('appointments', 'visits')"
+        )).all())
+        if len(units) != 2:
+            raise SystemExit("appointments and visits are not date-partitioned (see migration 0017_date_partitioning)")
+
+        sample = db.query(Patient, Doctor).join(Doctor, Doctor.clinic_id == Patient.clinic_id).first()
+        if sample is None:
+            raise SystemExit("Needs a clinic with at least one patient and one doctor")
+        patient, doctor = sample
+        month = unpartitioned_month(db, units)
+        print(f"Splitting {month:%Y-%m} off the default partitions")
+
+        appointment = Appointment(
+            patient_id=patient.id, appointment_date=month, queue_number=1,
+            clinic_id=patient.clinic_id, created_by=doctor.user_id,
+        )
+        db.add(appointment)
+        db.flush()
+        visit = Visit(
+            patient_id=patient.id, appointment_id=appointment.id, visit_number=1, doctor_id=doctor.id,
+            visit_date=datetime.combine(month, time(12), tzinfo=timezone.utc), clinic_id=patient.clinic_id,
+        )
+        db.add(visit)
+        db.flush()
+        medicine = VisitMedicine(visit_id=visit.id, medicine_name="Partition check", dosage="1-0-1", duration="1 day")
+        invoice = Invoice(
+            invoice_number=f"SPLIT-CHECK-{uuid.uuid4().hex[:12]}", patient_id=patient.id, visit_id=visit.id,
+            total_amount=1, clinic_id=patient.clinic_id, created_by=doctor.user_id,
+        )
+        db.add_all([medicine, invoice])
+        db.flush()
+
+        for table, row_id in (("appointments", appointment.id), ("visits", visit.id)):
+            before = db.execute(text(f"SELECT tableoid::regclass::text FROM {table} WHERE id = :id"), {"id": row_id}).scalar()
+            if before != f"{table}_default":
+                failures.append(f"{table}: test row went to {before}, not {table}_default")
+
+        for table in ("appointments", "visits"):
+            db.execute(text("SELECT create_date_partitions(:table, :day, :day)"), {"table": table, "day": month})
+
+        for table, row_id in (("appointments", appointment.id), ("visits", visit.id)):
+            expected = partition_name(table, month, units[table])
+            after = db.execute(text(f"SELECT tableoid::regclass::text FROM {table} WHERE id = :id"), {"id": row_id}).scalar()
+            if after != expected:
+                failures.append(f"{table}: row is in {after}, expected {expected}")
+            enabled = db.execute(text(
+                "SELECT tgenabled <> 'D' FROM pg_trigger WHERE tgrelid = to_regclass(:default) AND tgname = :trigger"
+            ), {"default": f"{table}_default", "trigger": f"{table}_cascade_delete"}).scalar()
+            if enabled is False:
+                failures.append(f"{table}_default: cascade trigger left disabled")
+
+        for table, column, row_id in (
+            ("visits", "appointment_id", appointment.id),
+            ("visit_medicines", "visit_id", visit.id),
+            ("invoices", "visit_id", visit.id),
+        ):
+            count = db.execute(text(f"SELECT count(*) FROM {table} WHERE {column} = :id"), {"id": row_id}).scalar()
+            status = "ok" if count == 1 else "FAIL"
+            print(f"{table:<16} {count} row(s) after the split  {status}")
+            if count != 1:
+                failures.append(f"{table}: child row lost when the parent was moved")
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+    print("\nChild rows survived the partition split")
+
+
+if __name__ == "__main__":
+    main()
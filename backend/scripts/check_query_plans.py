@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Check the query plans behind the critical read endpoints.
+
+Calls get_queue, search_patients, get_doctor_visits, get_follow_ups_due,
+get_collection_summary and get_billing_stats directly as the owner of the
+clinic with the most patients, records every SELECT they send, and runs
+EXPLAIN (FORMAT JSON) on each distinct statement with the parameters it was
+sent with. Because the statements are captured from the handlers, a query
+change is checked without touching this script. A check fails when:
+
+- a plan sequentially scans one of the large tables (or one of their date
+  partitions) that holds at least --min-rows rows; smaller tables are left
+  to the planner
+- a scan of such a table applies a visit_date / appointment_date predicate
+  only as a Filter, not in its Index Cond / Recheck Cond: the date range
+  does not bound the scan (e.g. a cast of the column to date), so every row
+  of the clinic is read and date partitions are not pruned
+- the summed estimated cost of its statements exceeds its budget in
+  scripts/query_plan_budgets.json, when that file has one
+
+Run it against a production-sized database (python -m
+scripts.generate_dataset) after ANALYZE. The script exits with status 1 on
+any failure, so it can gate migrations and query changes in CI. Record
+budgets with --save-budgets, which stores the current costs plus
+--headroom.
+
+Run from the backend directory: python -m scripts.check_query_plans
+    python -m scripts.check_query_plans --save-budgets
+    python -m scripts.check_query_plans --verbose --only collections
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from app.api.invoices import get_billing_stats
+from app.api.opd import get_follow_ups_due, get_queue
+from app.api.patients import search_patients
+from app.api.visits import get_collection_summary, get_doctor_visits
+from app.core.database import SessionLocal
+from app.models.models import Clinic, Doctor, User
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plan_budgets.json")
+LARGE_TABLES = ("patients", "appointments", "visits", "visit_medicines", "invoices", "invoice_items")
+DATE_COLUMNS = ("visit_date", "appointment_date")
+
+
+class StatementPlan(NamedTuple):
+    statement: str
+    cost: float
+    seq_scans: List[str]  # relation names
+    date_filters: List[str]  # relation.column of date predicates applied only as a Filter
+    plan: dict
+
+
+def checks(user: User, doctor_id: str, day: date, search: str) -> Dict[str, Callable]:
+    """check name -> coroutine factory taking the session"""
+    month_ago = day - timedelta(days=30)
+    return {
+        "queue": lambda db: get_queue(queue_date=day, current_user=user, db=db),
+        "search_patients": lambda db: search_patients(q=search, current_user=user, db=db),
+        "doctor_visits": lambda db: get_doctor_visits(
+            page=1, limit=20, start_date=month_ago, end_date=day, patient_search=None, current_user=user, db=db,
+        ),
+        "follow_ups_due": lambda db: get_follow_ups_due(target_date=day, current_user=user, db=db),
+        "collections": lambda db: get_collection_summary(
+            start_date=month_ago, end_date=day, group_by="day", doctor_id=doctor_id, current_user=user, db=db,
+        ),
+        "billing_stats": lambda db: get_billing_stats(
+            start_date=month_ago.isoformat(), end_date=day.isoformat(), current_user=user, db=db,
+        ),
+    }
+
+
+def capture_statements(db, handler) -> List[Tuple[str, dict]]:
+    """The distinct SELECTs a handler sends, each with the parameters of its first execution"""
+    connection = db.connection()
+    statements: Dict[str, dict] = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.setdefault(statement, parameters)
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        asyncio.run(handler(db))
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    return list(statements.items())
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def is_large(relation: str, sizes: Dict[str, float], min_rows: int) -> bool:
+    for table in LARGE_TABLES:
+        # Date partitions are named <table>_pYYYY[_MM] and <table>_default
+        if relation == table or relation.startswith(f"{table}_p") or relation == f"{table}_default":
+            return sizes.get(table, 0) >= min_rows
+    return False
+
+
+def unbounded_date_filters(node: dict) -> List[str]:
+    """Date columns a scan node filters on without using them to bound the scan"""
+    bounds = node.get("Index Cond", "") + node.get("Recheck Cond", "")
+    return [column for column in DATE_COLUMNS if column in node.get("Filter", "") and column not in bounds]
+
+
+def explain(db, statement: str, parameters, sizes: Dict[str, float], min_rows: int) -> StatementPlan:
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        result = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    plan = (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+    large_scans = [
+        node for node in plan_nodes(plan)
+        if "Relation Name" in node and is_large(node["Relation Name"], sizes, min_rows)
+    ]
+    seq_scans = [node["Relation Name"] for node in large_scans if node["Node Type"] == "Seq Scan"]
+    date_filters = [
+        f"{node['Relation Name']}.{column}"
+        for node in large_scans if node["Node Type"] != "Seq Scan"
+        for column in unbounded_date_filters(node)
+    ]
+    return StatementPlan(statement, plan["Total Cost"], seq_scans, date_filters, plan)
+
+
+def table_sizes(db) -> Dict[str, float]:
+    """Estimated rows per large table, partitions included"""
+    rows = db.execute(text(
+        "SELECT t.name, COALESCE(sum(c.reltuples) FILTER (WHERE c.reltuples > 0), 0) "
+        "FROM unnest(CAST(:tables AS text[])) AS t(name) "
+        "JOIN pg_class c ON c.relname = t.name OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(t.name)) "
+        "GROUP BY t.name"
+    ), {"tables": list(LARGE_TABLES)}).all()
+    return {name: float(count) for name, count in rows}
+
+
+def busiest_clinic_owner(db, clinic_id: str = None) -> Tuple[User, str]:
+    if clinic_id is None:
+        clinic_id = db.execute(text(
+            "SELECT clinic_id FROM patients GROUP BY clinic_id ORDER BY count(*) DESC LIMIT 1"
+        )).scalar()
+    owner = db.query(User, Doctor.id).join(Doctor, Doctor.user_id == User.id).join(
+        Clinic, Clinic.owner_doctor_id == Doctor.id
+    ).filter(Clinic.id == clinic_id).first()
+    if owner is None:
+        raise SystemExit(f"Clinic {clinic_id} has no owner doctor")
+    return owner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clinic-id", help="Clinic to run as (default: the one with the most patients)")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="Day for the queue and follow-ups")
+    parser.add_argument("--search", default="sharma 98", help="Patient search query")
+    parser.add_argument("--min-rows", type=int, default=10_000, help="Tables smaller than this may be scanned")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS)
+    parser.add_argument("--save-budgets", action="store_true", help="Write the current costs plus --headroom as budgets")
+    parser.add_argument("--headroom", type=float, default=0.5, help="Margin added by --save-budgets (0.5 = 50%%)")
+    parser.add_argument("--only", nargs="+", help="Checks to run")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its plan")
+    args = parser.parse_args()
+
+    budgets = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+
+    db = SessionLocal()
+    failures = []
+    costs = {}
+    try:
+        sizes = table_sizes(db)
+        print("Rows: " + ", ".join(f"{table} {sizes.get(table, 0):,.0f}" for table in LARGE_TABLES))
+        user, doctor_id = busiest_clinic_owner(db, args.clinic_id)
+        print(f"Running as {user.email} in clinic {user.clinic_id}\n")
+
+        for name, handler in checks(user, doctor_id, args.date, args.search).items():
+            if args.only and name not in args.only:
+                continue
+            plans = [explain(db, statement, parameters, sizes, args.min_rows) for statement, parameters in capture_statements(db, handler)]
+            costs[name] = round(sum(plan.cost for plan in plans), 2)
+            seq_scans = sorted({relation for plan in plans for relation in plan.seq_scans})
+            date_filters = sorted({column for plan in plans for column in plan.date_filters})
+            budget = budgets.get(name)
+
+            status = "ok"
+            if seq_scans:
+                status = "FAIL"
+                failures.append(f"{name}: sequential scan on {', '.join(seq_scans)}")
+            if date_filters:
+                status = "FAIL"
+                failures.append(f"{name}: date range applied as a filter, not an index condition, on {', '.join(date_filters)}")
+            if budget is not None and costs[name] > budget:
+                status = "FAIL"
+                failures.append(f"{name}: estimated cost {costs[name]:,.0f} over budget {budget:,.0f}")
+            budget_text = f"{budget:,.0f}" if budget is not None else "-"
+            print(f"{name:<18} {len(plans):>3} statements  cost {costs[name]:>14,.0f}  budget {budget_text:>14}  {status}")
+
+            if args.verbose or seq_scans or date_filters:
+                for plan in plans:
+                    if args.verbose or plan.seq_scans or plan.date_filters:
+                        problems = [f"seq scan on {relation}" for relation in plan.seq_scans]
+                        problems += [f"date filter on {column}" for column in plan.date_filters]
+                        print(f"    {' '.join(plan.statement.split())[:300]}")
+                        print(f"    cost {plan.cost:,.0f}{', ' + ', '.join(problems) if problems else ''}")
+                        if args.verbose:
+                            print("    " + json.dumps(plan.plan, indent=2).replace("\n", "\n    "))
+    finally:
+        db.rollback()
+        db.close()
+
+    if args.save_budgets:
+        budgets.update({name: round(cost * (1 + args.headroom), 2) for name, cost in costs.items()})
+        with open(args.budgets, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {args.budgets}")
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
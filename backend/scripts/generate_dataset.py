@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Generate a production-sized synthetic dataset for performance work.
+
+Creates --clinics dental clinics (codes SYN-<seed>-NNNN) with doctors, a
+receptionist, the standard master options and --patients patients sharing
+about --visits visits, each with its appointment, medicines and usually an
+invoice. Values are drawn from app/fixtures/dental_fixtures.py:
+
+- clinic sizes are log-normal, so a few large clinics hold much of the data
+- visits per patient are geometric (some patients never visit); visits lean
+  towards recent dates, Sundays are mostly closed and OPD runs in a morning
+  and an evening session
+- every clinic has its own Zipf-like preference for diagnoses, medicines,
+  dosages and durations, so GIN indexes and analytics see realistic skew
+- the patient summary columns (visit count, last visit, follow-up, balance)
+  are filled in directly
+
+The output depends only on --seed and the sizes, not on --workers. Patients
+are split into chunks of --chunk-size. Worker processes generate the chunks
+and load each one in its own transaction with COPY. --skip-triggers loads
+with session_replication_role = replica, which skips FK checks and the
+summary triggers and needs a superuser.
+
+Patient codes and invoice numbers sit in a numeric band per clinic, so the
+app keeps numbering new patients after them. Invoice numbers are unique but
+not in created_at order, so the first invoice created through the API in a
+generated clinic may collide; load tests should use their own clinics
+(scripts/loadtest). Option usage statistics are not
+generated; rebuild them with the backfill in migration 0022_option_usage if
+needed.
+
+Run from the backend directory: python -m scripts.generate_dataset
+    python -m scripts.generate_dataset --clinics 200 --patients 5000000 --visits 30000000 --workers 8
+    python -m scripts.generate_dataset --purge --clinics 10 --patients 50000 --visits 300000
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import SessionLocal, engine
+from app.core.security import get_password_hash
+from app.fixtures.dental_fixtures import (
+    DENTAL_CHIEF_COMPLAINTS,
+    DENTAL_DIAGNOSES,
+    DENTAL_OBSERVATIONS,
+    DENTAL_TEST_OPTIONS,
+    DENTAL_MEDICINES,
+    DENTAL_DOSAGES,
+    DENTAL_DURATIONS,
+)
+from app.services.clinic_fixtures import seed_fixtures
+
+CODE_PREFIX = "SYN-"
+
+FIRST_NAMES = [
+    "Aarav", "Diya", "Vihaan", "Ananya", "Arjun", "Ishita", "Kabir", "Meera", "Rohan", "Saanvi", "Aditya", "Kavya",
+    "Rahul", "Pooja", "Vikram", "Neha", "Sanjay", "Priya", "Amit", "Sneha", "Karan", "Riya", "Manish", "Anjali",
+]
+LAST_NAMES = [
+    "Sharma", "Patel", "Iyer", "Reddy", "Khan", "Singh", "Nair", "Gupta", "Das", "Mehta", "Joshi", "Rao",
+    "Verma", "Kulkarni", "Chatterjee", "Menon", "Pillai", "Bose", "Agarwal", "Desai",
+]
+CITIES = ["Pune", "Mumbai", "Bengaluru", "Chennai", "Hyderabad", "Delhi", "Kolkata", "Jaipur", "Indore", "Kochi"]
+BLOOD_GROUPS = ["O+", "B+", "A+", "AB+", "O-", "B-", "A-", "AB-"]
+BLOOD_GROUP_WEIGHTS = [37, 32, 22, 7, 1, 0.5, 0.4, 0.1]
+ALLERGIES = ["Penicillin", "Sulfa drugs", "Latex", "Aspirin", "Ibuprofen", "Local anaesthetic", "Iodine"]
+FEES = [300, 500, 800, 1500, 3000, 6000]
+FEE_WEIGHTS = [30, 35, 15, 10, 7, 3]
+MEDICINES_PER_VISIT_WEIGHTS = [15, 30, 30, 15, 10]  # 0..4 medicines
+
+# Columns written by COPY, in load order (parents before children)
+COLUMNS = {
+    "patients": [
+        "id", "patient_code", "full_name", "age", "gender", "phone", "address", "blood_group", "allergies",
+        "last_visit_number", "visit_count", "last_visit_at", "last_follow_up_date", "outstanding_balance",
+        "summary_updated_at", "clinic_id", "created_by", "created_at",
+    ],
+    "appointments": [
+        "id", "patient_id", "appointment_date", "queue_number", "chief_complaints", "status", "clinic_id",
+        "created_by", "created_at",
+    ],
+    "visits": [
+        "id", "patient_id", "appointment_id", "visit_date", "visit_number", "doctor_id", "symptoms", "diagnosis",
+        "observations", "recommended_tests", "follow_up_date", "vitals", "prescription_notes", "amount",
+        "clinic_id", "created_at",
+    ],
+    "visit_medicines": ["id", "visit_id", "medicine_name", "dosage", "duration", "sort_order"],
+    "invoices": [
+        "id", "invoice_number", "patient_id", "visit_id", "total_amount", "paid_amount", "payment_status",
+        "payment_mode", "payment_date", "clinic_id", "created_by", "created_at",
+    ],
+    "invoice_items": ["id", "invoice_id", "description", "amount", "quantity"],
+}
+
+
+class ClinicPlan(NamedTuple):
+    index: int
+    id: str
+    band: int  # prefix of the clinic's patient codes and invoice numbers
+    patients: int
+    doctor_ids: List[str]
+    reception_id: str
+
+
+class Chunk(NamedTuple):
+    clinic: ClinicPlan
+    position: int  # chunk number within the clinic
+    clinic_chunks: int
+    first_patient: int
+    patients: int
+    visits_per_patient: float
+    seed: int
+    today: date
+    days: int
+    skip_triggers: bool
+
+
+def new_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def pg_array(items) -> str:
+    """Postgres array literal (COPY text) of strings"""
+    return "{" + ",".join('"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"' for item in items) + "}"
+
+
+class Preference:
+    """A clinic's Zipf-like preference over fixture names"""
+
+    def __init__(self, items: List[dict], rng: random.Random, exponent: float = 1.1):
+        self.names = [item["name"] for item in items]
+        rng.shuffle(self.names)
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(len(self.names))))
+
+    def one(self, rng: random.Random) -> str:
+        return rng.choices(self.names, cum_weights=self.cum_weights)[0]
+
+    def some(self, rng: random.Random, count: int) -> List[str]:
+        chosen = []
+        for _ in range(count * 3):
+            if len(chosen) == count:
+                break
+            name = self.one(rng)
+            if name not in chosen:
+                chosen.append(name)
+        return chosen
+
+
+def clinic_preferences(seed: int, clinic: ClinicPlan) -> Dict[str, Preference]:
+    rng = random.Random(f"{seed}:preferences:{clinic.index}")
+    return {
+        "complaints": Preference(DENTAL_CHIEF_COMPLAINTS, rng),
+        "diagnoses": Preference(DENTAL_DIAGNOSES, rng),
+        "observations": Preference(DENTAL_OBSERVATIONS, rng),
+        "tests": Preference(DENTAL_TEST_OPTIONS, rng),
+        "medicines": Preference(DENTAL_MEDICINES, rng, exponent=1.3),
+        "dosages": Preference(DENTAL_DOSAGES, rng, exponent=1.5),
+        "durations": Preference(DENTAL_DURATIONS, rng, exponent=1.5),
+    }
+
+
+def geometric(rng: random.Random, mean: float) -> int:
+    """At least 1, with the given mean"""
+    if mean <= 1:
+        return 1
+    return 1 + int(math.log(1 - rng.random()) / math.log(1 - 1 / mean))
+
+
+def visit_day(rng: random.Random, today: date, days: int) -> date:
+    # More visits in recent years: the practice grew
+    day = today - timedelta(days=int(days * rng.random() ** 1.6))
+    if day.weekday() == 6 and rng.random() < 0.85:
+        day -= timedelta(days=1)
+    return day
+
+
+def opd_time(rng: random.Random, day: date) -> datetime:
+    if rng.random() < 0.65:
+        minute = rng.randrange(9 * 60, 13 * 60 + 30)
+    else:
+        minute = rng.randrange(17 * 60, 20 * 60 + 30)
+    return datetime(day.year, day.month, day.day, minute // 60, minute % 60, rng.randrange(60))
+
+
+def generate_chunk(chunk: Chunk) -> Dict[str, io.StringIO]:
+    """CSV buffers for every table, for one chunk of a clinic's patients"""
+    clinic = chunk.clinic
+    rng = random.Random(f"{chunk.seed}:{clinic.index}:{chunk.position}")
+    prefer = clinic_preferences(chunk.seed, clinic)
+    buffers = {table: io.StringIO() for table in COLUMNS}
+    write = {table: csv.writer(buffer).writerow for table, buffer in buffers.items()}
+    queue_counters: Dict[date, int] = {}
+    invoice_counter = 0
+    now = datetime.combine(chunk.today, datetime.min.time())
+
+    def queue_number(day: date) -> int:
+        # Interleaved with the clinic's other chunks, so numbers stay unique per clinic and day
+        count = queue_counters.get(day, 0)
+        queue_counters[day] = count + 1
+        return count * chunk.clinic_chunks + chunk.position + 1
+
+    for number in range(chunk.first_patient + 1, chunk.first_patient + chunk.patients + 1):
+        patient_id = new_id(rng)
+        visits = 0 if rng.random() < 0.05 else geometric(rng, chunk.visits_per_patient / 0.95)
+        days = sorted(visit_day(rng, chunk.today, chunk.days) for _ in range(visits))
+        registered_on = (days[0] if days else visit_day(rng, chunk.today, chunk.days)) - timedelta(days=rng.randint(0, 3))
+
+        last_visit_at = None
+        last_follow_up = None
+        outstanding = 0
+        for visit_number, day in enumerate(days, start=1):
+            visit_at = opd_time(rng, day)
+            complaints = prefer["complaints"].some(rng, rng.choice((1, 1, 2)))
+            appointment_id = new_id(rng)
+            write["appointments"]([
+                appointment_id, patient_id, day, queue_number(day), pg_array(complaints), "COMPLETED",
+                clinic.id, clinic.reception_id, visit_at - timedelta(minutes=rng.randint(5, 90)),
+            ])
+
+            follow_up = day + timedelta(days=rng.choice((7, 14, 30))) if rng.random() < 0.3 else None
+            fee = rng.choices(FEES, weights=FEE_WEIGHTS)[0]
+            vitals = json.dumps({"bp": f"{rng.randint(105, 150)}/{rng.randint(65, 95)}", "pulse": rng.randint(60, 100)}) \
+                if rng.random() < 0.4 else None
+            visit_id = new_id(rng)
+            write["visits"]([
+                visit_id, patient_id, appointment_id, visit_at, visit_number, rng.choice(clinic.doctor_ids),
+                pg_array(complaints),
+                pg_array(prefer["diagnoses"].some(rng, rng.choice((1, 1, 1, 2)))),
+                pg_array(prefer["observations"].some(rng, rng.randint(0, 2))),
+                pg_array(prefer["tests"].some(rng, rng.choice((0, 0, 1)))),
+                follow_up, vitals, "Review if pain persists" if rng.random() < 0.1 else None, fee,
+                clinic.id, visit_at,
+            ])
+            medicines = rng.choices(range(len(MEDICINES_PER_VISIT_WEIGHTS)), weights=MEDICINES_PER_VISIT_WEIGHTS)[0]
+            for sort_order, name in enumerate(prefer["medicines"].some(rng, medicines)):
+                write["visit_medicines"]([
+                    new_id(rng), visit_id, name, prefer["dosages"].one(rng), prefer["durations"].one(rng), sort_order,
+                ])
+
+            if rng.random() < 0.9:
+                invoice_counter += 1
+                status = rng.choices(("PAID", "PARTIAL", "UNPAID"), weights=(80, 8, 12))[0]
+                paid = fee if status == "PAID" else (fee // 2 if status == "PARTIAL" else 0)
+                outstanding += fee - paid
+                invoice_id = new_id(rng)
+                write["invoices"]([
+                    invoice_id,
+                    f"INV-{clinic.band * 10**8 + invoice_counter * chunk.clinic_chunks + chunk.position}",
+                    patient_id, visit_id, fee, paid, status,
+                    rng.choice(("CASH", "UPI", "CARD")) if paid else None, day if paid else None,
+                    clinic.id, clinic.reception_id, visit_at + timedelta(minutes=rng.randint(1, 20)),
+                ])
+                write["invoice_items"]([new_id(rng), invoice_id, "Consultation", fee, 1])
+
+            last_visit_at = visit_at
+            if follow_up and (last_follow_up is None or follow_up > last_follow_up):
+                last_follow_up = follow_up
+
+        # Some appointments never become visits; today's are still waiting
+        if rng.random() < 0.08:
+            day = visit_day(rng, chunk.today, chunk.days)
+            write["appointments"]([
+                new_id(rng), patient_id, day, queue_number(day), pg_array(prefer["complaints"].some(rng, 1)),
+                "WAITING" if day == chunk.today else rng.choice(("CANCELLED", "NO_SHOW")),
+                clinic.id, clinic.reception_id, opd_time(rng, day),
+            ])
+
+        write["patients"]([
+            patient_id,
+            f"PT-{clinic.band * 10**8 + number}",
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            min(90, max(1, int(rng.gauss(38, 16)))),
+            rng.choice(("MALE", "FEMALE")) if rng.random() < 0.99 else "OTHER",
+            f"9{rng.randrange(10**9):09d}",
+            f"{rng.randint(1, 999)}, {rng.choice(LAST_NAMES)} Nagar, {rng.choice(CITIES)}",
+            rng.choices(BLOOD_GROUPS, weights=BLOOD_GROUP_WEIGHTS)[0] if rng.random() < 0.6 else None,
+            pg_array(rng.sample(ALLERGIES, rng.choice((1, 1, 2)))) if rng.random() < 0.1 else "{}",
+            visits, visits, last_visit_at, last_follow_up, outstanding, now,
+            clinic.id, clinic.reception_id, opd_time(rng, registered_on),
+        ])
+
+    return buffers
+
+
+def copy_buffers(cursor, buffers: Dict[str, io.StringIO]) -> Dict[str, int]:
+    counts = {}
+    for table, columns in COLUMNS.items():
+        buffer = buffers[table]
+        counts[table] = buffer.getvalue().count("\n")
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return counts
+
+
+def init_worker() -> None:
+    # Connections inherited from the parent must not be used by the children
+    engine.dispose(close=False)
+
+
+def load_chunk(chunk: Chunk) -> Dict[str, int]:
+    buffers = generate_chunk(chunk)
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            if chunk.skip_triggers:
+                cursor.execute("SET session_replication_role = replica")
+            counts = copy_buffers(cursor, buffers)
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def plan_clinics(seed: int, clinics: int, patients: int) -> List[ClinicPlan]:
+    rng = random.Random(f"{seed}:clinics")
+    weights = [rng.lognormvariate(0, 0.9) for _ in range(clinics)]
+    total = sum(weights)
+    plans = []
+    for index, weight in enumerate(weights):
+        share = weight * clinics / total
+        doctors = 1 + (share > 1.5) + (share > 3)
+        plans.append(ClinicPlan(
+            index=index,
+            id=new_id(rng),
+            band=(seed % 1000 + 1) * 10**4 + index + 1,
+            patients=max(1, round(patients * weight / total)),
+            doctor_ids=[new_id(rng) for _ in range(doctors)],
+            reception_id=new_id(rng),
+        ))
+    return plans
+
+
+def create_clinics(seed: int, plans: List[ClinicPlan]) -> None:
+    """Clinics, users, doctors and master options; the owner is each clinic's first doctor"""
+    rng = random.Random(f"{seed}:staff")
+    password_hash = get_password_hash(f"synthetic-{seed}")
+    rows = {"clinics": [], "users": [], "doctors": []}
+    for plan in plans:
+        city = rng.choice(CITIES)
+        rows["clinics"].append([
+            plan.id, f"{CODE_PREFIX}{seed}-{plan.index + 1:04d}", f"Synthetic Dental Clinic {plan.index + 1}",
+            f"{rng.randint(1, 200)} MG Road, {city}", f"02{rng.randrange(10**8):08d}", "09:00", "20:30",
+        ])
+        staff = [(doctor_id, "DOCTOR") for doctor_id in plan.doctor_ids] + [(plan.reception_id, "ASSISTANT")]
+        for number, (user_id, role) in enumerate(staff, start=1):
+            # Doctors' user ids are derived from their doctor ids
+            account_id = str(uuid.uuid5(uuid.NAMESPACE_OID, user_id)) if role == "DOCTOR" else user_id
+            rows["users"].append([
+                account_id, f"syn-{seed}-{plan.index + 1}-{number}@docease.local", password_hash, role,
+                f"{'Dr. ' if role == 'DOCTOR' else ''}{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"9{rng.randrange(10**9):09d}", True, plan.id,
+            ])
+            if role == "DOCTOR":
+                rows["doctors"].append([
+                    user_id, f"{CODE_PREFIX}{seed}-{plan.index + 1:04d}-{number}", account_id, "Dentist", "BDS", plan.id,
+                ])
+
+    columns = {
+        "clinics": ["id", "clinic_code", "name", "address", "phone", "opd_start_time", "opd_end_time"],
+        "users": ["id", "email", "password_hash", "role", "full_name", "phone", "is_active", "clinic_id"],
+        "doctors": ["id", "doctor_code", "user_id", "specialization", "qualification", "clinic_id"],
+    }
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            for table, table_rows in rows.items():
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(table_rows)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns[table])}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                "UPDATE clinics c SET owner_doctor_id = o.doctor_id "
+                "FROM unnest(%s::text[], %s::text[]) AS o(clinic_id, doctor_id) WHERE c.id = o.clinic_id",
+                ([plan.id for plan in plans], [plan.doctor_ids[0] for plan in plans]),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    db = SessionLocal()
+    try:
+        seed_fixtures(db, [plan.id for plan in plans])
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_generated() -> None:
+    db = SessionLocal()
+    try:
+        deleted = db.execute(text("DELETE FROM clinics WHERE clinic_code LIKE :prefix"), {"prefix": f"{CODE_PREFIX}%"}).rowcount
+        db.commit()
+        print(f"Deleted {deleted} generated clinics")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clinics", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=5_000_000)
+    parser.add_argument("--visits", type=int, default=30_000_000)
+    parser.add_argument("--years", type=int, default=5, help="Years of history")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--chunk-size", type=int, default=20_000, help="Patients per COPY transaction")
+    parser.add_argument("--skip-triggers", action="store_true", help="Load with session_replication_role = replica (superuser)")
+    parser.add_argument("--purge", action="store_true", help="Delete previously generated clinics first")
+    args = parser.parse_args()
+
+    if args.purge:
+        purge_generated()
+
+    started = time.perf_counter()
+    plans = plan_clinics(args.seed, args.clinics, args.patients)
+    create_clinics(args.seed, plans)
+    print(f"Created {len(plans)} clinics with {sum(len(p.doctor_ids) for p in plans)} doctors")
+
+    today = date.today()
+    visits_per_patient = args.visits / max(args.patients, 1)
+    chunks = []
+    for plan in plans:
+        clinic_chunks = math.ceil(plan.patients / args.chunk_size)
+        for position in range(clinic_chunks):
+            first = position * args.chunk_size
+            chunks.append(Chunk(
+                plan, position, clinic_chunks, first, min(args.chunk_size, plan.patients - first),
+                visits_per_patient, args.seed, today, args.years * 365, args.skip_triggers,
+            ))
+    # Largest chunks first keeps every worker busy until the end
+    chunks.sort(key=lambda chunk: chunk.patients, reverse=True)
+
+    totals: Dict[str, int] = {table: 0 for table in COLUMNS}
+    with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+        for done, counts in enumerate(pool.imap_unordered(load_chunk, chunks), start=1):
+            for table, count in counts.items():
+                totals[table] += count
+            rows = sum(totals.values())
+            elapsed = time.perf_counter() - started
+            print(
+                f"  {done}/{len(chunks)} chunks, {totals['patients']:,} patients, {totals['visits']:,} visits, "
+                f"{rows / elapsed:,.0f} rows/s",
+                end="\r",
+            )
+    print()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("clinics", "users", "doctors", *COLUMNS):
+            conn.execute(text(f"ANALYZE {table}"))
+
+    print(f"Loaded {', '.join(f'{count:,} {table}' for table, count in totals.items())}")
+    print(f"Done in {time.perf_counter() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
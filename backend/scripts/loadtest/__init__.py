@@ -0,0 +1,9 @@
+"""
+End-to-end load test: a realistic clinic day replayed across synthetic clinics.
+
+- fixtures.py: synthetic clinics, users, tokens and patients written to the database
+- workload.py: the clinic-day model (reception, queue screens, doctors, billing, reports)
+- report.py: per-route p50/p95/p99 and database statement counts
+
+Run from the backend directory: python -m scripts.loadtest --help
+"""
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Replay a realistic clinic day against a running DocEase server.
+
+Creates N synthetic clinics in DATABASE_URL (see scripts/loadtest/fixtures.py),
+runs the clinic-day workload (scripts/loadtest/workload.py) against
+--base-url and reports p50/p95/p99 latency and database statements per route.
+Start the server with QUERY_STATS_ENABLED=True to get the statement counts.
+The clinics are deleted afterwards unless --keep is given.
+
+Use the same settings before and after a performance change and compare the
+--output JSON files.
+
+Run from the backend directory: python -m scripts.loadtest
+    QUERY_STATS_ENABLED=True gunicorn -c gunicorn.conf.py app.main:app
+    python -m scripts.loadtest --clinics 20 --speedup 96 --output before.json
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+
+from scripts.loadtest.fixtures import provision_clinics, remove_clinics
+from scripts.loadtest.report import Recorder
+from scripts.loadtest.workload import WorkloadModel, run_day
+
+
+def main():
+    defaults = WorkloadModel()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clinics", type=int, default=5)
+    parser.add_argument("--doctors-per-clinic", type=int, default=1)
+    parser.add_argument("--patients-per-clinic", type=int, default=500, help="Registered before the day starts")
+    parser.add_argument("--patients-per-day", type=int, default=defaults.patients_per_day, help="OPD arrivals per clinic")
+    parser.add_argument("--new-patient-ratio", type=float, default=defaults.new_patient_ratio)
+    parser.add_argument("--day-minutes", type=float, default=defaults.day_minutes, help="Length of the OPD day")
+    parser.add_argument("--speedup", type=float, default=defaults.speedup, help="Simulated minutes per real minute")
+    parser.add_argument("--consult-minutes", type=float, default=defaults.consult_minutes)
+    parser.add_argument("--screens", type=int, default=defaults.screens, help="Queue screens polling per clinic")
+    parser.add_argument("--poll-seconds", type=float, default=defaults.poll_seconds)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the per-route summary as JSON")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic clinics")
+    args = parser.parse_args()
+
+    model = WorkloadModel(
+        day_minutes=args.day_minutes,
+        speedup=args.speedup,
+        patients_per_day=args.patients_per_day,
+        new_patient_ratio=args.new_patient_ratio,
+        consult_minutes=args.consult_minutes,
+        screens=args.screens,
+        poll_seconds=args.poll_seconds,
+    )
+    httpx.get(f"{args.base_url}/ready", timeout=5.0).raise_for_status()
+
+    run_id = uuid.uuid4().hex[:8]
+    started = time.perf_counter()
+    fixtures = provision_clinics(run_id, args.clinics, args.doctors_per_clinic, args.patients_per_clinic, args.seed)
+    print(f"Run {run_id}: {args.clinics} clinics ready in {time.perf_counter() - started:.1f}s")
+    print(
+        f"Simulating a {args.day_minutes:.0f}-minute day at {args.speedup:g}x "
+        f"(~{model.seconds(args.day_minutes) / 60:.1f} min), {args.patients_per_day} patients per clinic"
+    )
+
+    recorder = Recorder()
+    try:
+        started = time.perf_counter()
+        visits = asyncio.run(run_day(args.base_url, fixtures, recorder, model, args.seed, args.max_connections))
+        duration = time.perf_counter() - started
+    finally:
+        if not args.keep:
+            remove_clinics([fixture.clinic_id for fixture in fixtures])
+
+    print(f"{visits} visits saved in {duration:.0f}s")
+    recorder.print_table(duration)
+    if args.output:
+        recorder.write_json(args.output, {"run_id": run_id, "duration_seconds": duration, "visits": visits, **vars(args)})
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
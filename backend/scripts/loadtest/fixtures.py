@@ -0,0 +1,125 @@
+"""
+Synthetic clinics for load tests, written straight to the database.
+
+Each clinic gets an owner doctor (plus optional extra doctors), one
+receptionist, the standard master option lists and a pool of already
+registered patients. Users get API tokens minted directly, so the run does
+not spend its first minutes logging in through bcrypt.
+"""
+
+import random
+from datetime import timedelta
+from typing import List, NamedTuple
+
+from sqlalchemy import delete, insert, update
+from app.core.database import SessionLocal
+from app.core.security import create_access_token, get_password_hash
+from app.models.models import Clinic, Doctor, GenderEnum, Patient, RoleEnum, User, generate_uuid
+from app.services.clinic_fixtures import seed_fixtures
+
+FIRST_NAMES = ["Aarav", "Diya", "Vihaan", "Ananya", "Arjun", "Ishita", "Kabir", "Meera", "Rohan", "Saanvi", "Aditya", "Kavya"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Khan", "Singh", "Nair", "Gupta", "Das", "Mehta", "Joshi", "Rao"]
+
+
+class ClinicFixture(NamedTuple):
+    clinic_id: str
+    doctor_tokens: List[str]
+    reception_token: str
+    patients: List[dict]  # id, patient_code, full_name, phone
+
+
+def synthetic_patient(rng: random.Random) -> dict:
+    return {
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "age": rng.randint(1, 90),
+        "gender": rng.choice(list(GenderEnum)).value,
+        "phone": f"9{rng.randrange(10**9):09d}",
+        "address": f"{rng.randint(1, 500)} Main Road",
+    }
+
+
+def provision_clinics(run_id: str, clinics: int, doctors_per_clinic: int, patients_per_clinic: int, seed: int) -> List[ClinicFixture]:
+    """
+    Create the synthetic clinics in one transaction.
+
+    patient_code is unique across all clinics and the API numbers new patients
+    from the highest code in the clinic, so every clinic's codes start in its
+    own band of a million. Bands are drawn without the seed, so a kept run
+    does not collide with the next one.
+    """
+    rng = random.Random(seed)
+    password_hash = get_password_hash(f"loadtest-{run_id}")
+    bands = random.sample(range(1000, 10000), clinics)
+    token_ttl = timedelta(days=1)
+    fixtures = []
+
+    db = SessionLocal()
+    try:
+        for index in range(clinics):
+            clinic_id = generate_uuid()
+            db.execute(insert(Clinic.__table__).values(id=clinic_id, name=f"Load test {run_id} #{index + 1}"))
+
+            users = [
+                {"id": generate_uuid(), "role": RoleEnum.DOCTOR, "full_name": f"Dr. Load {index + 1}.{number + 1}"}
+                for number in range(doctors_per_clinic)
+            ]
+            users.append({"id": generate_uuid(), "role": RoleEnum.ASSISTANT, "full_name": f"Reception {index + 1}"})
+            db.execute(insert(User.__table__), [
+                {
+                    **user,
+                    "email": f"loadtest-{run_id}-{index + 1}-{number + 1}@docease.local",
+                    "password_hash": password_hash,
+                    "clinic_id": clinic_id,
+                    "is_active": True,
+                }
+                for number, user in enumerate(users)
+            ])
+            doctor_ids = [generate_uuid() for _ in range(doctors_per_clinic)]
+            db.execute(insert(Doctor.__table__), [
+                {"id": doctor_id, "user_id": user["id"], "clinic_id": clinic_id}
+                for doctor_id, user in zip(doctor_ids, users)
+            ])
+            db.execute(update(Clinic.__table__).where(Clinic.__table__.c.id == clinic_id).values(owner_doctor_id=doctor_ids[0]))
+
+            patients = [
+                {
+                    "id": generate_uuid(),
+                    "patient_code": f"PT-{bands[index]}{number + 1:06d}",
+                    "clinic_id": clinic_id,
+                    "created_by": users[-1]["id"],
+                    **synthetic_patient(rng),
+                }
+                for number in range(patients_per_clinic)
+            ]
+            if patients:
+                db.execute(insert(Patient.__table__), patients)
+
+            fixtures.append(ClinicFixture(
+                clinic_id=clinic_id,
+                doctor_tokens=[
+                    create_access_token({"sub": user["id"], "role": user["role"].value}, token_ttl) for user in users[:-1]
+                ],
+                reception_token=create_access_token({"sub": users[-1]["id"], "role": RoleEnum.ASSISTANT.value}, token_ttl),
+                patients=[
+                    {key: patient[key] for key in ("id", "patient_code", "full_name", "phone")} for patient in patients
+                ],
+            ))
+
+        seed_fixtures(db, [fixture.clinic_id for fixture in fixtures])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return fixtures
+
+
+def remove_clinics(clinic_ids: List[str]) -> None:
+    """Delete the synthetic clinics; everything they own goes by ON DELETE CASCADE"""
+    db = SessionLocal()
+    try:
+        db.execute(delete(Clinic.__table__).where(Clinic.__table__.c.id.in_(clinic_ids)))
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,91 @@
+"""
+Per-route latency and database statement statistics for a load test run.
+"""
+
+import json
+import math
+import re
+import statistics
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Path segments that are ids (uuids) are reported as {id}
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(?=/|$)")
+
+
+def route_name(method: str, path: str) -> str:
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.queries: List[int] = []
+        self.db_ms: List[float] = []
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": len(latencies) + sum(self.errors.values()),
+            "errors": dict(self.errors),
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": latencies[-1] if latencies else 0.0,
+            "queries_mean": statistics.mean(self.queries) if self.queries else None,
+            "queries_max": max(self.queries) if self.queries else None,
+            "db_ms_mean": statistics.mean(self.db_ms) if self.db_ms else None,
+        }
+
+
+class Recorder:
+    """Collects one sample per request; successful requests feed the percentiles"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+
+    def record(self, route: str, elapsed_ms: float, status: Optional[int], headers=None) -> None:
+        stats = self.routes[route]
+        if status is None or status >= 400:
+            stats.errors[str(status) if status is not None else "connection"] += 1
+            return
+        stats.latencies_ms.append(elapsed_ms)
+        if headers is not None and "x-db-queries" in headers:
+            stats.queries.append(int(headers["x-db-queries"]))
+            stats.db_ms.append(float(headers.get("x-db-time-ms", 0)))
+
+    def summary(self) -> Dict[str, dict]:
+        return {route: stats.summary() for route, stats in sorted(self.routes.items())}
+
+    def print_table(self, duration_seconds: float) -> None:
+        summary = self.summary()
+        print(
+            f"\n{'route':<52}{'reqs':>7}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'db ms':>8}"
+        )
+        total = errors = 0
+        for route, row in summary.items():
+            failed = sum(row["errors"].values())
+            total += row["requests"]
+            errors += failed
+            queries = f"{row['queries_mean']:.1f}" if row["queries_mean"] is not None else "-"
+            db_ms = f"{row['db_ms_mean']:.1f}" if row["db_ms_mean"] is not None else "-"
+            print(
+                f"{route[:51]:<52}{row['requests']:>7}{failed:>6}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+                f"{row['p99_ms']:>9.1f}{queries:>9}{db_ms:>8}"
+            )
+        print(f"\n{total} requests, {errors} errors, {total / max(duration_seconds, 1e-9):.1f} req/s")
+        if not any(row["queries_mean"] is not None for row in summary.values()):
+            print("No X-DB-Queries headers: start the server with QUERY_STATS_ENABLED=True for query counts")
+
+    def write_json(self, path: str, meta: dict) -> None:
+        with open(path, "w") as f:
+            json.dump({"meta": meta, "routes": self.summary()}, f, indent=2)
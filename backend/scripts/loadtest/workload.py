@@ -0,0 +1,236 @@
+"""
+The clinic-day workload model.
+
+Every synthetic clinic runs the same day, compressed by ``speedup`` (an
+8-hour day at 48x takes 10 minutes). Within a clinic:
+
+- reception: patients arrive as a Poisson process; a share are new and get
+  registered, the rest are looked up with a search, then each is added to the
+  OPD queue with chief complaints. Reception also bills every finished visit.
+- queue screens: several screens poll the OPD queue and day stats every
+  ``poll_seconds`` of real time. Polling is not compressed, so its request
+  rate matches production while the rest of the day runs faster.
+- doctors: take the next waiting patient, mark them IN_PROGRESS, open the
+  visit form (patient, history, any existing visit and the master option
+  lists, fetched concurrently like the frontend does), consult, look up
+  co-prescribed medicines for the first medicine and save the prescription.
+- end of day: each doctor runs the collections, billing and OPD reports.
+
+Doctors pick options with Zipf-like weights over the usage-ranked lists, so
+each doctor builds up habits over the day like a real one.
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional
+
+import httpx
+
+from scripts.loadtest.fixtures import ClinicFixture, synthetic_patient
+from scripts.loadtest.report import Recorder, route_name
+
+USAGE_RANKED_OPTIONS = ("diagnosis-options", "medicine-options", "dosage-options", "duration-options")
+PLAIN_OPTIONS = ("symptom-options", "observation-options", "test-options")
+
+
+class WorkloadModel(NamedTuple):
+    day_minutes: float = 480
+    speedup: float = 48
+    patients_per_day: int = 60
+    new_patient_ratio: float = 0.3
+    consult_minutes: float = 6
+    screens: int = 3
+    poll_seconds: float = 10
+    paid_ratio: float = 0.8
+    consultation_fee: int = 500
+
+    def seconds(self, clinic_minutes: float) -> float:
+        """Real seconds for a span of simulated clinic time"""
+        return clinic_minutes * 60 / self.speedup
+
+
+class Client:
+    """One user's session: every request is timed and recorded under its route"""
+
+    def __init__(self, http: httpx.AsyncClient, token: str, recorder: Recorder):
+        self.http = http
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.recorder = recorder
+
+    async def request(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route_name(method, path), (time.perf_counter() - started) * 1000, None)
+            return None
+        self.recorder.record(route_name(method, path), (time.perf_counter() - started) * 1000, response.status_code, response.headers)
+        return response if response.status_code < 400 else None
+
+    async def json(self, method: str, path: str, default=None, **kwargs):
+        response = await self.request(method, path, **kwargs)
+        return response.json() if response is not None else default
+
+
+def pick(rng: random.Random, options: list, count: int) -> List[str]:
+    """Up to ``count`` distinct option names, favouring the top of the (usage-ranked) list"""
+    names = [option["name"] for option in options]
+    chosen = []
+    while names and len(chosen) < count:
+        name = rng.choices(names, weights=[1 / (rank + 1) for rank in range(len(names))])[0]
+        names.remove(name)
+        chosen.append(name)
+    return chosen
+
+
+class ClinicDay:
+    def __init__(self, fixture: ClinicFixture, http: httpx.AsyncClient, recorder: Recorder, model: WorkloadModel, seed: int):
+        self.fixture = fixture
+        self.model = model
+        self.rng = random.Random(seed)
+        self.reception = Client(http, fixture.reception_token, recorder)
+        self.doctors = [Client(http, token, recorder) for token in fixture.doctor_tokens]
+        self.screen = Client(http, fixture.reception_token, recorder)
+        self.waiting: asyncio.Queue = asyncio.Queue()
+        self.billing: asyncio.Queue = asyncio.Queue()
+        self.arrivals_closed = asyncio.Event()
+        self.consultations_done = asyncio.Event()
+        self.visits_saved = 0
+
+    async def run(self) -> None:
+        complaints = await self.reception.json("GET", "/api/chief-complaints/", default=[])
+        doctors = asyncio.gather(*(self.doctor(client) for client in self.doctors))
+        screens = asyncio.gather(*(self.queue_screen(index) for index in range(self.model.screens)))
+        billing = asyncio.create_task(self.bill())
+
+        await self.arrivals(complaints)
+        self.arrivals_closed.set()
+        await doctors
+        self.consultations_done.set()
+        await asyncio.gather(screens, billing)
+        await asyncio.gather(*(self.end_of_day(client) for client in self.doctors))
+
+    async def arrivals(self, complaints: list) -> None:
+        rate = self.model.patients_per_day / self.model.seconds(self.model.day_minutes)
+        deadline = time.monotonic() + self.model.seconds(self.model.day_minutes)
+        while True:
+            await asyncio.sleep(self.rng.expovariate(rate))
+            if time.monotonic() >= deadline:
+                return
+            patient_id = await self.register_or_find()
+            if patient_id is None:
+                continue
+            body = {"patient_id": patient_id, "chief_complaints": pick(self.rng, complaints, self.rng.randint(1, 2))}
+            added = await self.reception.json("POST", "/api/opd/appointments/", json=body)
+            if added:
+                await self.waiting.put((added["appointment"]["id"], patient_id))
+
+    async def register_or_find(self) -> Optional[str]:
+        if self.rng.random() < self.model.new_patient_ratio or not self.fixture.patients:
+            created = await self.reception.json("POST", "/api/patients/", json=synthetic_patient(self.rng))
+            return created["patient"]["id"] if created else None
+
+        patient = self.rng.choice(self.fixture.patients)
+        query = patient["full_name"] if self.rng.random() < 0.5 else patient["phone"][-6:]
+        found = await self.reception.json("GET", "/api/patients/search", params={"q": query})
+        return patient["id"] if found is not None else None
+
+    async def queue_screen(self, index: int) -> None:
+        # Screens do not all poll in lockstep
+        await asyncio.sleep(self.rng.uniform(0, self.model.poll_seconds))
+        while not self.consultations_done.is_set():
+            await self.screen.request("GET", "/api/opd/queue")
+            if index == 0:
+                await self.screen.request("GET", "/api/opd/stats")
+            try:
+                await asyncio.wait_for(self.consultations_done.wait(), self.model.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def next_patient(self):
+        while True:
+            try:
+                return await asyncio.wait_for(self.waiting.get(), self.model.poll_seconds)
+            except asyncio.TimeoutError:
+                if self.arrivals_closed.is_set() and self.waiting.empty():
+                    return None
+
+    async def doctor(self, client: Client) -> None:
+        while True:
+            await client.request("GET", "/api/opd/queue")
+            waiting = await self.next_patient()
+            if waiting is None:
+                return
+            appointment_id, patient_id = waiting
+            await client.request("PUT", f"/api/opd/appointments/{appointment_id}/status", json={"status": "IN_PROGRESS"})
+
+            form = await asyncio.gather(
+                client.json("GET", f"/api/patients/{patient_id}"),
+                client.json("GET", f"/api/patients/{patient_id}/visits"),
+                client.json("GET", f"/api/opd/appointments/{appointment_id}/visit"),
+                *(client.json("GET", f"/api/{name}/", default=[], params={"rank": "usage"}) for name in USAGE_RANKED_OPTIONS),
+                *(client.json("GET", f"/api/{name}/", default=[]) for name in PLAIN_OPTIONS),
+            )
+            diagnoses, medicines, dosages, durations, symptoms, _, tests = form[3:]
+
+            await asyncio.sleep(self.rng.expovariate(1 / self.model.seconds(self.model.consult_minutes)))
+
+            prescribed = pick(self.rng, medicines, self.rng.randint(1, 4))
+            if prescribed:
+                await client.request("GET", "/api/medicine-options/co-prescribed", params={"medicine": prescribed[0]})
+            fee = self.model.consultation_fee
+            saved = await client.json("POST", "/api/visits/", json={
+                "patient_id": patient_id,
+                "appointment_id": appointment_id,
+                "symptoms": pick(self.rng, symptoms, self.rng.randint(1, 3)),
+                "diagnosis": pick(self.rng, diagnoses, self.rng.randint(1, 2)),
+                "recommended_tests": pick(self.rng, tests, self.rng.randint(0, 1)),
+                "medicines": [
+                    {
+                        "medicine_name": name,
+                        "dosage": (pick(self.rng, dosages, 1) or [None])[0],
+                        "duration": (pick(self.rng, durations, 1) or [None])[0],
+                    }
+                    for name in prescribed
+                ],
+                "follow_up_date": (date.today() + timedelta(days=7)).isoformat() if self.rng.random() < 0.3 else None,
+                "amount": fee,
+            })
+            if saved:
+                self.visits_saved += 1
+                await self.billing.put((patient_id, saved["visit_id"], fee))
+
+    async def bill(self) -> None:
+        while not (self.consultations_done.is_set() and self.billing.empty()):
+            try:
+                patient_id, visit_id, fee = await asyncio.wait_for(self.billing.get(), self.model.poll_seconds)
+            except asyncio.TimeoutError:
+                continue
+            paid = self.rng.random() < self.model.paid_ratio
+            await self.reception.request("POST", "/api/invoices/", json={
+                "patient_id": patient_id,
+                "visit_id": visit_id,
+                "payment_status": "PAID" if paid else "UNPAID",
+                "payment_mode": self.rng.choice(["CASH", "UPI", "CARD"]) if paid else None,
+                "payment_date": date.today().isoformat() if paid else None,
+                "items": [{"description": "Consultation", "amount": fee}],
+            })
+
+    async def end_of_day(self, client: Client) -> None:
+        today = date.today().isoformat()
+        await client.request("GET", "/api/visits/collections/summary")
+        await client.request("GET", "/api/invoices/stats/summary", params={"start_date": today, "end_date": today})
+        await client.request("GET", "/api/opd/stats")
+        await client.request("GET", "/api/invoices/", params={"limit": 50})
+        await client.request("GET", "/api/patients/", params={"sort": "last_visit"})
+
+
+async def run_day(base_url: str, fixtures: List[ClinicFixture], recorder: Recorder, model: WorkloadModel, seed: int, max_connections: int) -> int:
+    """Run every clinic's day concurrently; returns the number of visits saved"""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as http:
+        days = [ClinicDay(fixture, http, recorder, model, seed + index) for index, fixture in enumerate(fixtures)]
+        await asyncio.gather(*(day.run() for day in days))
+    return sum(day.visits_saved for day in days)
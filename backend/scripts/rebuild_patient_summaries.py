@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Recompute the patient summary columns (visit count, last visit, next
+follow-up, outstanding balance) from visits and invoices.
+
+The database triggers from migration 0018_patient_summary keep them current;
+run this after creating a schema without migrations or after bulk data fixes.
+
+Run from the backend directory: python -m scripts.rebuild_patient_summaries
+    python -m scripts.rebuild_patient_summaries --clinic-id <id> --batch-size 500
+"""
+
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.patient_summary import rebuild_patient_summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clinic-id", help="Only rebuild this clinic's patients")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Patients per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    total = 0
+    try:
+        for refreshed in rebuild_patient_summaries(db, args.clinic_id, args.batch_size):
+            total += refreshed
+            print(f"  refreshed {total} patients", end="\r")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"Refreshed {total} patient summaries in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
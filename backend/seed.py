@@ -8,9 +8,6 @@ from app.core.database import SessionLocal, engine
 from app.models import models
 from app.core.security import get_password_hash
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
-
 
 def seed_database():
     db = SessionLocal()
@@ -179,4 +176,6 @@ def seed_database():
 
 
 if __name__ == "__main__":
+    # Create tables (only when run as a script, not on import)
+    models.Base.metadata.create_all(bind=engine)
     seed_database()
@@ -9,6 +9,10 @@ const api = axios.create({
   },
 });
 
+// Time of this tab's last successful write, as stamped by the API; echoed back so
+// reads right after a save are served from the primary database, not a lagging replica
+const LAST_WRITE_HEADER = 'x-last-write';
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -16,6 +20,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const lastWrite = sessionStorage.getItem('lastWrite');
+    if (lastWrite) {
+      config.headers[LAST_WRITE_HEADER] = lastWrite;
+    }
     return config;
   },
   (error) => Promise.reject(error)
@@ -23,7 +31,13 @@ api.interceptors.request.use(
 
 // Response interceptor to handle errors
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const lastWrite = response.headers?.[LAST_WRITE_HEADER];
+    if (lastWrite) {
+      sessionStorage.setItem('lastWrite', lastWrite);
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('token');